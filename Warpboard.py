@@ -14,7 +14,7 @@ import sys
 import uuid
 import pydub
 import importlib.metadata
-from collections import deque
+from collections import deque, defaultdict, Counter
 from threading import Lock, Event
 from pynput import keyboard, mouse
 # Removed unused import
@@ -23,6 +23,17 @@ import logging
 import webbrowser
 import platform
 import subprocess
+import argparse
+import queue
+import tempfile
+import shutil
+import struct
+import random
+import socket
+import socketserver
+import http.server
+import multiprocessing
+from multiprocessing import shared_memory
 
 # --- Configuration and Constants ---
 def get_app_data_dir():
@@ -36,10 +47,16 @@ def get_app_data_dir():
 
 APP_DATA_DIR = get_app_data_dir()
 SOUNDS_DIR = os.path.join(APP_DATA_DIR, "sounds")
+BANKS_DIR = os.path.join(APP_DATA_DIR, "banks")
+RECORDINGS_DIR = os.path.join(APP_DATA_DIR, "recordings")
 CONFIG_DIR = os.path.join(APP_DATA_DIR, "config")
 CONFIG_FILE = os.path.join(CONFIG_DIR, "soundboard_config.json")
 APP_SETTINGS_FILE = os.path.join(CONFIG_DIR, "app_settings.json")
+LIBRARY_INDEX_FILE = os.path.join(CONFIG_DIR, "library_index.json")
+PROFILES_DIR = os.path.join(CONFIG_DIR, "profiles")
+PROFILES_FILE = os.path.join(CONFIG_DIR, "profiles.json")
 LOG_FILE = os.path.join(APP_DATA_DIR, "warpboard.log")
+METRICS_FILE = os.path.join(APP_DATA_DIR, "metrics.jsonl")
 
 # --- THIS IS THE CORRECTED BLOCK ---
 # Determine the root directory for bundled assets, which works for both
@@ -62,20 +79,99 @@ ISSUES_URL = "https://github.com/Imrankhadeer/Warpboard/issues"
 
 # --- Audio Settings ---
 SUPPORTED_FORMATS = [("Audio Files", "*.wav *.mp3 *.ogg *.flac")]
+WATCHED_EXTENSIONS = ('.wav', '.mp3', '.ogg', '.flac')
+WATCH_RESCAN_INTERVAL_MS = 30000
+BANK_FORMATS = [("WarpBoard Sound Bank", "*.wpbank")]
+BANK_MAGIC = b"WPBANK01"
+BANK_ALIGNMENT = 4096
+BANK_METADATA_KEYS = ("id", "name", "volume", "hotkeys", "loop", "enabled", "trim_silence", "duration", "analysis", "tags", "max_voices")
 VIRTUAL_MIC_NAME_PARTIAL = "CABLE Input"
 SAMPLE_RATE = 44100
 CHANNELS = 2
 FRAME_SIZE = 1024
+INT16_SCALE = 1.0 / 32768
+CACHE_SAMPLE_FORMATS = ("int16", "float32")
+SILENCE_THRESHOLD_DB = -50.0
+TRIM_PADDING_MS = 5
+LOUDNESS_BLOCK_SECONDS = 0.4
+WAVEFORM_LEVELS = (512, 256, 128, 64, 32)
+WAVEFORM_SUFFIX = ".peaks.npy"
 # NOTE: The rest of the file remains the same...
 
 # --- UI and Validation ---
 INVALID_FILENAME_CHARS = r'[<>:"/\\|?*]'
 MAX_DISPLAY_NAME_LENGTH = 30
 MAX_DEVICE_NAME_LENGTH = 45
-
-# --- Global State ---
-current_playing_sound_details = {}
-current_playing_sound_details_lock = threading.Lock()
+CARD_MIN_WIDTH = 200
+CARD_PADDING = 5
+SEARCH_DEBOUNCE_MS = 150
+SEARCH_FUZZY_MIN_RESULTS = 5
+SEARCH_FUZZY_THRESHOLD = 0.5
+VOICE_EVENT_CAPACITY = 1024
+NOW_PLAYING_POLL_MS = 50
+NOW_PLAYING_IDLE_POLL_MS = 250
+DEFAULT_MAX_VOICES = 32
+VOICE_STEAL_POLICIES = ("oldest", "quietest")
+VOICE_FADE_FRAMES = SAMPLE_RATE // 100
+LIMITER_LOOKAHEAD = 128
+LIMITER_CEILING = 0.98
+LIMITER_RELEASE_FRAMES = SAMPLE_RATE // 20
+RESIZE_COALESCE_MS = 16
+METER_NAMES = ("Mix", "Mic", "SB", "Mon")
+METER_MIX, METER_MIC, METER_SB_MONITOR, METER_MIC_MONITOR = range(len(METER_NAMES))
+METER_REFRESH_MS = 50
+METER_FLOOR_DB = -60.0
+METER_PEAK_HOLD_SECONDS = 1.5
+METER_STALE_SECONDS = 0.25
+METER_WIDTH = 100
+CONTROL_HOST = "127.0.0.1"
+CONTROL_PORT = 47321
+CONTROL_LATENCY_WINDOW = 1000
+RENDER_MAX_SECONDS = 3600
+RECORD_FORMATS = [("FLAC", "*.flac"), ("WAV", "*.wav")]
+RECORD_SUBTYPES = {".flac": "PCM_24", ".wav": "FLOAT"}
+RECORD_RING_SECONDS = 10
+RECORD_CHUNK_BLOCKS = 64
+RECORD_POLL_SECONDS = 0.25
+REPLAY_MAX_SECONDS = 300
+DEFAULT_REPLAY_SECONDS = 60
+METRICS_INTERVAL_SECONDS = 10
+METRICS_SAMPLE_CAPACITY = 4096
+METRICS_MAX_FILE_BYTES = 5 * 1024 * 1024
+METRICS_PORT = 47322
+METRIC_SAMPLES = ("callback_ms", "load_ms", "decode_ms", "config_save_ms", "hotkey_latency_ms", "stream_recovery_ms")
+METRIC_COUNTERS = ("callbacks", "callback_overruns", "output_underflows", "cache_hits", "cache_misses", "cache_evictions", "imports", "hotkeys", "monitor_underruns", "monitor_overflows")
+SEQUENCE_LOOKAHEAD = 2
+SEQUENCE_POLL_SECONDS = 0.05
+SEQUENCE_START_TIMEOUT = 0.5
+ENGINE_STATE_INTERVAL = 0.02
+ENGINE_HEALTH_INTERVAL = 0.5
+ENGINE_STALL_SECONDS = 2.0
+ENGINE_START_TIMEOUT = 20.0
+ENGINE_REPLY_TIMEOUT = 30.0
+ENGINE_RESTART_BACKOFF = 0.5
+ENGINE_MAX_RESTARTS = 5
+ENGINE_STABLE_SECONDS = 30.0
+DEFAULT_PROFILE_ID = "default"
+PROFILE_CACHE_BUDGET_MB = 256
+STREAM_SUPERVISOR_INTERVAL = 1.0
+STREAM_PROBE_BACKOFF = 5.0
+STREAM_PROBE_BACKOFF_MAX = 120.0
+STREAM_PROBE_TIMEOUT = 20.0
+DEVICE_SETTING_KEYS = ("output_device_id", "input_device_id", "soundboard_monitor_device_id", "mic_monitor_device_id")
+# Stream attribute -> (label, app setting holding its fallback device names, is input).
+STREAM_ROLES = {"main_stream": ("App Output", "output_fallback_devices", False), "soundboard_monitor_stream": ("Listen to Soundboard", "monitor_fallback_devices", False),
+                "mic_monitor_stream": ("Hear Your Voice", "monitor_fallback_devices", False), "mic_stream": ("Microphone", "input_fallback_devices", True)}
+AUDIO_BACKENDS = ("pyaudio", "simulated")
+SIMULATED_CAPTURE_SECONDS = 60
+# Virtual devices of the simulated backend; each entry may also set "rates", "drift_ppm", "xrun_every" and "signal".
+SIMULATED_DEVICES = [
+    {"name": "CABLE Input (VB-Audio Virtual Cable)", "maxOutputChannels": 2},
+    {"name": "Simulated Speakers", "maxOutputChannels": 2},
+    {"name": "Simulated Headset", "maxOutputChannels": 2, "maxInputChannels": 2, "drift_ppm": 150},
+    {"name": "Simulated Microphone", "maxInputChannels": 2, "signal": "sine"},
+    {"name": "Simulated 48k Interface", "maxOutputChannels": 8, "maxInputChannels": 8, "defaultSampleRate": 48000.0, "rates": [48000]},
+]
 
 
 # --- Hotkey System ---
@@ -185,6 +281,131 @@ def get_pynput_key_string(key):
         return key.name
     return None
 
+def to_db(value):
+    return round(float(20 * np.log10(max(float(value), 1e-10))), 2)
+
+def analyze_audio(data, threshold_db=SILENCE_THRESHOLD_DB):
+    """Detects leading/trailing silence and measures peak, RMS and gated loudness of decoded PCM (frames x channels)."""
+    if not len(data): return {"frames": 0, "trim_start": 0, "trim_end": 0, "peak_db": to_db(0), "rms_db": to_db(0), "loudness_db": to_db(0)}
+    samples = np.abs(data, dtype=np.float32) * np.float32(INT16_SCALE if data.dtype == np.int16 else 1.0)
+    audible = np.flatnonzero(samples.max(axis=1) > 10 ** (threshold_db / 20))
+    padding = int(SAMPLE_RATE * TRIM_PADDING_MS / 1000)
+    trim_start = max(0, int(audible[0]) - padding) if len(audible) else 0
+    trim_end = min(len(data), int(audible[-1]) + 1 + padding) if len(audible) else len(data)
+    energy = np.square(samples, out=samples)
+    # BS.1770-style gating (absolute -70 dB, relative -10 dB) over 400 ms blocks, without K-weighting.
+    block = min(len(data), int(SAMPLE_RATE * LOUDNESS_BLOCK_SECONDS))
+    block_energy = energy[:len(data) // block * block].reshape(-1, block, data.shape[1]).mean(axis=1, dtype=np.float64).sum(axis=1)
+    gated = block_energy[block_energy > 10 ** (-70 / 10)]
+    if len(gated): gated = gated[gated > gated.mean() * 10 ** (-10 / 10)]
+    loudness = 10 * np.log10(gated.mean()) - 0.691 if len(gated) else -200.0
+    return {"frames": len(data), "trim_start": trim_start, "trim_end": trim_end, "peak_db": to_db(np.sqrt(energy.max())),
+            "rms_db": to_db(np.sqrt(energy.mean(dtype=np.float64))), "loudness_db": round(float(loudness), 2)}
+
+def get_waveform_path(sound_path):
+    return os.path.splitext(sound_path)[0] + WAVEFORM_SUFFIX
+
+def build_waveform_pyramid(data):
+    """Builds min/max peak levels (int8, finest first) so a thumbnail never needs more than WAVEFORM_LEVELS[0] points."""
+    finest = WAVEFORM_LEVELS[0]
+    peaks = np.zeros((finest, 2), dtype=np.int8)
+    if len(data):
+        edges = np.linspace(0, len(data), finest + 1).astype(np.int64)[:-1]
+        scale = 127 * (INT16_SCALE if data.dtype == np.int16 else 1.0)
+        peaks[:, 0] = np.clip(np.minimum.reduceat(data.min(axis=1), edges) * scale, -127, 127)
+        peaks[:, 1] = np.clip(np.maximum.reduceat(data.max(axis=1), edges) * scale, -127, 127)
+    levels = [peaks]
+    for _ in WAVEFORM_LEVELS[1:]:
+        pairs = levels[-1].reshape(-1, 2, 2)
+        levels.append(np.stack((pairs[:, :, 0].min(axis=1), pairs[:, :, 1].max(axis=1)), axis=1))
+    return np.concatenate(levels)
+
+def split_waveform_pyramid(stacked):
+    levels, offset = {}, 0
+    for bins in WAVEFORM_LEVELS:
+        levels[bins] = stacked[offset:offset + bins]
+        offset += bins
+    return levels
+
+def draw_waveform(canvas, pyramid, color):
+    """Draws the coarsest level that still fills the canvas width as one polygon; cost is independent of clip length."""
+    canvas.delete("waveform")
+    width, height = canvas.winfo_width(), canvas.winfo_height()
+    if not pyramid or width <= 1 or height <= 1: return
+    bins = next((b for b in reversed(WAVEFORM_LEVELS) if b * 2 >= width), WAVEFORM_LEVELS[0])
+    peaks, mid, step = pyramid[bins], height / 2, width / bins
+    xs = np.arange(bins) * step
+    top = np.column_stack((xs, mid - peaks[:, 1] * (mid / 127))).ravel()
+    bottom = np.column_stack((xs[::-1], mid - peaks[::-1, 0] * (mid / 127) + 1)).ravel()
+    canvas.create_polygon(*top.tolist(), *bottom.tolist(), fill=color, outline=color, tags="waveform")
+
+def scan_folders(folders, index):
+    """Walks folders with os.scandir and diffs path/size/mtime against index. Never opens or decodes a file."""
+    seen, unavailable = {}, []
+    for folder in folders:
+        stack = [folder]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False): stack.append(entry.path)
+                        elif entry.name.lower().endswith(WATCHED_EXTENSIONS):
+                            stat = entry.stat()
+                            seen[entry.path] = (stat.st_size, stat.st_mtime_ns)
+            except OSError as e:
+                logging.warning(f"Cannot scan watched folder '{current}': {e}")
+                if current == folder: unavailable.append(folder)
+    changed = [path for path, (size, mtime_ns) in seen.items() if (known := index.get(path)) is None or known["size"] != size or known["mtime_ns"] != mtime_ns]
+    # Files under an unreachable root (e.g. an offline share) are not reported as removed.
+    removed = [path for path in index if path not in seen and not any(path.startswith(os.path.join(root, '')) for root in unavailable)]
+    return {"seen": seen, "changed": changed, "removed": removed, "unavailable": unavailable}
+
+def _bank_align(n): return -(-n // BANK_ALIGNMENT) * BANK_ALIGNMENT
+
+def write_sound_bank(path, entries, global_hotkeys=None):
+    """Writes a JSON header/index followed by page-aligned int16 PCM and waveform blobs. entries: (metadata, pcm, waveform)."""
+    index, offset = [], 0
+    for metadata, pcm, waveform in entries:
+        record = {key: metadata[key] for key in BANK_METADATA_KEYS if key in metadata}
+        record["bank"] = {"offset": offset, "frames": len(pcm), "channels": pcm.shape[1]}
+        offset = record["bank"]["waveform_offset"] = _bank_align(offset + pcm.nbytes)
+        offset = _bank_align(offset + waveform.nbytes)
+        index.append(record)
+    header = json.dumps({"version": 1, "sample_rate": SAMPLE_RATE, "sounds": index, "global_hotkeys": global_hotkeys or {}}).encode("utf-8")
+    data_start = _bank_align(len(BANK_MAGIC) + 8 + len(header))
+    with open(path + ".part", 'wb') as f:
+        f.write(BANK_MAGIC + struct.pack('<Q', len(header)) + header)
+        for record, (_, pcm, waveform) in zip(index, entries):
+            f.seek(data_start + record["bank"]["offset"]); f.write(np.ascontiguousarray(pcm, dtype=np.int16).data)
+            f.seek(data_start + record["bank"]["waveform_offset"]); f.write(np.ascontiguousarray(waveform, dtype=np.int8).data)
+        f.truncate(data_start + offset)
+    os.replace(path + ".part", path)
+
+def open_sound_bank(path):
+    """Reads only the header and memory-maps the rest; sample data is paged in by the OS on first play."""
+    with open(path, 'rb') as f:
+        magic, header_len = f.read(len(BANK_MAGIC)), struct.unpack('<Q', f.read(8))[0]
+        if magic != BANK_MAGIC: raise ValueError("Not a WarpBoard sound bank.")
+        header = json.loads(f.read(header_len).decode("utf-8"))
+    if header.get("sample_rate") != SAMPLE_RATE: raise ValueError(f"Bank sample rate {header.get('sample_rate')} does not match {SAMPLE_RATE} Hz.")
+    data_start = _bank_align(len(BANK_MAGIC) + 8 + header_len)
+    mapping = np.memmap(path, dtype=np.uint8, mode='r') if os.path.getsize(path) > data_start else np.zeros(data_start, dtype=np.uint8)
+    return header, mapping[data_start:]
+
+def bank_pcm(blobs, bank_info):
+    start, frames, channels = bank_info["offset"], bank_info["frames"], bank_info["channels"]
+    return blobs[start:start + frames * channels * 2].view(np.int16).reshape(frames, channels)
+
+def profile_paths(profile_id):
+    """Config and library-index files of a profile; the default profile keeps the original single-board files."""
+    if profile_id == DEFAULT_PROFILE_ID: return CONFIG_FILE, LIBRARY_INDEX_FILE
+    return os.path.join(PROFILES_DIR, f"{profile_id}.json"), os.path.join(PROFILES_DIR, f"{profile_id}.library.json")
+
+def bank_waveform(blobs, bank_info):
+    start = bank_info["waveform_offset"]
+    return blobs[start:start + sum(WAVEFORM_LEVELS) * 2].view(np.int8).reshape(-1, 2)
+
 def center_window(win):
     """Centers a tkinter window on the screen."""
     win.update_idletasks()
@@ -247,6 +468,73 @@ class ToolTip(Toplevel):
     def hide(self):
         self.withdraw()
 
+class SoundCard(ttk.Frame):
+    """A recyclable sound card. The virtualized grid rebinds it to whichever sound scrolls into its slot."""
+    def __init__(self, canvas, app):
+        super().__init__(canvas, style='Card.TFrame', padding=10)
+        self.app, self.sound_id, self.position, self.playhead_x = app, None, None, None
+        self.columnconfigure(0, weight=1)
+
+        top_button_frame = ttk.Frame(self)
+        top_button_frame.grid(row=0, column=0, sticky=EW, pady=5)
+        top_button_frame.columnconfigure(0, weight=1)
+        self.play_btn = ttk.Button(top_button_frame, command=lambda: self.sound_id and app.play_sound(self.sound_id), bootstyle="success")
+        self.play_btn.grid(row=0, column=0, sticky=EW, ipady=5)
+        ttk.Button(top_button_frame, text="■", command=lambda: self.sound_id and app.stop_sound(self.sound_id), bootstyle="danger", width=3).grid(row=0, column=1, sticky="ns", padx=(5,0))
+
+        self.waveform_canvas = tk.Canvas(self, height=28, highlightthickness=0, background=app.style.colors.bg)
+        self.waveform_canvas.bind("<Configure>", lambda _: self.draw_waveform())
+        self.hotkey_var = tk.StringVar()
+        hotkey_label = ttk.Label(self, textvariable=self.hotkey_var, bootstyle="secondary", anchor="center")
+
+        bottom_frame = ttk.Frame(self)
+        self.loop_var = tk.BooleanVar()
+        loop_check = ttk.Checkbutton(bottom_frame, text="Loop", variable=self.loop_var, bootstyle="round-toggle", command=lambda: self.sound_id and app._update_sound_property_and_save(self.sound_id, "loop", self.loop_var.get()))
+        edit_btn = ttk.Button(bottom_frame, text="⚙", command=lambda: self.sound_id and app._open_edit_sound_menu(self.sound_id), bootstyle="light-outline", width=3)
+        self.active, self.activity_label = False, ttk.Label(bottom_frame, text="●", bootstyle="secondary")
+
+        self.waveform_canvas.grid(row=1, column=0, sticky=EW, pady=(0, 5))
+        hotkey_label.grid(row=2, column=0, sticky=EW)
+        bottom_frame.grid(row=3, column=0, sticky=EW, pady=(10, 0))
+        bottom_frame.columnconfigure(0, weight=1)
+        bottom_frame.columnconfigure(2, weight=1)
+        loop_check.grid(row=0, column=0, sticky=W)
+        self.activity_label.grid(row=0, column=1)
+        edit_btn.grid(row=0, column=2, sticky=E)
+
+        self.item = canvas.create_window(0, 0, window=self, anchor="nw", state="hidden")
+        ToolTip(self, lambda: app.get_sound_tooltip_text(self.sound_id))
+        for widget in [self, hotkey_label, bottom_frame, top_button_frame, self.waveform_canvas]:
+            widget.bind("<Button-1>", lambda e: self.sound_id and app._on_card_click(e, self.sound_id))
+
+    def bind_sound(self, sound, selected):
+        self.sound_id = sound["id"]
+        self.play_btn.configure(text=sound['name'][:MAX_DISPLAY_NAME_LENGTH], state="normal" if sound.get("enabled", True) else "disabled")
+        self.hotkey_var.set(get_hotkey_display_string(sound['hotkeys']))
+        self.loop_var.set(sound.get("loop", False))
+        self.state(['selected'] if selected else ['!selected'])
+        self.set_active(self.sound_id in self.app._playing_voices)
+        self.set_progress(None)
+        self.draw_waveform()
+
+    def set_active(self, active):
+        if active != self.active:
+            self.active = active
+            self.activity_label.configure(bootstyle="success" if active else "secondary")
+
+    def set_progress(self, fraction):
+        """Moves the playhead over the waveform to fraction (0..1), or removes it for None; unchanged pixels are skipped."""
+        x = None if fraction is None else int(fraction * self.waveform_canvas.winfo_width())
+        if x == self.playhead_x: return
+        self.playhead_x = x
+        if x is None: self.waveform_canvas.delete("playhead")
+        elif self.waveform_canvas.find_withtag("playhead"): self.waveform_canvas.coords("playhead", x, 0, x, self.waveform_canvas.winfo_height())
+        else: self.waveform_canvas.create_line(x, 0, x, self.waveform_canvas.winfo_height(), fill=self.app.style.colors.warning, width=2, tags="playhead")
+
+    def draw_waveform(self):
+        draw_waveform(self.waveform_canvas, self.app.sound_manager.waveform_cache.get(self.sound_id), self.app.style.colors.info)
+        self.waveform_canvas.tag_raise("playhead")
+
 class HotkeyRecorder(Toplevel):
     def __init__(self, parent, target_name, on_complete_callback):
         super().__init__(parent)
@@ -314,6 +602,286 @@ class HotkeyRecorder(Toplevel):
         if self.timeout_id: self.after_cancel(self.timeout_id)
         self._stop_listeners(); self.on_complete_callback(None); self.destroy()
 
+# --- Metrics ---
+class MetricSamples:
+    """Fixed ring of the most recent float samples; add() is one store and one increment, so it is safe on the audio thread."""
+    def __init__(self, capacity=METRICS_SAMPLE_CAPACITY):
+        self.values, self.total, self._reported = np.zeros(capacity, dtype=np.float64), 0, 0
+    def add(self, value):
+        self.values[self.total % len(self.values)] = value; self.total += 1
+    def recent(self):
+        """Samples added since the previous call, oldest dropped if more than the ring holds."""
+        total, size = self.total, len(self.values)
+        count = min(total - self._reported, size); self._reported = total
+        start = (total - count) % size
+        return np.concatenate((self.values[start:], self.values[:(start + count) % size])) if start + count > size else self.values[start:start + count].copy()
+    def summary(self, samples=None):
+        samples = self.recent() if samples is None else samples
+        if not len(samples): return {"count": 0}
+        p50, p95, p99 = np.percentile(samples, (50, 95, 99))
+        return {"count": len(samples), "p50": round(p50, 3), "p95": round(p95, 3), "p99": round(p99, 3), "max": round(float(samples.max()), 3)}
+
+class Metrics:
+    """Process-wide counters and sample rings, all allocated up front so collection can stay on in production.
+    Counters are plain ints bumped under the GIL; a rare lost increment across threads is accepted over a lock."""
+    def __init__(self):
+        self.samples = {name: MetricSamples() for name in METRIC_SAMPLES}
+        self.counters = dict.fromkeys(METRIC_COUNTERS, 0)
+        self._triggers = {}
+    def count(self, name, amount=1): self.counters[name] += amount
+    def observe(self, name, value): self.samples[name].add(value)
+    def timed(self, name, start): self.samples[name].add((time.perf_counter() - start) * 1000)
+    def trigger(self, sound_id):
+        """Marks a hotkey press; the sound's next voice start closes the hotkey-to-audio latency sample."""
+        self.counters["hotkeys"] += 1; self._triggers[sound_id] = time.perf_counter()
+    def voice_started(self, sound_id, stamp):
+        pressed = self._triggers.pop(sound_id, None)
+        if pressed is not None and stamp >= pressed: self.samples["hotkey_latency_ms"].add((stamp - pressed) * 1000)
+    def drain_audio(self):
+        """Callback samples and counters since the last drain, for forwarding from the engine process."""
+        return {"callback_ms": self.samples["callback_ms"].recent(), "stream_recovery_ms": self.samples["stream_recovery_ms"].recent(), "counters": {k: self.counters[k] for k in ("callbacks", "callback_overruns", "output_underflows", "monitor_underruns", "monitor_overflows")}}
+    def merge_audio(self, payload):
+        for name in ("callback_ms", "stream_recovery_ms"):
+            for value in payload.get(name, ()): self.samples[name].add(value)
+        self.counters.update(payload["counters"])
+
+METRICS = Metrics()
+
+class MetricsExporter:
+    """Every METRICS_INTERVAL_SECONDS appends one JSON line to METRICS_FILE (rotated to .1 past METRICS_MAX_FILE_BYTES) and,
+    when given a port, serves the latest snapshot as Prometheus text on localhost."""
+    def __init__(self, app, port=None):
+        self.app, self.latest, self._stop_event, self.server = app, {}, Event(), None
+        if port:
+            try:
+                self.server = http.server.ThreadingHTTPServer((CONTROL_HOST, port), MetricsRequestHandler); self.server.exporter = self
+                threading.Thread(target=self.server.serve_forever, daemon=True).start()
+                logging.info(f"Prometheus metrics on http://{CONTROL_HOST}:{port}/metrics")
+            except OSError as e: logging.error(f"Could not serve metrics on port {port}: {e}"); self.server = None
+        threading.Thread(target=self._run, daemon=True, name="MetricsExporter").start()
+
+    def snapshot(self):
+        sound_manager, mixer, counters = self.app.sound_manager, self.app.audio_manager.mixer, dict(METRICS.counters)
+        cache = list(sound_manager.sound_data_cache.values())
+        lookups = counters["cache_hits"] + counters["cache_misses"]
+        return {"ts": round(time.time(), 3), "interval_s": METRICS_INTERVAL_SECONDS, **{name: METRICS.samples[name].summary() for name in METRIC_SAMPLES}, **counters,
+                "voices": len(mixer.voice_snapshot), "cache_entries": len(cache), "cache_bytes": sum(d.nbytes for d in cache),
+                "cache_hit_rate": round(counters["cache_hits"] / lookups, 4) if lookups else None, "import_queue_depth": sound_manager.import_queue_depth()}
+
+    def _write(self, record):
+        if os.path.exists(METRICS_FILE) and os.path.getsize(METRICS_FILE) > METRICS_MAX_FILE_BYTES: os.replace(METRICS_FILE, METRICS_FILE + ".1")
+        with open(METRICS_FILE, "a") as f: f.write(json.dumps(record) + "\n")
+
+    def _run(self):
+        while not self._stop_event.wait(METRICS_INTERVAL_SECONDS):
+            try: self.latest = self.snapshot(); self._write(self.latest)
+            except Exception as e: logging.error(f"Failed to export metrics: {e}")
+
+    def prometheus_text(self):
+        lines = []
+        for key, value in self.latest.items():
+            if isinstance(value, dict):
+                for stat, number in value.items(): lines.append(f"warpboard_{key}{{stat=\"{stat}\"}} {number}")
+            elif isinstance(value, (int, float)) and key not in ("ts", "interval_s"):
+                lines.append(f"warpboard_{key} {value}")
+        return "\n".join(lines) + "\n"
+
+    def stop(self):
+        self._stop_event.set()
+        if self.server: self.server.shutdown(); self.server.server_close()
+
+class MetricsRequestHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics": self.send_error(404); return
+        body = self.server.exporter.prometheus_text().encode()
+        self.send_response(200); self.send_header("Content-Type", "text/plain; version=0.0.4"); self.send_header("Content-Length", str(len(body))); self.end_headers()
+        self.wfile.write(body)
+    def log_message(self, *_): pass
+
+# --- Audio Backends ---
+def create_audio_backend(name=None):
+    """Returns the PyAudio-compatible backend named by `name`, or by WARPBOARD_AUDIO_BACKEND so a spawned engine
+    process picks the same one. The simulated backend reads its keyword arguments from WARPBOARD_SIM_CONFIG (JSON)."""
+    name = name or os.environ.get("WARPBOARD_AUDIO_BACKEND", "pyaudio")
+    if name == "simulated": return SimulatedAudioBackend(**json.loads(os.environ.get("WARPBOARD_SIM_CONFIG") or "{}"))
+    if name != "pyaudio": raise ValueError(f"Unknown audio backend '{name}', expected one of {AUDIO_BACKENDS}")
+    return pyaudio.PyAudio()
+
+def audio_device_key(info): return info["name"], info.get("maxInputChannels", 0) > 0, info.get("maxOutputChannels", 0) > 0
+
+def probe_audio_devices():
+    """Enumerates audio devices in a fresh process and returns their audio_device_key()s, or None if that failed.
+    PortAudio only enumerates when initialised, so this is how a running backend sees hot-plugged devices without
+    stopping its own streams."""
+    fd, out_path = tempfile.mkstemp(suffix=".json"); os.close(fd)
+    command = [sys.executable] + ([] if getattr(sys, 'frozen', False) else [os.path.abspath(__file__)]) + ["--probe-audio-devices", out_path]
+    try:
+        subprocess.run(command, capture_output=True, timeout=STREAM_PROBE_TIMEOUT, creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+        with open(out_path) as f: return {tuple(key) for key in json.load(f)}
+    except (OSError, ValueError, subprocess.TimeoutExpired) as e: logging.warning(f"Audio device probe failed: {e}"); return None
+    finally:
+        try: os.remove(out_path)
+        except OSError: pass
+
+class SimulatedAudioBackend:
+    """Stands in for pyaudio.PyAudio with virtual devices, so the audio path runs without a sound card.
+    With clock="wall" every callback stream is driven by its own timer thread at the device's (drifting) rate;
+    with clock="manual" nothing moves until advance() is called, which makes a run fully deterministic.
+    Output streams keep their last SIMULATED_CAPTURE_SECONDS of audio for inspection via captured()."""
+    # Plugging shows up in the device info ("present") at once; PyAudio only sees it after a re-initialisation or in probe_audio_devices().
+    live_device_list = True
+    def __init__(self, devices=None, clock="wall", seed=0, capture_seconds=SIMULATED_CAPTURE_SECONDS):
+        if clock not in ("wall", "manual"): raise ValueError(f"Unknown clock '{clock}'")
+        defaults = {"maxInputChannels": 0, "maxOutputChannels": 0, "defaultSampleRate": float(SAMPLE_RATE), "rates": None, "drift_ppm": 0.0, "xrun_every": 0, "signal": "silence", "present": True}
+        self.devices = [dict(defaults, **device, index=i, hostApi=0) for i, device in enumerate(SIMULATED_DEVICES if devices is None else devices)]
+        for device in self.devices: device["rates"] = device["rates"] or [int(device["defaultSampleRate"])]
+        self.clock, self.capture_seconds, self.rng, self.streams, self.now = clock, capture_seconds, np.random.default_rng(seed), [], 0.0
+        self.closed_captures = {}  # device index -> captures of its closed output streams, so a restarted stream keeps history
+
+    def _device(self, index):
+        if index is None or not 0 <= index < len(self.devices): raise OSError(-9996, "Invalid device index")
+        return self.devices[index]
+    def get_device_count(self): return len(self.devices)
+    def get_device_info_by_index(self, index): return dict(self._device(index))
+    def _default_device(self, key):
+        device = next((d for d in self.devices if d["present"] and d[key]), None)
+        if device is None: raise OSError(-9996, "No default device")
+        return device
+    def get_default_output_device_info(self): return dict(self._default_device("maxOutputChannels"))
+    def get_default_input_device_info(self): return dict(self._default_device("maxInputChannels"))
+    def is_format_supported(self, rate, input_device=None, input_channels=None, input_format=None, output_device=None, output_channels=None, output_format=None):
+        for index, channels, key in ((input_device, input_channels, "maxInputChannels"), (output_device, output_channels, "maxOutputChannels")):
+            if index is None: continue
+            device = self._device(index)
+            if not device["present"]: raise ValueError("Device unavailable", -9985)
+            if not channels or channels > device[key]: raise ValueError("Invalid number of channels", -9998)
+            if int(rate) not in device["rates"]: raise ValueError("Invalid sample rate", -9997)
+        return True
+
+    def open(self, rate, channels, format, input=False, output=False, input_device_index=None, output_device_index=None, frames_per_buffer=1024, stream_callback=None, start=True, **_):
+        key = "maxOutputChannels" if output else "maxInputChannels"
+        index = output_device_index if output else input_device_index
+        device = self._default_device(key) if index is None else self._device(index)
+        if not device["present"]: raise OSError(-9999, "Unanticipated host error")
+        if not 0 < channels <= device[key]: raise OSError(-9998, "Invalid number of channels")
+        if int(rate) not in device["rates"]: raise OSError(-9997, "Invalid sample rate")
+        stream = SimulatedStream(self, device, int(rate), channels, frames_per_buffer, bool(output), stream_callback)
+        self.streams.append(stream)
+        if start: stream.start_stream()
+        return stream
+
+    def advance(self, seconds):
+        """Manual clock: moves simulated time on by `seconds`, running every due callback in deadline order so streams
+        interleave the way they would on real hardware."""
+        target = self.now + seconds
+        while True:
+            due = [s for s in self.streams if s.callback and s.is_active() and s.next_due <= target]
+            if not due: break
+            stream = min(due, key=lambda s: s.next_due)
+            self.now = stream.next_due; stream.next_due += stream.period; stream._tick()
+        self.now = target
+        for stream in list(self.streams): stream.wake()
+    def inject_xrun(self, index, count=1):
+        """Makes the next `count` callbacks of every stream on device `index` report an xrun."""
+        for stream in self.streams_on(index): stream.pending_xruns += count
+    def set_device_present(self, index, present):
+        """Plugs or unplugs a virtual device; unplugging stops its streams the way a vanished device does."""
+        device = self._device(index); device["present"] = present
+        if not present:
+            for stream in self.streams_on(index): stream.fail()
+    def streams_on(self, index): return [s for s in self.streams if s.device["index"] == index]
+    def captured(self, index):
+        """The output captured on device `index` across all its streams, oldest first."""
+        blocks = self.closed_captures.get(index, []) + [s.captured() for s in self.streams_on(index) if s.output]
+        return np.concatenate(blocks) if blocks else np.zeros((0, CHANNELS), dtype=np.float32)
+    def terminate(self):
+        for stream in list(self.streams): stream.close()
+
+class SimulatedStream:
+    """One open stream of SimulatedAudioBackend. Callback streams run the callback once per simulated period;
+    blocking input streams hand out frames from read() no faster than the device would produce them."""
+    def __init__(self, backend, device, rate, channels, frames_per_buffer, output, callback):
+        self.backend, self.device, self.rate, self.channels, self.frames_per_buffer = backend, device, rate, channels, frames_per_buffer
+        self.output, self.callback = output, callback
+        # Drift is applied to the device clock: +100 ppm means the device consumes or produces 100 ppm more frames than nominal.
+        self.device_rate = rate * (1 + device["drift_ppm"] / 1e6)
+        self.period = frames_per_buffer / self.device_rate
+        self.callbacks, self.xruns, self.pending_xruns, self.frames_read = 0, 0, 0, 0
+        self._capture = deque(maxlen=max(1, int(backend.capture_seconds * rate / frames_per_buffer)))
+        self._phase, self._active, self._closed, self._thread = 0, False, False, None
+        self._cond, self._started_at, self.next_due = threading.Condition(), 0.0, 0.0
+
+    def _clock(self): return self.backend.now if self.backend.clock == "manual" else time.perf_counter()
+    def start_stream(self):
+        if self._active or self._closed: return
+        self._active, self._started_at = True, self._clock()
+        self.next_due = self._started_at + self.period
+        if self.callback and self.backend.clock == "wall":
+            self._thread = threading.Thread(target=self._run, daemon=True, name=f"SimulatedStream-{self.device['name']}"); self._thread.start()
+    def _run(self):
+        deadline = time.perf_counter()
+        while self._active:
+            deadline += self.period
+            self._tick()
+            delay = deadline - time.perf_counter()
+            if delay > 0: time.sleep(delay)
+            # A callback that overran its period is an underflow for real hardware too; report it on the next one.
+            elif delay < -self.period: self.pending_xruns += 1; deadline = time.perf_counter()
+
+    def _tick(self):
+        status, self.callbacks = 0, self.callbacks + 1
+        xrun_every = self.device["xrun_every"]
+        if self.pending_xruns or (xrun_every and self.callbacks % xrun_every == 0):
+            self.pending_xruns, self.xruns = max(0, self.pending_xruns - 1), self.xruns + 1
+            status = pyaudio.paOutputUnderflow if self.output else pyaudio.paInputOverflow
+            # The device played a block of silence while the host was late; keep it so the capture shows the gap.
+            if self.output: self._capture.append(np.zeros((self.frames_per_buffer, self.channels), dtype=np.float32))
+        in_data = None if self.output else self._signal(self.frames_per_buffer).tobytes()
+        now = self.callbacks * self.period
+        data, flag = self.callback(in_data, self.frames_per_buffer, {"input_buffer_adc_time": now, "current_time": now, "output_buffer_dac_time": now + self.period}, status)
+        if self.output: self._capture.append(np.frombuffer(data, dtype=np.float32).reshape(-1, self.channels).copy())
+        if flag != pyaudio.paContinue: self._active = False
+
+    def read(self, num_frames, exception_on_overflow=True):
+        """Blocks until the device has produced num_frames more frames; on the manual clock that means until advance()."""
+        if self.output: raise OSError(-9974, "Not input stream")
+        with self._cond:
+            while self._active:
+                delay = self._started_at + (self.frames_read + num_frames) / self.device_rate - self._clock()
+                if delay <= 0: break
+                self._cond.wait(0.1 if self.backend.clock == "manual" else delay)
+            if not self._active: raise OSError(-9988, "Stream closed")
+        self.frames_read += num_frames
+        return self._signal(num_frames).tobytes()
+
+    def _signal(self, frames):
+        kind = self.device["signal"]
+        if kind == "sine":
+            t = (self._phase + np.arange(frames)) / self.rate
+            block = np.repeat((0.25 * np.sin(2 * np.pi * 440.0 * t)).astype(np.float32)[:, None], self.channels, axis=1)
+        elif kind == "noise": block = (self.backend.rng.standard_normal((frames, self.channels)) * 0.05).astype(np.float32)
+        else: block = np.zeros((frames, self.channels), dtype=np.float32)
+        self._phase += frames
+        return block
+
+    def captured(self): return np.concatenate(self._capture) if self._capture else np.zeros((0, self.channels), dtype=np.float32)
+    def is_active(self): return self._active
+    def is_stopped(self): return not self._active
+    def get_output_latency(self): return self.period if self.output else 0.0
+    def get_input_latency(self): return 0.0 if self.output else self.period
+    def wake(self):
+        with self._cond: self._cond.notify_all()
+    def fail(self):
+        with self._cond: self._active = False; self._cond.notify_all()
+    def stop_stream(self):
+        self.fail()
+        if self._thread and self._thread is not threading.current_thread(): self._thread.join(timeout=1.0)
+    def close(self):
+        self.stop_stream(); self._closed = True
+        if self in self.backend.streams:
+            self.backend.streams.remove(self)
+            if self.output: self.backend.closed_captures.setdefault(self.device["index"], []).append(self.captured())
+
 # --- Core Logic Classes ---
 class DependencyChecker:
     @staticmethod
@@ -338,89 +906,435 @@ class AppSettingsManager:
         return {}
     def save_settings(self, settings_dict):
         self.settings.update(settings_dict)
+        start = time.perf_counter()
         try:
             with open(APP_SETTINGS_FILE, 'w') as f: json.dump(self.settings, f, indent=4)
         except IOError as e: logging.error(f"Failed to save app settings: {e}")
+        METRICS.timed("config_save_ms", start)
     def get_setting(self, key, default=None): return self.settings.get(key, default)
 
+class SoundSearchIndex:
+    """Trigram index over sound names and tags. Substring matches rank by position; fuzzy trigram matches fill in after them."""
+    def __init__(self): self.texts, self.trigrams, self.chars = {}, defaultdict(set), defaultdict(set)
+    @staticmethod
+    def _padded_trigrams(text):
+        padded = f"  {text} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+    def add(self, sound_id, name, tags=()):
+        self.remove(sound_id)
+        text = self.texts[sound_id] = " ".join([name, *tags]).lower()
+        for gram in self._padded_trigrams(text): self.trigrams[gram].add(sound_id)
+        for char in set(text): self.chars[char].add(sound_id)
+    def remove(self, sound_id):
+        text = self.texts.pop(sound_id, None)
+        if text is None: return
+        for gram in self._padded_trigrams(text): self.trigrams[gram].discard(sound_id)
+        for char in set(text): self.chars[char].discard(sound_id)
+    def rebuild(self, sounds):
+        self.texts.clear(); self.trigrams.clear(); self.chars.clear()
+        for sound in sounds: self.add(sound["id"], sound["name"], sound.get("tags", []))
+    def search(self, query):
+        query = query.lower().strip()
+        if not query: return []
+        if len(query) >= 3: postings = [self.trigrams.get(query[i:i + 3], set()) for i in range(len(query) - 2)]
+        else: postings = [self.chars.get(char, set()) for char in set(query)]
+        postings.sort(key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        exact = []
+        for sound_id in candidates:
+            text = self.texts[sound_id]
+            position = text.find(query)
+            if position >= 0: exact.append((0 if position == 0 else 1 if text[position - 1] == " " else 2, text, sound_id))
+        results = [sound_id for *_, sound_id in sorted(exact)]
+        if len(query) >= 3 and len(results) < SEARCH_FUZZY_MIN_RESULTS:
+            query_grams, matched = self._padded_trigrams(query), set(results)
+            shared = Counter(sound_id for gram in query_grams for sound_id in self.trigrams.get(gram, ()))
+            fuzzy = [(-count, self.texts[sound_id], sound_id) for sound_id, count in shared.items() if sound_id not in matched and count >= len(query_grams) * SEARCH_FUZZY_THRESHOLD]
+            results += [sound_id for *_, sound_id in sorted(fuzzy)]
+        return results
+
+class MasterBus:
+    """Block output stage: a per-block gain ramp toward the target gain, then optionally a look-ahead peak limiter.
+    The limiter delays audio by LIMITER_LOOKAHEAD - 1 frames. Gain falls linearly over that window ahead of a peak and
+    recovers at a bounded rate, so the output never exceeds LIMITER_CEILING. Every buffer is allocated up front."""
+    def __init__(self, limit=True, gain=1.0):
+        self.limit, self.gain, self.target_gain = limit, gain, gain
+        self.latency = LIMITER_LOOKAHEAD - 1 if limit else 0
+        delay = LIMITER_LOOKAHEAD - 1
+        self._tail, self._req_tail, self._min_tail = np.zeros((delay, CHANNELS), np.float32), np.ones(delay, np.float32), np.ones(delay, np.float64)
+        self._release_step, self._last_gain = 1.0 / LIMITER_RELEASE_FRAMES, 1.0
+        self._allocate(FRAME_SIZE)
+    def _allocate(self, frames):
+        span = LIMITER_LOOKAHEAD - 1 + frames
+        self._index_ramp, self._ramp = np.arange(frames, dtype=np.float32), np.empty(frames, np.float32)
+        self._work, self._abs, self._peak = np.empty((span, CHANNELS), np.float32), np.empty((frames, CHANNELS), np.float32), np.empty(frames, np.float32)
+        self._req, self._ping, self._pong = np.empty(span, np.float32), np.empty(span, np.float32), np.empty(span, np.float32)
+        self._mins, self._csum, self._env = np.empty(span, np.float64), np.empty(span + 1, np.float64), np.empty(frames, np.float64)
+        self._release_ramp = np.arange(frames, dtype=np.float64) * self._release_step
+    def set_gain(self, gain): self.target_gain = gain
+    def process(self, block):
+        """Processes block (frames x CHANNELS float32) in place and returns it."""
+        n = len(block)
+        if len(self._index_ramp) < n: self._allocate(n)
+        if self.target_gain != self.gain:
+            ramp = self._ramp[:n]
+            np.multiply(self._index_ramp[:n], (self.target_gain - self.gain) / n, out=ramp); ramp += self.gain
+            block *= ramp[:, None]; self.gain = self.target_gain
+        elif self.gain != 1.0: block *= self.gain
+        if not self.limit or not n: return block
+        delay, window = LIMITER_LOOKAHEAD - 1, LIMITER_LOOKAHEAD
+        work, req = self._work[:delay + n], self._req[:delay + n]
+        work[:delay], work[delay:], req[:delay] = self._tail, block, self._req_tail
+        # Gain each frame needs to stay under the ceiling.
+        peak, magnitude = self._peak[:n], np.abs(block, out=self._abs[:n])
+        # Column-wise maximum; np.max over a 2-wide axis is an order of magnitude slower.
+        peak[:] = magnitude[:, 0]
+        for channel in range(1, CHANNELS): np.maximum(peak, magnitude[:, channel], out=peak)
+        np.maximum(peak, LIMITER_CEILING, out=peak); np.divide(LIMITER_CEILING, peak, out=req[delay:])
+        # Sliding minimum over the look-ahead window by doubling: after each pass src[i] = min(req[i:i + 2 * shift]).
+        src, length, shift, buffers = req, delay + n, 1, (self._ping, self._pong)
+        while shift < window:
+            length -= shift
+            dst = buffers[shift.bit_length() % 2][:length]
+            np.minimum(src[:length], src[shift:shift + length], out=dst)
+            src, shift = dst, shift * 2
+        # Averaging the last window of minima gives a linear attack that still reaches each peak's gain in time.
+        mins, csum, env = self._mins[:delay + n], self._csum[:delay + n + 1], self._env[:n]
+        mins[:delay], mins[delay:] = self._min_tail, src
+        csum[0] = 0.0; np.cumsum(mins, out=csum[1:])
+        np.subtract(csum[window:window + n], csum[:n], out=env); env /= window
+        # Release: g[i] = min(env[i], g[i - 1] + step), solved for the whole block with one running minimum.
+        release = self._release_ramp[:n]
+        env -= release; env[0] = min(env[0], self._last_gain + self._release_step)
+        np.minimum.accumulate(env, out=env); env += release
+        self._last_gain = env[-1]
+        np.multiply(work[:n], env[:, None], out=block)
+        self._tail[:], self._req_tail[:], self._min_tail[:] = work[n:], req[n:], mins[n:]
+        return block
+
 class MixingBuffer:
-    def __init__(self): self.sounds, self.lock, self.single_sound_mode = deque(), Lock(), False
-    def set_single_sound_mode(self, enabled):
-        with self.lock: self.single_sound_mode = enabled
-    def add_sound(self, data, volume, loop, sound_id, sound_name):
-        with self.lock:
-            if self.single_sound_mode:
-                self.sounds.clear()
-            elif not loop:
-                self.sounds = deque(s for s in self.sounds if s["id"] != sound_id)
-
-            self.sounds.append({"id": sound_id, "data": data, "volume": volume, "loop": loop, "index": 0, "name": sound_name})
+    def __init__(self, limit=True):
+        self.sounds, self.single_sound_mode = deque(), False
+        # Commands from other threads, applied by mix_audio at the top of the next block; deque append/popleft are atomic,
+        # so the audio thread never takes a lock. Cues stay in _opening until a cue snapshot has reported them.
+        self._commands, self._opening, self._opened = deque(), set(), []
+        self.max_voices, self.steal_policy = DEFAULT_MAX_VOICES, "oldest"
+        self._fade_ramp = np.linspace(1.0, 0.0, VOICE_FADE_FRAMES, endpoint=False, dtype=np.float32)
+        # Without limit the bus passes the mix through, for owners that limit later in their own chain.
+        self.bus = MasterBus(limit)
+        # Voice start/stop events for the UI; deque append/popleft are atomic, so the audio thread never waits on a consumer.
+        self.voice_events, self.voice_events_overflowed = deque(maxlen=VOICE_EVENT_CAPACITY), False
+        # Read-only per-voice state, replaced wholesale once per block so readers never see a half-updated voice.
+        self.voice_snapshot = ()
+        # Cue id -> follow-up voices; the next one starts sample-accurately when the cue's current voice ends.
+        self.cues, self.cue_snapshot = {}, {}
+        self._allocate_scratch(FRAME_SIZE)
+    def _allocate_scratch(self, frames):
+        self._scratch, self._mono_scratch, self._mono_bus = np.empty((frames, CHANNELS), dtype=np.float32), np.empty(frames, dtype=np.float32), np.empty(frames, dtype=np.float32)
+        self._gain_scratch, self._index_ramp = np.empty(frames, dtype=np.float32), np.arange(frames, dtype=np.float32)
+    def set_single_sound_mode(self, enabled): self._commands.append((self._set_single_sound_mode, (enabled,)))
+    def _set_single_sound_mode(self, enabled): self.single_sound_mode = enabled
+    def set_voice_limit(self, max_voices, steal_policy="oldest"):
+        self._commands.append((self._set_voice_limit, (max(1, int(max_voices)), steal_policy if steal_policy in VOICE_STEAL_POLICIES else "oldest")))
+    def _set_voice_limit(self, max_voices, steal_policy): self.max_voices, self.steal_policy = max_voices, steal_policy
+    def _publish(self, kind, sound):
+        if len(self.voice_events) == VOICE_EVENT_CAPACITY: self.voice_events_overflowed = True
+        self.voice_events.append((kind, sound["id"], sound["name"], time.perf_counter()))
+    def _retire(self, sounds):
+        for sound in sounds:
+            if sound["started"]: self._publish("stop", sound)
+    def active_voices(self): return [(v["id"], v["name"]) for v in self.voice_snapshot if v["started"]]
+    def idle(self):
+        """Whether no voice plays and no command waits for the next block; exact only on the thread that calls mix_audio."""
+        return not self.sounds and not self._commands
+    def _voice(self, data, volume, loop, sound_id, sound_name, cue=None, delay=0):
+        return {"id": sound_id, "data": data, "volume": volume, "scale": INT16_SCALE if data.dtype == np.int16 else 1.0, "loop": loop, "index": 0, "name": sound_name,
+                "started": False, "fade": None, "target": volume, "cue": cue, "delay": delay}
+    def add_sound(self, data, volume, loop, sound_id, sound_name, max_voices=1, cue=None):
+        """Starts a voice at the next block, first stealing the oldest copies of the same sound past max_voices, then voices
+        past the global limit by the steal policy. Stolen voices fade out over VOICE_FADE_FRAMES, and at most max_voices
+        may be fading. A cue id opens a cue that queue_cue can extend."""
+        if cue is not None: self._opening.add(cue)
+        self._commands.append((self._add_sound, (data, volume, loop, sound_id, sound_name, max_voices, cue)))
+    def _add_sound(self, data, volume, loop, sound_id, sound_name, max_voices, cue):
+        live = [s for s in self.sounds if s["fade"] is None]
+        if self.single_sound_mode: stolen = live
+        else:
+            same = [s for s in live if s["id"] == sound_id]
+            stolen = same[:max(0, len(same) - max(1, max_voices) + 1)]
+            # Voices are compared by identity: == on the dicts would compare their numpy data.
+            stolen_ids = {id(s) for s in stolen}
+            live = [s for s in live if id(s) not in stolen_ids]
+            if len(live) >= self.max_voices:
+                victims = live if self.steal_policy == "oldest" else sorted(live, key=self._level)
+                stolen += victims[:len(live) - self.max_voices + 1]
+        for sound in stolen: sound["fade"] = 0
+        fading = [s for s in self.sounds if s["fade"] is not None]
+        if len(fading) > self.max_voices:
+            cut = fading[:len(fading) - self.max_voices]
+            cut_ids = {id(s) for s in cut}
+            self._retire(cut); self.sounds = deque(s for s in self.sounds if id(s) not in cut_ids)
+
+        if cue is not None: self.cues[cue] = deque(); self._opened.append(cue)
+        self.sounds.append(self._voice(data, volume, loop, sound_id, sound_name, cue))
+    def _level(self, sound):
+        """Peak of the block a voice plays next, after its gain; the "quietest" policy steals by this, not the set volume."""
+        chunk = sound["data"][sound["index"]:sound["index"] + FRAME_SIZE]
+        # float() first: negating the int16 minimum would overflow.
+        return max(float(chunk.max()), -float(chunk.min())) * sound["volume"] * sound["scale"] if len(chunk) else 0.0
+    def queue_cue(self, data, volume, sound_id, sound_name, cue, gap_frames=0):
+        """Queues a voice to start gap_frames after the cue's current voice ends; returns False once the cue has ended."""
+        if cue not in self._opening and cue not in self.cue_snapshot: return False
+        self._commands.append((self._queue_cue, (data, volume, sound_id, sound_name, cue, gap_frames)))
+        return True
+    def _queue_cue(self, data, volume, sound_id, sound_name, cue, gap_frames):
+        if cue in self.cues: self.cues[cue].append(self._voice(data, volume, False, sound_id, sound_name, cue, max(0, int(gap_frames))))
+    def stop_cue(self, cue): self._commands.append((self._stop_cue, (cue,)))
+    def _stop_cue(self, cue):
+        self.cues.pop(cue, None)
+        for sound in self.sounds:
+            if sound["cue"] == cue and sound["fade"] is None: sound["fade"] = 0
+    def collect_playing(self, done):
+        """Calls done, from the audio thread at the next block, with the ids of the arrays its voices and cues still hold."""
+        self._commands.append((self._collect_playing, (done,)))
+    def _collect_playing(self, done): done({id(s["data"]) for s in self.sounds} | {id(s["data"]) for queued in self.cues.values() for s in queued})
+    def _accumulate(self, mixed, offset, chunk, gain):
+        # Scaling to float32 happens in preallocated scratch; mono voices sum into a mono bus that is upmixed once per block.
+        # gain is a scalar, or a per-frame ramp for a fading voice.
+        n = len(chunk)
+        if chunk.shape[1] == 1:
+            scaled = self._mono_scratch[:n]
+            np.multiply(chunk[:, 0], gain, out=scaled)
+            self._mono_bus[offset:offset + n] += scaled
+        else:
+            scaled = self._scratch[:n]
+            np.multiply(chunk, gain[:, None] if isinstance(gain, np.ndarray) else gain, out=scaled)
+            mixed[offset:offset + n] += scaled
     def mix_audio(self, frames):
-        with self.lock:
-            mixed = np.zeros((frames, CHANNELS), dtype=np.float32)
-            sounds_to_remove, playing_names = [], []
-            for sound in list(self.sounds):
-                start, end, data_len = sound["index"], sound["index"] + frames, len(sound["data"])
-                chunk = sound["data"][start:end]
-                actual_chunk_len = len(chunk)
-                if actual_chunk_len < frames:
-                    if sound["loop"]:
-                        remaining_frames = frames - actual_chunk_len
-                        sound["index"] = remaining_frames % data_len
-                        while remaining_frames > 0:
-                            frames_to_take = min(remaining_frames, data_len)
-                            chunk = np.concatenate((chunk, sound["data"][0:frames_to_take]))
-                            remaining_frames -= frames_to_take
-                    else:
-                        sounds_to_remove.append(sound)
-                        chunk = np.pad(chunk, ((0, frames - actual_chunk_len), (0, 0)), 'constant')
-                else: sound["index"] = end % data_len if sound["loop"] else end
-                mixed += chunk * sound["volume"]
-                if sound not in sounds_to_remove: playing_names.append(sound["name"])
-            for sound in list(sounds_to_remove):
-                if sound in self.sounds: self.sounds.remove(sound)
-            np.clip(mixed, -1.0, 1.0, out=mixed)
-            return mixed, playing_names
-    def clear_sounds(self):
-        with self.lock: self.sounds.clear()
+        commands = self._commands
+        while commands:
+            command, args = commands.popleft(); command(*args)
+        mixed = np.zeros((frames, CHANNELS), dtype=np.float32)
+        if len(self._scratch) < frames: self._allocate_scratch(frames)
+        mono_bus = self._mono_bus[:frames]
+        mono_bus.fill(0.0)
+        sounds_to_remove, has_mono = [], False
+        voices, index = list(self.sounds), 0
+        while index < len(voices):
+            sound, index = voices[index], index + 1
+            start = sound["delay"]
+            if start >= frames or start and sound["fade"] is not None:
+                # A scheduled voice waits out its delay; stopped before it started, it just goes away.
+                if sound["fade"] is not None: sounds_to_remove.append(sound)
+                else: sound["delay"] -= frames
+                continue
+            sound["delay"] = 0
+            if not sound["started"]: sound["started"] = True; self._publish("start", sound)
+            data, pos, written, fade = sound["data"], sound["index"], start, sound["fade"]
+            data_len, gain, curve = len(data), np.float32(sound["volume"] * sound["scale"]), None
+            limit = frames if fade is None else min(frames, VOICE_FADE_FRAMES - fade)
+            if fade is not None or sound["target"] != sound["volume"]:
+                # Volume changes ramp across the block and stop/steal fades multiply in; both build one per-frame gain curve.
+                curve = self._gain_scratch[:limit]
+                if sound["target"] != sound["volume"]:
+                    np.multiply(self._index_ramp[:limit], (sound["target"] - sound["volume"]) / frames, out=curve); curve += sound["volume"]
+                    sound["volume"] = sound["target"]
+                else: curve.fill(sound["volume"])
+                if fade is not None: curve *= self._fade_ramp[fade:fade + limit]
+                curve *= sound["scale"]
+            has_mono = has_mono or data.shape[1] == 1
+            while written < limit and data_len:
+                count = min(limit - written, data_len - pos)
+                self._accumulate(mixed, written, data[pos:pos + count], gain if curve is None else curve[written:written + count])
+                written, pos = written + count, pos + count
+                if pos >= data_len:
+                    if not sound["loop"]: break
+                    pos = 0
+            sound["index"] = pos
+            if fade is not None: sound["fade"] = fade + written
+            if pos >= data_len and not sound["loop"] or not data_len or fade is not None and fade + written >= VOICE_FADE_FRAMES:
+                sounds_to_remove.append(sound)
+                if sound["cue"] is not None and sound["cue"] in self.cues:
+                    follow = self.cues[sound["cue"]].popleft() if fade is None and self.cues[sound["cue"]] else None
+                    if follow is None: del self.cues[sound["cue"]]
+                    else: follow["delay"] += written; self.sounds.append(follow); voices.append(follow)
+        if has_mono:
+            upmix = self._scratch[:frames]
+            for channel in range(CHANNELS): upmix[:, channel] = mono_bus
+            mixed += upmix
+        if sounds_to_remove:
+            removed = {id(s) for s in sounds_to_remove}
+            self.sounds = deque(s for s in self.sounds if id(s) not in removed)
+        self._retire(sounds_to_remove)
+        self.voice_snapshot = tuple({"id": s["id"], "name": s["name"], "position": s["index"], "length": len(s["data"]), "loop": s["loop"], "gain": s["volume"], "cue": s["cue"], "started": s["started"]} for s in self.sounds) if self.sounds else ()
+        self.cue_snapshot = {cue: len(queued) for cue, queued in self.cues.items()} if self.cues else {}
+        if self._opened: self._opening.difference_update(self._opened); self._opened.clear()
+        return self.bus.process(mixed)
+    def clear_sounds(self): self._commands.append((self._clear_sounds, ()))
+    def _clear_sounds(self):
+        self.cues.clear()
+        for sound in self.sounds:
+            if sound["fade"] is None: sound["fade"] = 0
     def remove_sound_by_id(self, sound_id):
-        with self.lock:
-            initial_len = len(self.sounds)
-            self.sounds = deque(s for s in self.sounds if s["id"] != sound_id)
-            return len(self.sounds) < initial_len
+        """Fades out every live voice of sound_id at the next block; returns whether the last snapshot had one playing."""
+        self._commands.append((self._remove_sound_by_id, (sound_id,)))
+        return any(v["id"] == sound_id for v in self.voice_snapshot)
+    def _remove_sound_by_id(self, sound_id):
+        for sound in self.sounds:
+            if sound["id"] == sound_id and sound["fade"] is None: sound["fade"] = 0
+    def set_sound_volume(self, sound_id, volume): self._commands.append((self._set_sound_volume, (sound_id, volume)))
+    def _set_sound_volume(self, sound_id, volume):
+        for sound in self.sounds:
+            if sound["id"] == sound_id: sound["target"] = volume
 
 class SoundManager:
-    def __init__(self):
-        self.sounds, self.global_hotkeys, self.sound_data_cache = [], {}, {}
+    def __init__(self, cache_format="int16"):
+        self.sounds, self.global_hotkeys, self.sound_data_cache, self._sounds_by_id = [], {}, {}, {}
+        self.waveform_cache, self._waveform_pending = {}, set()
+        self.watched_folders, self.library_index, self.sequences = [], {}, []
+        # (profile id, watched-folder source) queued or being decoded; a rescan skips them until their import is committed.
+        self._import_queue, self._import_thread, self._pending_sources = queue.Queue(), None, set()
+        self._bank_blobs = {}
+        # Profiles other than the active one are read on first switch and then kept; _inactive_since orders cache trimming.
+        self.profiles, self.active_profile, self._profile_states, self._inactive_since, self._warm_generation = [], DEFAULT_PROFILE_ID, {}, {}, 0
+        self.cache_format = cache_format if cache_format in CACHE_SAMPLE_FORMATS else "float32"
+        self.load_profiles()
         self.load_config()
+    def _decode_import(self, file_path, custom_name=None, sound_id=None, output_path=None):
+        # Touches only the filesystem and the new sound dict, so it is safe to run on the import thread.
+        sound_name = custom_name or os.path.splitext(os.path.basename(file_path))[0]
+        sound_name = re.sub(INVALID_FILENAME_CHARS, '_', sound_name)
+        if output_path is None: output_path = self.unique_sound_path(sound_name)
+        start = time.perf_counter()
+        audio = pydub.AudioSegment.from_file(file_path).set_frame_rate(SAMPLE_RATE)
+        if audio.channels > CHANNELS: audio = audio.set_channels(CHANNELS)
+        audio.export(output_path + ".part", format="wav")
+        os.replace(output_path + ".part", output_path)
+        METRICS.timed("decode_ms", start); METRICS.count("imports")
+        return self.describe_sound_file(output_path, sound_name, sound_id)
+    def unique_sound_path(self, sound_name):
+        output_path, counter = os.path.join(SOUNDS_DIR, f"{sound_name}.wav"), 1
+        while os.path.exists(output_path):
+            output_path = os.path.join(SOUNDS_DIR, f"{sound_name}_{counter}.wav")
+            counter += 1
+        return output_path
+    def describe_sound_file(self, output_path, sound_name, sound_id=None):
+        """Builds the sound dict (analysis and waveform included) for a SAMPLE_RATE WAV already in SOUNDS_DIR; nothing goes through pydub."""
+        data, _ = sf.read(output_path, dtype=self.cache_format, always_2d=True)
+        new_sound = {"id": sound_id or str(uuid.uuid4()), "name": sound_name, "path": output_path, "volume": 1.0, "hotkeys": [], "loop": False, "enabled": True, "trim_silence": True, "duration": len(data) / SAMPLE_RATE, "analysis": analyze_audio(data)}
+        self._store_waveform(new_sound, build_waveform_pyramid(data))
+        return new_sound
     def add_sound(self, file_path, custom_name=None):
         try:
-            sound_name = custom_name or os.path.splitext(os.path.basename(file_path))[0]
-            sound_name = re.sub(INVALID_FILENAME_CHARS, '_', sound_name)
-            output_path = os.path.join(SOUNDS_DIR, f"{sound_name}.wav")
-            counter = 1
-            while os.path.exists(output_path):
-                output_path = os.path.join(SOUNDS_DIR, f"{sound_name}_{counter}.wav")
-                counter += 1
-            audio = pydub.AudioSegment.from_file(file_path).set_frame_rate(SAMPLE_RATE).set_channels(CHANNELS)
-            audio.export(output_path, format="wav")
-            new_sound = {"id": str(uuid.uuid4()), "name": sound_name, "path": output_path, "volume": 1.0, "hotkeys": [], "loop": False, "enabled": True, "duration": sf.info(output_path).duration}
-            self.sounds.append(new_sound)
+            new_sound = self._decode_import(file_path, custom_name)
+            self._append_sound(new_sound)
             self.save_config()
             return new_sound
         except Exception as e: logging.error(f"Failed to add sound {file_path}: {e}"); raise
+    def queue_import(self, file_path, on_done, replace_id=None, source=None):
+        """Queues a file for the background import thread. on_done(result, pending) is called from that thread.
+        The import belongs to the board active now; commit_import() applies it there even after a switch."""
+        existing = self.get_sound_by_id(replace_id) if replace_id else None
+        if source: self._pending_sources.add((self.active_profile, source))
+        self._import_queue.put((file_path, on_done, existing["id"] if existing else None, existing["path"] if existing else None, existing["name"] if existing else None, source, self.active_profile))
+        if not (self._import_thread and self._import_thread.is_alive()):
+            self._import_thread = threading.Thread(target=self._import_worker, daemon=True)
+            self._import_thread.start()
+    def import_queue_depth(self): return self._import_queue.unfinished_tasks
+    def _import_worker(self):
+        while True:
+            file_path, on_done, sound_id, output_path, name, source, profile_id = self._import_queue.get()
+            result = {"path": file_path, "source": source, "sound": None, "error": None, "profile": profile_id}
+            try:
+                if source:
+                    stat = os.stat(source)
+                    result["stat"] = (stat.st_size, stat.st_mtime_ns)
+                result["sound"] = self._decode_import(file_path, name, sound_id, output_path)
+                if source: result["sound"]["source"] = source
+            except Exception as e:
+                logging.error(f"Failed to import {file_path}: {e}")
+                result["error"] = e
+            self._import_queue.task_done()
+            on_done(result, self._import_queue.unfinished_tasks)
+    def commit_import(self, result):
+        """Applies a finished import on the caller's (UI) thread; re-imports update the existing sound in place.
+        A watched file that failed to decode is indexed without a sound, so rescans skip it until it changes.
+        Imports queued on a board that is no longer active go into that board's stored state and files."""
+        sound, source, profile_id = result.get("sound"), result.get("source"), result.get("profile", self.active_profile)
+        self._pending_sources.discard((profile_id, source))
+        state, is_active = self._state_of(profile_id), profile_id == self.active_profile
+        if state is None:
+            # The board was deleted while the file was decoding.
+            if sound: self._delete_sound_files(sound, [])
+            return None
+        index = state["library_index"]
+        if not sound:
+            if source and result.get("stat"):
+                size, mtime_ns = result["stat"]
+                index[source] = {"size": size, "mtime_ns": mtime_ns, "sound_id": index.get(source, {}).get("sound_id"), "failed": True}
+            return None
+        existing = self.get_sound_by_id(sound["id"]) if is_active else next((s for s in state["sounds"] if s["id"] == sound["id"]), None)
+        if existing:
+            existing.update({key: sound[key] for key in ("duration", "analysis")})
+            existing.pop("source_missing", None)
+            if self.sound_data_cache.pop(existing["id"], None) is not None: METRICS.count("cache_evictions")
+            sound = existing
+        elif is_active: self._append_sound(sound)
+        else: state["sounds"].append(sound)
+        if source:
+            size, mtime_ns = result["stat"]
+            index[source] = {"size": size, "mtime_ns": mtime_ns, "sound_id": sound["id"]}
+        if not is_active: self.save_config(profile_id); self.save_library_index(profile_id)
+        return sound
+    def add_watched_folder(self, folder):
+        folder = os.path.abspath(folder)
+        if folder not in self.watched_folders: self.watched_folders.append(folder); self.save_config()
+    def remove_watched_folder(self, folder):
+        if folder not in self.watched_folders: return
+        self.watched_folders.remove(folder)
+        prefix = os.path.join(folder, '')
+        self.library_index = {path: entry for path, entry in self.library_index.items() if not path.startswith(prefix)}
+        self.save_config(); self.save_library_index()
+    def scan_watched_folders(self):
+        # The board is read first: if a switch lands while folders and index are read, the scan is stale either way.
+        profile_id, start = self.active_profile, time.perf_counter()
+        scan = scan_folders(list(self.watched_folders), dict(self.library_index))
+        scan["elapsed_ms"], scan["profile"] = (time.perf_counter() - start) * 1000, profile_id
+        logging.info(f"Watched folder scan: {len(scan['seen'])} files, {len(scan['changed'])} new/changed, {len(scan['removed'])} removed in {scan['elapsed_ms']:.1f} ms")
+        return scan
+    def apply_folder_scan(self, scan):
+        """Flags sounds whose source file vanished and returns (path, sound_id_to_replace) for new or changed files
+        that are not already queued for import. Returns None for a scan of a board that is no longer active."""
+        if scan.get("profile", self.active_profile) != self.active_profile: return None
+        for path in scan["removed"]:
+            entry = self.library_index.pop(path, None)
+            sound = self.get_sound_by_id(entry.get("sound_id")) if entry else None
+            if sound: sound["source_missing"] = True
+        if scan["removed"]: self.save_library_index()
+        return [(path, self.library_index.get(path, {}).get("sound_id")) for path in scan["changed"] if (self.active_profile, path) not in self._pending_sources]
+    def save_library_index(self, profile_id=None):
+        profile_id, start = profile_id or self.active_profile, time.perf_counter()
+        try:
+            with open(profile_paths(profile_id)[1], 'w') as f: json.dump({"files": self._state_of(profile_id)["library_index"]}, f)
+        except IOError as e: logging.error(f"Error saving library index: {e}")
+        METRICS.timed("config_save_ms", start)
     def rename_sound(self, sound_id, new_name):
         sound = self.get_sound_by_id(sound_id)
         if not sound: return None
         new_name_clean = re.sub(INVALID_FILENAME_CHARS, '_', new_name.strip())
         if not new_name_clean or any(s['name'] == new_name_clean for s in self.sounds if s['id'] != sound_id):
             raise ValueError("New name is invalid or already exists.")
+        # Bank sounds live inside their bank file, so only the label changes and no file in SOUNDS_DIR can collide.
+        if sound.get("bank"):
+            sound['name'] = new_name_clean; self.save_config()
+            return sound
         old_path, new_path = sound['path'], os.path.join(SOUNDS_DIR, f"{new_name_clean}.wav")
         if os.path.exists(new_path) and old_path.lower() != new_path.lower():
             raise ValueError("A file with the new name already exists.")
         try:
             if old_path.lower() != new_path.lower():
                 os.rename(old_path, new_path)
+                if os.path.exists(get_waveform_path(old_path)): os.replace(get_waveform_path(old_path), get_waveform_path(new_path))
             sound['name'], sound['path'] = new_name_clean, new_path
             self.save_config()
             return sound
@@ -432,64 +1346,394 @@ class SoundManager:
         for sound_id in list(sound_ids):
             sound = self.get_sound_by_id(sound_id)
             if sound:
-                try:
-                    if os.path.exists(sound["path"]): os.remove(sound["path"])
-                    if sound_id in self.sound_data_cache: del self.sound_data_cache[sound_id]
-                    self.sounds.remove(sound)
-                except Exception as e: logging.error(f"Error removing sound {sound['name']}: {e}")
+                self.sounds.remove(sound); self._sounds_by_id.pop(sound_id, None)
+                self._delete_sound_files(sound, self.sounds)
+        for sequence in self.sequences: sequence["items"] = [item for item in sequence["items"] if item["id"] in self._sounds_by_id]
         self.save_config()
-    def get_sound_by_id(self, sound_id): return next((s for s in self.sounds if s["id"] == sound_id), None)
+    def _delete_sound_files(self, sound, remaining):
+        try:
+            if sound["id"] in self.sound_data_cache: del self.sound_data_cache[sound["id"]]; METRICS.count("cache_evictions")
+            self.waveform_cache.pop(sound["id"], None)
+            if sound.get("bank"):
+                # A bank file is shared by all of its sounds; it is only deleted with the last one.
+                if not any(s["path"] == sound["path"] for s in remaining):
+                    self._bank_blobs.pop(sound["path"], None)
+                    if os.path.exists(sound["path"]): os.remove(sound["path"])
+                return
+            if os.path.exists(sound["path"]): os.remove(sound["path"])
+            if os.path.exists(get_waveform_path(sound["path"])): os.remove(get_waveform_path(sound["path"]))
+        except Exception as e: logging.error(f"Error removing sound {sound['name']}: {e}")
+    def get_sound_by_id(self, sound_id): return self._sounds_by_id.get(sound_id)
+    def _append_sound(self, sound):
+        self.sounds.append(sound); self._sounds_by_id[sound["id"]] = sound
     def update_sound_property(self, sound_id, key, value):
         sound = self.get_sound_by_id(sound_id)
         if sound: sound[key] = value
+    def get_sequence_by_id(self, sequence_id): return next((q for q in self.sequences if q["id"] == sequence_id), None)
+    def add_sequence(self, name, sound_ids, gap_ms=0):
+        """Creates a cue sequence; items play in order with gap_ms of silence before each item after the first."""
+        sequence = {"id": str(uuid.uuid4()), "name": name, "items": [{"id": sound_id, "gap_ms": gap_ms} for sound_id in sound_ids], "shuffle": False, "loop": False, "hotkeys": []}
+        self.sequences.append(sequence); self.save_config(); return sequence
+    def remove_sequence(self, sequence_id):
+        self.sequences = [q for q in self.sequences if q["id"] != sequence_id]; self.save_config()
     def set_global_hotkey(self, action, hotkey_list):
         self.global_hotkeys[action] = hotkey_list; self.save_config()
     def get_all_assigned_hotkeys(self):
         hotkeys = set()
         for sound in self.sounds:
             if sound.get("hotkeys"): hotkeys.add(tuple(sorted(sound["hotkeys"])))
-        for hotkey_list in self.global_hotkeys.values():
+        for hotkey_list in list(self.global_hotkeys.values()) + [q.get("hotkeys") for q in self.sequences]:
             if hotkey_list: hotkeys.add(tuple(sorted(hotkey_list)))
         return hotkeys
-    def save_config(self):
+    def save_config(self, profile_id=None):
+        profile_id, start = profile_id or self.active_profile, time.perf_counter()
+        state = self._state_of(profile_id)
         try:
-            with open(CONFIG_FILE, 'w') as f: json.dump({"sounds": self.sounds, "global_hotkeys": self.global_hotkeys}, f, indent=4)
+            with open(profile_paths(profile_id)[0], 'w') as f: json.dump({key: state[key] for key in ("sounds", "global_hotkeys", "watched_folders", "sequences")}, f, indent=4)
         except IOError as e: logging.error(f"Error saving soundboard config: {e}")
+        METRICS.timed("config_save_ms", start)
     def load_config(self):
-        if not os.path.exists(CONFIG_FILE): return
+        """(Re)reads the active profile from disk; an unreadable file leaves the current state alone."""
+        state = self._read_profile(self.active_profile)
+        if state: self._use_profile(self.active_profile, state)
+    def _read_profile(self, profile_id):
+        # Metadata only: no PCM is decoded, sounds load on play or when warmed after a switch.
+        config_path, index_path = profile_paths(profile_id)
+        state = {"sounds": [], "global_hotkeys": {}, "watched_folders": [], "sequences": [], "library_index": {}}
+        if os.path.exists(config_path):
+            try:
+                with open(config_path, 'r') as f: data = json.load(f)
+                state.update(sounds=[s for s in data.get("sounds", []) if s.get("path") and os.path.exists(s.get("path"))], global_hotkeys=data.get("global_hotkeys", {}),
+                             watched_folders=data.get("watched_folders", []), sequences=data.get("sequences", []))
+                for sound in state["sounds"]:
+                    if 'enabled' not in sound: sound['enabled'] = True
+            except (json.JSONDecodeError, KeyError) as e: logging.error(f"Error loading config: {e}"); return None
+        if os.path.exists(index_path):
+            try:
+                with open(index_path, 'r') as f: state["library_index"] = json.load(f).get("files", {})
+            except (json.JSONDecodeError, AttributeError) as e: logging.error(f"Error loading library index: {e}")
+        return state
+    def _state_of(self, profile_id):
+        return self._profile_state() if profile_id == self.active_profile else self._profile_states.get(profile_id)
+    def _profile_state(self):
+        return {"sounds": self.sounds, "global_hotkeys": self.global_hotkeys, "watched_folders": self.watched_folders, "sequences": self.sequences, "library_index": self.library_index}
+    def _use_profile(self, profile_id, state):
+        self.sounds, self.global_hotkeys, self.watched_folders, self.sequences, self.library_index = state["sounds"], state["global_hotkeys"], state["watched_folders"], state["sequences"], state["library_index"]
+        self._sounds_by_id, self.active_profile = {s["id"]: s for s in self.sounds}, profile_id
+
+    def load_profiles(self):
+        profiles, active = [], DEFAULT_PROFILE_ID
+        if os.path.exists(PROFILES_FILE):
+            try:
+                with open(PROFILES_FILE, 'r') as f: data = json.load(f)
+                profiles, active = data.get("profiles", []), data.get("active", DEFAULT_PROFILE_ID)
+            except (json.JSONDecodeError, AttributeError) as e: logging.error(f"Error loading profiles: {e}")
+        if not any(p["id"] == DEFAULT_PROFILE_ID for p in profiles): profiles.insert(0, {"id": DEFAULT_PROFILE_ID, "name": "Default"})
+        self.profiles = profiles
+        self.active_profile = active if self.get_profile_by_id(active) else DEFAULT_PROFILE_ID
+    def save_profiles(self):
         try:
-            with open(CONFIG_FILE, 'r') as f: data = json.load(f)
-            self.sounds = [s for s in data.get("sounds", []) if s.get("path") and os.path.exists(s.get("path"))]
-            self.global_hotkeys = data.get("global_hotkeys", {})
-            for sound in self.sounds:
-                if 'enabled' not in sound: sound['enabled'] = True
-        except (json.JSONDecodeError, KeyError) as e: logging.error(f"Error loading config: {e}")
+            with open(PROFILES_FILE, 'w') as f: json.dump({"profiles": self.profiles, "active": self.active_profile}, f, indent=4)
+        except IOError as e: logging.error(f"Error saving profiles: {e}")
+    def get_profile_by_id(self, profile_id): return next((p for p in self.profiles if p["id"] == profile_id), None)
+    def _check_profile_name(self, name, profile_id=None):
+        name = name.strip()
+        if not name or any(p["name"].lower() == name.lower() for p in self.profiles if p["id"] != profile_id): raise ValueError("Board name is empty or already exists.")
+        return name
+    def add_profile(self, name):
+        profile = {"id": str(uuid.uuid4()), "name": self._check_profile_name(name)}
+        self.profiles.append(profile); self.save_profiles(); return profile
+    def rename_profile(self, profile_id, name):
+        profile = self.get_profile_by_id(profile_id)
+        if profile: profile["name"] = self._check_profile_name(name, profile_id); self.save_profiles()
+        return profile
+    def remove_profile(self, profile_id):
+        """Deletes an inactive profile together with its sound files."""
+        if profile_id in (DEFAULT_PROFILE_ID, self.active_profile): raise ValueError("The default and the active board cannot be deleted.")
+        state = self._profile_states.pop(profile_id, None) or self._read_profile(profile_id)
+        if state is None: raise ValueError("The board's config could not be read, so its sounds were left in place.")
+        sounds = list(state["sounds"])
+        while sounds: self._inactive_since.pop(sounds[-1]["id"], None); self._delete_sound_files(sounds.pop(), sounds)
+        for path in profile_paths(profile_id):
+            if os.path.exists(path): os.remove(path)
+        self.profiles = [p for p in self.profiles if p["id"] != profile_id]; self.save_profiles()
+    def switch_profile(self, profile_id):
+        """Makes profile_id the active board. Its metadata is read on first use and kept afterwards, so switching back
+        is a reference swap. The previous board's cached PCM stays resident until trim_inactive_cache() needs the room."""
+        if profile_id == self.active_profile: return False
+        if not self.get_profile_by_id(profile_id): raise ValueError("Unknown board.")
+        state = self._profile_states.pop(profile_id, None) or self._read_profile(profile_id)
+        if state is None: raise ValueError("The board's config could not be read.")
+        now = time.monotonic()
+        for sound_id in self._sounds_by_id: self._inactive_since[sound_id] = now
+        self._profile_states[self.active_profile] = self._profile_state()
+        self._use_profile(profile_id, state)
+        for sound_id in self._sounds_by_id: self._inactive_since.pop(sound_id, None)
+        self.save_profiles()
+        return True
+    def warm_profile_cache(self, on_done=None):
+        """Loads the active board's hotkeyed sounds (and hotkeyed sequences' items) on a background thread, then trims
+        the cache held for inactive boards. on_done(loaded) is called from that thread; a newer switch cancels it."""
+        self._warm_generation += 1
+        sound_ids = {s["id"] for s in self.sounds if s.get("hotkeys") and s.get("enabled", True)} | {item["id"] for q in self.sequences if q.get("hotkeys") for item in q["items"]}
+        pending = [self._sounds_by_id[i] for i in sound_ids if i in self._sounds_by_id and i not in self.sound_data_cache]
+        threading.Thread(target=self._warm_worker, args=(self._warm_generation, self.active_profile, pending, on_done), daemon=True, name="ProfileWarm").start()
+    def _warm_worker(self, generation, profile_id, sounds, on_done):
+        start, loaded = time.perf_counter(), 0
+        for sound in sounds:
+            if generation != self._warm_generation: return
+            if sound["id"] not in self.sound_data_cache: self.preload_sound_data(sound); loaded += 1
+        evicted = self.trim_inactive_cache()
+        logging.info(f"Warmed {loaded} sounds for board {profile_id} in {(time.perf_counter() - start) * 1000:.0f} ms; evicted {evicted} inactive entries.")
+        if on_done: on_done(loaded)
+    def trim_inactive_cache(self, budget_bytes=PROFILE_CACHE_BUDGET_MB * 2**20):
+        """Evicts cached PCM of sounds outside the active board, longest inactive first, until the rest fits budget_bytes."""
+        inactive = sorted((self._inactive_since.get(sound_id, 0.0), sound_id) for sound_id in list(self.sound_data_cache) if sound_id not in self._sounds_by_id)
+        held = sum(getattr(self.sound_data_cache.get(sound_id), "nbytes", 0) for _, sound_id in inactive)
+        evicted = 0
+        for _, sound_id in inactive:
+            if held <= budget_bytes: break
+            data = self.sound_data_cache.pop(sound_id, None)
+            if data is not None: held -= data.nbytes; evicted += 1
+        if evicted: METRICS.count("cache_evictions", evicted)
+        return evicted
+    def cached_sound_data(self, sound):
+        """Returns a sound's cached PCM, loading it on a miss; every lookup feeds the cache hit-rate metrics."""
+        data = self.sound_data_cache.get(sound["id"])
+        if data is not None: METRICS.count("cache_hits"); return data
+        METRICS.count("cache_misses"); self.preload_sound_data(sound)
+        return self.sound_data_cache.get(sound["id"])
     def preload_sound_data(self, sound):
+        start = time.perf_counter()
         try:
-            data, _ = sf.read(sound["path"], dtype='float32')
-            if len(data.shape) == 1: data = np.column_stack((data, data))
+            # Cached in the native channel count; the mixer upmixes and scales int16 per block.
+            if sound.get("bank"): data = bank_pcm(self._get_bank_blobs(sound["path"]), sound["bank"])
+            else: data, _ = sf.read(sound["path"], dtype=self.cache_format, always_2d=True)
+            if data.shape[1] > CHANNELS: data = np.ascontiguousarray(data[:, :CHANNELS])
+            analysis = sound.get("analysis")
+            if not analysis or analysis.get("frames") != len(data): analysis = sound["analysis"] = analyze_audio(data)
+            # Only the trimmed region is kept resident; the file on disk is never rewritten.
+            if sound.get("trim_silence", True) and (analysis["trim_start"] > 0 or analysis["trim_end"] < len(data)):
+                data = data[analysis["trim_start"]:analysis["trim_end"]]
+                if not sound.get("bank"): data = data.copy()
             self.sound_data_cache[sound["id"]] = data
+            METRICS.timed("load_ms", start)
         except Exception as e:
             logging.error(f"Failed to pre-load audio for '{sound['name']}': {e}")
             if sound["id"] in self.sound_data_cache: del self.sound_data_cache[sound["id"]]
 
+    def resolve_timeline(self, entries):
+        """Turns timeline entries ({"id"|"name"|"path", "time", "volume", "loop", "action"}) into render events with cached PCM."""
+        by_name, by_path, events = {s["name"].lower(): s for s in self.sounds}, {}, []
+        for entry in entries:
+            action, event = entry.get("action", "play"), {"action": entry.get("action", "play"), "time": float(entry.get("time", 0.0))}
+            if action == "stop_all": events.append(event); continue
+            if "path" in entry:
+                if entry["path"] not in by_path:
+                    data, rate = sf.read(entry["path"], dtype=self.cache_format, always_2d=True)
+                    if rate != SAMPLE_RATE: raise ValueError(f"{entry['path']} is {rate} Hz; timeline files must be {SAMPLE_RATE} Hz")
+                    by_path[entry["path"]] = data[:, :CHANNELS]
+                sound, data = {"id": entry["path"], "name": os.path.basename(entry["path"]), "volume": 1.0, "loop": False}, by_path[entry["path"]]
+            else:
+                sound = self.get_sound_by_id(entry["id"]) if "id" in entry else by_name.get(str(entry.get("name", "")).lower())
+                if not sound: raise ValueError(f"Unknown sound in timeline: {entry}")
+                if action == "play" and sound["id"] not in self.sound_data_cache: self.preload_sound_data(sound)
+                data = self.sound_data_cache.get(sound["id"])
+                if action == "play" and data is None: raise ValueError(f"Could not load audio for '{sound['name']}'")
+            event.update(id=sound["id"], name=sound["name"], data=data, volume=float(entry.get("volume", sound["volume"])), loop=bool(entry.get("loop", sound["loop"])), max_voices=int(entry.get("max_voices", sound.get("max_voices", 1))))
+            events.append(event)
+        return events
+
+    def _store_waveform(self, sound, stacked):
+        self.waveform_cache[sound["id"]] = split_waveform_pyramid(stacked)
+        try: np.save(get_waveform_path(sound["path"]), stacked)
+        except OSError as e: logging.warning(f"Failed to save waveform for '{sound['name']}': {e}")
+    def _load_waveform(self, sound):
+        if sound.get("bank"):
+            self.waveform_cache[sound["id"]] = split_waveform_pyramid(bank_waveform(self._get_bank_blobs(sound["path"]), sound["bank"]))
+            return
+        waveform_path = get_waveform_path(sound["path"])
+        if os.path.exists(waveform_path) and os.path.getmtime(waveform_path) >= os.path.getmtime(sound["path"]):
+            stacked = np.load(waveform_path)
+            if stacked.shape == (sum(WAVEFORM_LEVELS), 2):
+                self.waveform_cache[sound["id"]] = split_waveform_pyramid(stacked)
+                return
+        data, _ = sf.read(sound["path"], dtype='int16', always_2d=True)
+        self._store_waveform(sound, build_waveform_pyramid(data))
+    def _get_bank_blobs(self, bank_path):
+        if bank_path not in self._bank_blobs: self._bank_blobs[bank_path] = open_sound_bank(bank_path)[1]
+        return self._bank_blobs[bank_path]
+    def export_bank(self, path, sound_ids=None):
+        """Packs sounds (all by default) into one bank file. Reads int16 PCM from disk; nothing is decoded through pydub."""
+        entries = []
+        for sound in [s for s in self.sounds if sound_ids is None or s["id"] in sound_ids]:
+            if sound.get("bank"): pcm = bank_pcm(self._get_bank_blobs(sound["path"]), sound["bank"])
+            else: pcm, _ = sf.read(sound["path"], dtype='int16', always_2d=True)
+            if sound["id"] not in self.waveform_cache: self._load_waveform(sound)
+            entries.append((sound, pcm, np.concatenate([self.waveform_cache[sound["id"]][bins] for bins in WAVEFORM_LEVELS])))
+        write_sound_bank(path, entries, self.global_hotkeys)
+        return len(entries)
+    def copy_bank_into_library(self, source_path):
+        """Copies a bank file into BANKS_DIR (no decoding) so the board stays self-contained; returns the new path."""
+        base = os.path.splitext(os.path.basename(source_path))[0]
+        dest, counter = os.path.join(BANKS_DIR, f"{base}.wpbank"), 1
+        while os.path.exists(dest):
+            dest = os.path.join(BANKS_DIR, f"{base}_{counter}.wpbank"); counter += 1
+        shutil.copyfile(source_path, dest)
+        return dest
+    def mount_bank(self, bank_path):
+        """Adds a bank's sounds by reading its header and memory-mapping the blobs. Names, ids and hotkeys are de-duplicated."""
+        header, blobs = open_sound_bank(bank_path)
+        self._bank_blobs[bank_path] = blobs
+        # Ids are checked against every loaded board because the PCM cache is shared between them.
+        names, assigned = {s["name"] for s in self.sounds}, self.get_all_assigned_hotkeys()
+        ids = {s["id"] for state in [self._profile_state(), *self._profile_states.values()] for s in state["sounds"]} | set(self.sound_data_cache)
+        added = []
+        for record in header["sounds"]:
+            sound = dict(record, path=bank_path)
+            if sound.get("id") in ids: sound["id"] = str(uuid.uuid4())
+            name, counter = sound.get("name", "Sound"), 1
+            while name in names: name = f"{sound.get('name', 'Sound')}_{counter}"; counter += 1
+            sound["name"] = name
+            if sound.get("hotkeys") and tuple(sorted(sound["hotkeys"])) in assigned: sound["hotkeys"] = []
+            sound.setdefault("enabled", True); sound.setdefault("volume", 1.0); sound.setdefault("loop", False); sound.setdefault("hotkeys", [])
+            names.add(name); ids.add(sound["id"]); assigned.add(tuple(sorted(sound["hotkeys"])))
+            self.waveform_cache[sound["id"]] = split_waveform_pyramid(bank_waveform(blobs, sound["bank"]))
+            self._append_sound(sound); added.append(sound)
+        for action, hotkey_list in header.get("global_hotkeys", {}).items():
+            if hotkey_list and not self.global_hotkeys.get(action) and tuple(sorted(hotkey_list)) not in assigned: self.global_hotkeys[action] = hotkey_list
+        self.save_config()
+        return added
+    def ensure_waveforms(self, sounds, on_ready):
+        """Loads or builds missing waveform pyramids on a background thread, calling on_ready(sound_id) for each."""
+        pending = [s for s in sounds if s["id"] not in self.waveform_cache and s["id"] not in self._waveform_pending]
+        if not pending: return
+        self._waveform_pending.update(s["id"] for s in pending)
+        threading.Thread(target=self._waveform_worker, args=(pending, on_ready), daemon=True).start()
+    def _waveform_worker(self, sounds, on_ready):
+        for sound in sounds:
+            try:
+                self._load_waveform(sound)
+                on_ready(sound["id"])
+            except Exception as e: logging.warning(f"Failed to build waveform for '{sound['name']}': {e}")
+            finally: self._waveform_pending.discard(sound["id"])
+
+class MixRecorder:
+    """Records the outgoing mix, and optionally the mic as a separate "-mic" stem file, without blocking the audio thread.
+    The callback only copies each block into a preallocated ring; a writer thread drains it with soundfile in large
+    chunks. When the disk falls RECORD_RING_SECONDS behind, new blocks are dropped and counted, never waited for."""
+    def __init__(self, path, mic_stem=False):
+        self.path, self.mic_path = path, "-mic".join(os.path.splitext(path)) if mic_stem else None
+        slots = RECORD_RING_SECONDS * SAMPLE_RATE // FRAME_SIZE
+        self.ring = np.zeros((slots, FRAME_SIZE, CHANNELS * (2 if mic_stem else 1)), dtype=np.float32)
+        self.lengths = np.zeros(slots, dtype=np.int32)
+        # Slot counters: pushed is only advanced by the audio thread and drained only by the writer, so neither needs a lock.
+        self.pushed, self.drained, self.dropped_blocks, self.frames_written, self.error = 0, 0, 0, 0, None
+        self.started_at, self._stop_event, self._thread, self._files = time.time(), Event(), None, []
+
+    def start(self):
+        """Opens the output files on the calling thread, so a bad path fails here rather than in the writer."""
+        subtype = RECORD_SUBTYPES.get(os.path.splitext(self.path)[1].lower())
+        self._files = [sf.SoundFile(path, 'w', SAMPLE_RATE, CHANNELS, subtype) for path in (self.path, self.mic_path) if path]
+        self._thread = threading.Thread(target=self._run, daemon=True, name="MixRecorder"); self._thread.start()
+
+    def push(self, mix, mic=None):
+        """Audio-thread side: copies a block into the ring, or counts it as dropped when the ring is full."""
+        for offset in range(0, len(mix), FRAME_SIZE):
+            if self.error or self.pushed - self.drained >= len(self.ring): self.dropped_blocks += 1; continue
+            index, count = self.pushed % len(self.ring), min(FRAME_SIZE, len(mix) - offset)
+            slot = self.ring[index]
+            slot[:count, :CHANNELS] = mix[offset:offset + count]
+            if self.mic_path:
+                if mic is None: slot[:count, CHANNELS:] = 0.0
+                else: slot[:count, CHANNELS:] = mic[offset:offset + count]
+            self.lengths[index] = count; self.pushed += 1
+
+    def _drain(self):
+        while self.pushed > self.drained:
+            start = self.drained % len(self.ring)
+            count = min(self.pushed - self.drained, len(self.ring) - start)
+            lengths = self.lengths[start:start + count]
+            if (lengths == FRAME_SIZE).all(): chunks = [self.ring[start:start + count].reshape(-1, self.ring.shape[2])]
+            else: chunks = [self.ring[start + i, :length] for i, length in enumerate(lengths)]
+            for chunk in chunks:
+                for i, handle in enumerate(self._files): handle.write(np.ascontiguousarray(chunk[:, i * CHANNELS:(i + 1) * CHANNELS]))
+                self.frames_written += len(chunk)
+            self.drained += count
+
+    def _run(self):
+        try:
+            while not self._stop_event.wait(RECORD_POLL_SECONDS):
+                if self.pushed - self.drained >= RECORD_CHUNK_BLOCKS: self._drain()
+            self._drain()
+        except Exception as e:
+            self.error = str(e); logging.error(f"Recording to {self.path} failed: {e}")
+        finally:
+            for handle in self._files: handle.close()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread: self._thread.join()
+        logging.info(f"Recording stopped: {self.path} ({self.frames_written / SAMPLE_RATE:.1f} s, {self.dropped_blocks} dropped blocks)")
+        return self.stats()
+
+    def stats(self):
+        return {"path": self.path, "mic_path": self.mic_path, "seconds": round(self.frames_written / SAMPLE_RATE, 3), "elapsed": round(time.time() - self.started_at, 3),
+                "dropped_blocks": self.dropped_blocks, "buffered_blocks": self.pushed - self.drained, "error": self.error}
+
+class ReplayBuffer:
+    """Rolling capture of the last `seconds` of the outgoing mix in one preallocated int16 ring (about 10 MiB a minute).
+    The audio thread only copies each block in; snapshot() copies out without pausing it."""
+    def __init__(self, seconds):
+        self.seconds, self.ring = seconds, np.zeros((int(seconds * SAMPLE_RATE), CHANNELS), dtype=np.int16)
+        self.written, self._scratch = 0, np.empty((FRAME_SIZE, CHANNELS), dtype=np.float32)
+    def push(self, block):
+        count, size = len(block), len(self.ring)
+        if count > len(self._scratch): self._scratch = np.empty((count, CHANNELS), dtype=np.float32)
+        scaled = self._scratch[:count]
+        np.clip(block, -1.0, 1.0, out=scaled); scaled *= 32767
+        start = self.written % size; first = min(count, size - start)
+        np.copyto(self.ring[start:start + first], scaled[:first], casting="unsafe")
+        if first < count: np.copyto(self.ring[:count - first], scaled[first:], casting="unsafe")
+        self.written += count
+    def snapshot(self):
+        """Returns the buffered audio oldest first. The audio thread keeps writing during the copy, and it only ever
+        overwrites the oldest frames, so any frames it reached mid-copy are trimmed from the start of the clip."""
+        end, size = self.written, len(self.ring)
+        available, start = min(end, size), end % size
+        clip = np.concatenate((self.ring[start:], self.ring[:start])) if end >= size else self.ring[:end].copy()
+        overwritten = max(0, self.written - size - (end - available))
+        return clip[min(overwritten, available):]
+    def save(self, path):
+        clip = self.snapshot()
+        sf.write(path + ".part", clip, SAMPLE_RATE, subtype="PCM_16", format="WAV")
+        os.replace(path + ".part", path)
+        return len(clip)
+
 class AudioOutputManager:
-    def __init__(self, app):
-        self.app, self.p, self.mixer = app, pyaudio.PyAudio(), MixingBuffer()
+    def __init__(self, app, backend=None):
+        self.app, self.p, self.mixer = app, backend or create_audio_backend(), MixingBuffer(limit=False)
         self.output_devices, self.input_devices = self._enumerate_devices()
         self.virtual_mic_device_id = self._find_virtual_mic()
         self.main_stream, self.mic_stream, self.soundboard_monitor_stream, self.mic_monitor_stream = None, None, None, None
         self._mic_buffer, self._mic_buffer_lock = deque(maxlen=10), Lock()
         self._soundboard_monitor_buffer, self._soundboard_monitor_buffer_lock = deque(maxlen=10), Lock()
         self._mic_reader_thread, self._mic_reader_stop_event = None, Event()
-        self.mic_inclusion_event = Event()
+        self.mic_inclusion_event, self.recorder, self.replay = Event(), None, None
+        # Held while the supervisor swaps self.p for a re-initialised backend, and by device lookups from other threads.
+        self.supervisor, self.last_stream_error, self.device_lock = StreamSupervisor(self), None, threading.RLock()
+        # Per-meter [peak, rms, timestamp] written by the audio threads and read by the UI without locking.
+        self.levels = np.zeros((len(METER_NAMES), 3), dtype=np.float64)
         self.master_volume = 1.0
         self.sb_monitor_volume = 0.75
         self.mic_monitor_volume = 0.75
+        # Each output ramps to a new volume over one block instead of jumping. The main output limits last, after the mic and master gain;
+        # the soundboard monitor gets the unlimited mix and limits its own copy.
+        self._master_bus, self._sb_monitor_bus, self._mic_monitor_bus = MasterBus(True, 1.0), MasterBus(True, 0.75), MasterBus(False, 0.75)
 
-    def set_master_volume(self, volume): self.master_volume = volume
-    def set_sb_monitor_volume(self, volume): self.sb_monitor_volume = volume
-    def set_mic_monitor_volume(self, volume): self.mic_monitor_volume = volume
+    def set_master_volume(self, volume): self.master_volume = volume; self._master_bus.set_gain(volume)
+    def set_sb_monitor_volume(self, volume): self.sb_monitor_volume = volume; self._sb_monitor_bus.set_gain(volume)
+    def set_mic_monitor_volume(self, volume): self.mic_monitor_volume = volume; self._mic_monitor_bus.set_gain(volume)
 
     def _enumerate_devices(self):
             output, input_devs = [], []
@@ -536,45 +1780,76 @@ class AudioOutputManager:
         logging.warning("VB-CABLE input not found."); return None
     def get_device_name_by_index(self, index):
         if index is None: return "None"
-        try: return self.p.get_device_info_by_index(index)['name']
-        except (OSError, IndexError): return "Invalid Device"
-
-    def _stream_callback(self, _, frame_count, __, ___):
-        mixed_audio, playing_names = self.mixer.mix_audio(frame_count)
+        try:
+            with self.device_lock: return self.p.get_device_info_by_index(index)['name']
+        except (OSError, IndexError, TypeError, ValueError): return "Invalid Device"
+    def find_device_index(self, name, is_input=False):
+        """First device with this name and enough channels in the given direction; indexes change on re-initialisation, names do not."""
+        key = "maxInputChannels" if is_input else "maxOutputChannels"
+        for i in range(self.p.get_device_count()):
+            info = self.p.get_device_info_by_index(i)
+            if info["name"] == name and info.get(key, 0) >= CHANNELS: return i
+        return None
+    def _notify(self, callback, *args):
+        if hasattr(self.app, "after"): self.app.after(0, callback, *args)
+        else: callback(*args)
+
+    def _meter(self, index, block):
+        # Two reductions and a dot product over the block: no temporaries, only scalar writes into the snapshot.
+        flat = block.reshape(-1)
+        if not len(flat): return
+        levels = self.levels[index]
+        levels[0], levels[1], levels[2] = max(flat.max(), -flat.min()), np.sqrt(np.dot(flat, flat) / len(flat)), time.monotonic()
+
+    def _stream_callback(self, _, frame_count, __, status):
+        start = time.perf_counter()
+        mixed_audio = self.mixer.mix_audio(frame_count)
         is_mic_on = self.mic_inclusion_event.is_set() 
 
-        with current_playing_sound_details_lock:
-            current_playing_sound_details["names"] = playing_names
-            current_playing_sound_details["active"] = bool(playing_names) or is_mic_on
-
-        if self.app.soundboard_monitor_enabled_var.get():
+        if self.soundboard_monitor_stream is not None:
             with self._soundboard_monitor_buffer_lock:
+                # A full buffer means the monitor device runs slower than the main one; its oldest block is dropped.
+                if len(self._soundboard_monitor_buffer) == self._soundboard_monitor_buffer.maxlen: METRICS.counters["monitor_overflows"] += 1
                 self._soundboard_monitor_buffer.append(mixed_audio.copy())
 
+        mic_block = None
         if is_mic_on:
-            mixed_audio += self._get_mic_data_from_buffer(frame_count)
-            np.clip(mixed_audio, -1.0, 1.0, out=mixed_audio)
-
-        mixed_audio *= self.master_volume
+            mic_block = self._get_mic_data_from_buffer(frame_count)
+            mixed_audio += mic_block
+
+        self._master_bus.process(mixed_audio)
+        self._meter(METER_MIX, mixed_audio)
+        recorder, replay = self.recorder, self.replay
+        if recorder is not None: recorder.push(mixed_audio, mic_block)
+        if replay is not None: replay.push(mixed_audio)
+        elapsed = time.perf_counter() - start
+        METRICS.samples["callback_ms"].add(elapsed * 1000); METRICS.counters["callbacks"] += 1
+        if elapsed * SAMPLE_RATE > frame_count: METRICS.counters["callback_overruns"] += 1
+        if status & pyaudio.paOutputUnderflow: METRICS.counters["output_underflows"] += 1
         return (mixed_audio.astype(np.float32).tobytes(), pyaudio.paContinue)
 
     def _soundboard_monitor_callback(self, _, frame_count, __, ___):
         data = np.zeros((frame_count, CHANNELS), dtype=np.float32)
         with self._soundboard_monitor_buffer_lock:
             if self._soundboard_monitor_buffer: data = self._soundboard_monitor_buffer.popleft()
-        
-        return ((data * self.sb_monitor_volume).astype(np.float32).tobytes(), pyaudio.paContinue)
+            else: METRICS.counters["monitor_underruns"] += 1
+        self._sb_monitor_bus.process(data)
+        self._meter(METER_SB_MONITOR, data)
+        return (data.astype(np.float32).tobytes(), pyaudio.paContinue)
     def _mic_monitor_callback(self, _, frame_count, __, ___):
-        data = self._get_mic_data_from_buffer(frame_count)
-        return ((data * self.mic_monitor_volume).astype(np.float32).tobytes(), pyaudio.paContinue)
+        data = self._mic_monitor_bus.process(self._get_mic_data_from_buffer(frame_count).copy())
+        self._meter(METER_MIC_MONITOR, data)
+        return (data.astype(np.float32).tobytes(), pyaudio.paContinue)
 
     def _start_stream(self, stream_attr, device_id, is_input, callback):
+        """Opens a stream; on failure the reason is kept in last_stream_error for the supervisor to report. Supervisor thread only."""
         self._stop_stream(stream_attr)
-        if device_id is None: return
+        if device_id is None: return False
         try:
             stream = self.p.open(format=pyaudio.paFloat32, channels=CHANNELS, rate=SAMPLE_RATE, output=not is_input, input=is_input, frames_per_buffer=FRAME_SIZE, output_device_index=None if is_input else device_id, input_device_index=device_id if is_input else None, stream_callback=callback)
             setattr(self, stream_attr, stream)
             logging.info(f"{stream_attr} started on device index {device_id}")
+            return True
         except Exception as e:
             logging.error(f"Failed to start {stream_attr} on device {device_id}: {e}")
             error_msg = f"Failed to start audio on '{self.get_device_name_by_index(device_id)}'."
@@ -583,8 +1858,8 @@ class AudioOutputManager:
                 elif e.errno == -9999: error_msg += "\nError: Device may be in use by another application or disconnected."
                 else: error_msg += f"\nOS Error: {e.strerror}"
             else: error_msg += f"\nDetails: {e}"
-            messagebox.showerror("Audio Error", error_msg, parent=self.app)
-            self.app.show_status_message(f"Failed to start audio on device {device_id}", "danger")
+            self.last_stream_error = error_msg
+            return False
     
     def _stop_stream(self, stream_attr):
         stream = getattr(self, stream_attr)
@@ -598,34 +1873,55 @@ class AudioOutputManager:
                 setattr(self, stream_attr, None)
                 logging.info(f"{stream_attr} stopped.")
 
-    def start_main_stream(self): self._start_stream('main_stream', self.app.app_settings.get_setting("output_device_id", self.virtual_mic_device_id), False, self._stream_callback)
-    def stop_main_stream(self): self._stop_stream('main_stream')
-    def start_soundboard_monitor_stream(self): self._start_stream('soundboard_monitor_stream', self.app.app_settings.get_setting("soundboard_monitor_device_id"), False, self._soundboard_monitor_callback)
-    def stop_soundboard_monitor_stream(self): self._stop_stream('soundboard_monitor_stream')
-    def start_mic_monitor_stream(self): self._start_stream('mic_monitor_stream', self.app.app_settings.get_setting("mic_monitor_device_id"), False, self._mic_monitor_callback)
-    def stop_mic_monitor_stream(self): self._stop_stream('mic_monitor_stream')
+    # Stream starts and stops are handed to the supervisor thread and return at once.
+    def start_main_stream(self): self.supervisor.request('main_stream', self.app.app_settings.get_setting("output_device_id", self.virtual_mic_device_id))
+    def stop_main_stream(self): self.supervisor.request('main_stream', None)
+    def start_soundboard_monitor_stream(self): self.supervisor.request('soundboard_monitor_stream', self.app.app_settings.get_setting("soundboard_monitor_device_id"))
+    def stop_soundboard_monitor_stream(self): self.supervisor.request('soundboard_monitor_stream', None)
+    def start_mic_monitor_stream(self): self.supervisor.request('mic_monitor_stream', self.app.app_settings.get_setting("mic_monitor_device_id"))
+    def stop_mic_monitor_stream(self): self.supervisor.request('mic_monitor_stream', None)
+    def rescan_devices(self): self.supervisor.rescan()
+
+    def _open_role(self, stream_attr, device_id):
+        if stream_attr == "mic_stream": return self._open_mic_input(device_id)
+        callback = {"main_stream": self._stream_callback, "soundboard_monitor_stream": self._soundboard_monitor_callback, "mic_monitor_stream": self._mic_monitor_callback}[stream_attr]
+        return self._start_stream(stream_attr, device_id, False, callback)
+    def _close_role(self, stream_attr):
+        if stream_attr == "mic_stream": self._close_mic_input()
+        else: self._stop_stream(stream_attr)
+    def _role_healthy(self, stream_attr):
+        stream = getattr(self, stream_attr)
+        try: active = stream is not None and stream.is_active()
+        except OSError: active = False
+        return active and (stream_attr != "mic_stream" or bool(self._mic_reader_thread and self._mic_reader_thread.is_alive()))
 
     def _mic_reader_thread_func(self):
         while not self._mic_reader_stop_event.is_set():
             try:
                 if self.mic_stream and self.mic_stream.is_active():
                     raw_data = self.mic_stream.read(FRAME_SIZE, exception_on_overflow=False)
-                    with self._mic_buffer_lock:
-                        self._mic_buffer.append(np.frombuffer(raw_data, dtype=np.float32).reshape(-1, CHANNELS))
+                    block = np.frombuffer(raw_data, dtype=np.float32).reshape(-1, CHANNELS)
+                    self._meter(METER_MIC, block)
+                    with self._mic_buffer_lock: self._mic_buffer.append(block)
                 else: time.sleep(0.01)
             except Exception as e: logging.error(f"Error in mic reader thread: {e}"); break
         logging.info("Mic reader thread stopped.")
-    def start_mic_input(self):
-        self.stop_mic_input()
-        device_id = self.app.app_settings.get_setting("input_device_id")
-        if device_id is None: return
+    def start_mic_input(self): self.supervisor.request('mic_stream', self.app.app_settings.get_setting("input_device_id"))
+    def stop_mic_input(self): self.supervisor.request('mic_stream', None)
+    def _open_mic_input(self, device_id):
+        self._close_mic_input()
+        if device_id is None: return False
         try:
             self.mic_stream = self.p.open(format=pyaudio.paFloat32, channels=CHANNELS, rate=SAMPLE_RATE, input=True, frames_per_buffer=FRAME_SIZE, input_device_index=device_id)
             self._mic_reader_stop_event.clear()
             self._mic_reader_thread = threading.Thread(target=self._mic_reader_thread_func, daemon=True)
             self._mic_reader_thread.start()
-        except Exception as e: logging.error(f"Failed to start mic input: {e}")
-    def stop_mic_input(self):
+            return True
+        except Exception as e:
+            logging.error(f"Failed to start mic input: {e}")
+            self.last_stream_error = f"Failed to start the microphone on '{self.get_device_name_by_index(device_id)}'.\nDetails: {e}"
+            return False
+    def _close_mic_input(self):
         self._mic_reader_stop_event.set()
         if self._mic_reader_thread: self._mic_reader_thread.join(timeout=0.5)
         self._stop_stream('mic_stream')
@@ -634,23 +1930,204 @@ class AudioOutputManager:
         with self._mic_buffer_lock:
             if self._mic_buffer: return self._mic_buffer.popleft()
         return np.zeros((frame_count, CHANNELS), dtype=np.float32)
+    def start_recording(self, path, mic_stem=False):
+        self.stop_recording()
+        recorder = MixRecorder(path, mic_stem); recorder.start()
+        self.recorder = recorder; logging.info(f"Recording the mix to {path}{' with a mic stem' if mic_stem else ''}.")
+    def stop_recording(self):
+        recorder, self.recorder = self.recorder, None
+        return recorder.stop() if recorder else None
+    def recording_stats(self): return self.recorder.stats() if self.recorder else None
+    def set_replay_seconds(self, seconds):
+        """Resizes the instant-replay ring (0 turns it off); the buffered audio is discarded."""
+        seconds = max(0, min(REPLAY_MAX_SECONDS, int(seconds)))
+        if not self.replay or self.replay.seconds != seconds: self.replay = ReplayBuffer(seconds) if seconds else None
+    def save_replay(self, path):
+        """Writes the replay ring to a WAV clip; returns its frame count, or 0 when replay is off or still empty."""
+        replay = self.replay
+        return replay.save(path) if replay and replay.written else 0
     def close(self):
-        self.stop_mic_input(); self.stop_main_stream(); self.stop_soundboard_monitor_stream(); self.stop_mic_monitor_stream()
+        self.supervisor.stop(); self.stop_recording()
+        for stream_attr in STREAM_ROLES: self._close_role(stream_attr)
         self.p.terminate(); logging.info("PyAudio terminated.")
 
+class StreamSupervisor:
+    """Opens, closes and watches AudioOutputManager's streams on one worker thread, so no caller waits on a device.
+    Every STREAM_SUPERVISOR_INTERVAL it checks that each wanted stream still runs; a stream that died is reopened on its
+    own device if possible, else on the first working fallback from its STREAM_ROLES setting.
+    PortAudio's device list is fixed until it is re-initialised, which stops every stream. So while a stream is on a
+    fallback or failed, probe_audio_devices() checks from a separate process, backing off from STREAM_PROBE_BACKOFF to
+    STREAM_PROBE_BACKOFF_MAX seconds, and the backend is only re-initialised once a device it would rather use is back.
+    Backends with a live device list (the simulated one) are simply re-read every interval."""
+    def __init__(self, manager):
+        self.manager, self.wanted, self.states = manager, {}, {}
+        self._queue, self._thread, self._stop_event = queue.Queue(), None, Event()
+        # _lost: stream_attr -> (perf_counter when the loss was seen, perf_counter when it was last seen running).
+        self._lost, self._last_ok, self._signature = {}, {}, None
+        self._probe_backoff, self._next_probe = STREAM_PROBE_BACKOFF, 0.0
+
+    def _submit(self, *item):
+        if self._stop_event.is_set(): return
+        if not (self._thread and self._thread.is_alive()):
+            self._thread = threading.Thread(target=self._run, daemon=True, name="StreamSupervisor"); self._thread.start()
+        self._queue.put(item)
+    def request(self, stream_attr, device_id):
+        """Wants stream_attr open on device_id, or closed when device_id is None."""
+        self._submit("request", stream_attr, device_id)
+    def rescan(self): self._submit("rescan")
+    def check(self): self._submit("check")
+    def flush(self):
+        """Waits until every request submitted so far has been applied."""
+        if self._thread and self._thread.is_alive(): self._queue.join()
+    def stop(self):
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread(): self._queue.put(("stop",)); self._thread.join(2.0)
+
+    def _run(self):
+        self._signature = self._device_signature()
+        while not self._stop_event.is_set():
+            try: item = self._queue.get(timeout=STREAM_SUPERVISOR_INTERVAL)
+            except queue.Empty: item = None
+            try:
+                if item is None or item[0] == "check": self._check()
+                elif item[0] == "request": self._request(*item[1:])
+                elif item[0] == "rescan": self._reinitialize()
+            except Exception as e: logging.error(f"Stream supervisor failed on {item}: {e}")
+            finally:
+                if item is not None: self._queue.task_done()
+        while True:
+            try: self._queue.get_nowait(); self._queue.task_done()
+            except queue.Empty: return
+
+    def _request(self, stream_attr, device_id):
+        self._lost.pop(stream_attr, None)
+        if device_id is None:
+            self.wanted.pop(stream_attr, None); self.manager._close_role(stream_attr); self._set_state(stream_attr, "stopped")
+            return
+        self.wanted[stream_attr] = self.manager.get_device_name_by_index(device_id)
+        self._open(stream_attr)
+
+    def _candidates(self, stream_attr):
+        """The wanted device name, then the role's fallbacks, in order of preference."""
+        return list(dict.fromkeys([self.wanted[stream_attr]] + list(self.manager.app.app_settings.get_setting(STREAM_ROLES[stream_attr][1], []) or [])))
+    def _open(self, stream_attr):
+        label, _, is_input = STREAM_ROLES[stream_attr]
+        wanted, manager = self.wanted[stream_attr], self.manager
+        for name in self._candidates(stream_attr):
+            index = manager.find_device_index(name, is_input)
+            if index is None or not manager._open_role(stream_attr, index): continue
+            lost, now = self._lost.pop(stream_attr, None), time.perf_counter()
+            self._last_ok[stream_attr] = now
+            state = "running" if name == wanted else "fallback"
+            self._set_state(stream_attr, state, name, quiet=bool(lost))
+            if lost:
+                recovery_ms = (now - lost[0]) * 1000
+                METRICS.observe("stream_recovery_ms", recovery_ms)
+                logging.info(f"{label} recovered on '{name}' {recovery_ms:.0f} ms after the loss was detected (last seen running {(lost[0] - lost[1]) * 1000:.0f} ms before that).")
+                manager._notify(manager.app.show_status_message, f"{label} recovered on '{name}' in {recovery_ms:.0f} ms.", "success" if state == "running" else "warning")
+            return True
+        manager._close_role(stream_attr)
+        self._set_state(stream_attr, "failed", error=manager.last_stream_error if manager.find_device_index(wanted, is_input) is not None else f"'{wanted}' is not available and no fallback device worked.")
+        return False
+
+    def _set_state(self, stream_attr, state, device=None, error=None, quiet=False):
+        previous, current = self.states.get(stream_attr), {"state": state, "device": device, "error": error}
+        self.states[stream_attr] = current
+        if previous == current: return
+        app, label = self.manager.app, STREAM_ROLES[stream_attr][0]
+        if hasattr(app, "on_stream_state"): self.manager._notify(app.on_stream_state, stream_attr, dict(current))
+        if quiet: return
+        if state == "failed": self.manager._notify(app.show_status_message, f"{label}: {error}".replace("\n", " "), "danger")
+        elif state == "fallback": self.manager._notify(app.show_status_message, f"{label}: '{self.wanted[stream_attr]}' is unavailable, using '{device}'.", "warning")
+
+    def _device_signature(self):
+        p = self.manager.p
+        return tuple((info["name"], info.get("present", True)) for info in map(p.get_device_info_by_index, range(p.get_device_count())))
+
+    def _check(self, changed=False):
+        manager, now, newly_lost = self.manager, time.perf_counter(), []
+        live = getattr(manager.p, "live_device_list", False)
+        if live:
+            signature = self._device_signature()
+            if self._signature is not None and signature != self._signature:
+                logging.info("Audio device list changed."); self._refresh_devices({}); changed = True
+            self._signature = signature
+        for stream_attr in list(self.wanted):
+            if manager._role_healthy(stream_attr): self._last_ok[stream_attr] = now
+            elif stream_attr not in self._lost and self.states.get(stream_attr, {}).get("state") in ("running", "fallback"):
+                self._lost[stream_attr] = (now, self._last_ok.get(stream_attr, now)); newly_lost.append(stream_attr)
+                logging.warning(f"{STREAM_ROLES[stream_attr][0]} stream on '{self.states[stream_attr]['device']}' stopped unexpectedly.")
+        for stream_attr in list(self.wanted):
+            healthy, state = manager._role_healthy(stream_attr), self.states.get(stream_attr, {}).get("state")
+            # A lost stream first tries the devices already known; only a changed device list can bring a missing one back.
+            if stream_attr in newly_lost or (changed and (not healthy or state == "fallback")): self._open(stream_attr)
+        if not live: self._probe()
+
+    def _probe(self):
+        """Re-initialises the backend once a device that a degraded stream prefers shows up in a fresh enumeration."""
+        degraded = [attr for attr in self.wanted if self.states.get(attr, {}).get("state") in ("fallback", "failed")]
+        if not degraded: self._probe_backoff, self._next_probe = STREAM_PROBE_BACKOFF, 0.0; return
+        if not self._next_probe: self._next_probe = time.monotonic() + self._probe_backoff
+        if time.monotonic() < self._next_probe: return
+        keys = probe_audio_devices()
+        self._probe_backoff = min(self._probe_backoff * 2, STREAM_PROBE_BACKOFF_MAX); self._next_probe = time.monotonic() + self._probe_backoff
+        if keys is None: return
+        for stream_attr in degraded:
+            state, is_input = self.states[stream_attr], STREAM_ROLES[stream_attr][2]
+            candidates = self._candidates(stream_attr)
+            better = candidates[:candidates.index(state["device"])] if state["state"] == "fallback" and state["device"] in candidates else candidates
+            back = next((name for name in better if any(key[0] == name and key[1 if is_input else 2] for key in keys)), None)
+            if back is None: continue
+            logging.info(f"'{back}' is available again for {STREAM_ROLES[stream_attr][0]}; re-initialising the audio backend.")
+            self._reinitialize()
+            return
+
+    def _reinitialize(self):
+        """Re-creates the backend so it enumerates devices afresh, then reopens the wanted streams on their best device.
+        A live backend needs no re-creation, so only its failed and fallback streams are reopened."""
+        manager = self.manager
+        with manager.device_lock:
+            p = manager.p
+            live, old = getattr(p, "live_device_list", False), {i: audio_device_key(p.get_device_info_by_index(i)) for i in range(p.get_device_count())}
+            if not live:
+                for stream_attr in STREAM_ROLES: manager._close_role(stream_attr)
+                p.terminate(); manager.p = type(p)()
+                logging.info("Audio backend re-initialised to pick up device changes.")
+            self._refresh_devices(old); self._signature = self._device_signature()
+        for stream_attr in list(self.wanted):
+            if not live or not manager._role_healthy(stream_attr) or self.states.get(stream_attr, {}).get("state") == "fallback": self._open(stream_attr)
+
+    def _refresh_devices(self, old):
+        """Re-reads the device lists and tells the app how the old device indexes map onto the new ones."""
+        manager = self.manager
+        with manager.device_lock:
+            manager.output_devices, manager.input_devices = manager._enumerate_devices()
+            manager.virtual_mic_device_id = manager._find_virtual_mic()
+            current = {}
+            for i in range(manager.p.get_device_count()): current.setdefault(audio_device_key(manager.p.get_device_info_by_index(i)), i)
+        remap = {index: current[key] for index, key in old.items() if key in current}
+        if hasattr(manager.app, "on_audio_devices_changed"): manager._notify(manager.app.on_audio_devices_changed, remap)
+
 class KeybindManager:
     def __init__(self, app):
         self.app, self.hotkey_registry, self.active_keys = app, {}, set()
         self.listener, self.mouse_listener = None, None
     def update_hotkeys(self):
-        self.stop(); self.hotkey_registry.clear()
-        for sound in self.app.sound_manager.sounds:
+        """Builds the map for the active board aside and swaps it in with one assignment, so a key pressed during a
+        board switch sees the old map or the new one, never a half-built one. The listeners keep running throughout."""
+        registry, sound_manager = {}, self.app.sound_manager
+        for sound in sound_manager.sounds:
             if sound.get("hotkeys") and sound.get("enabled", True):
-                self.hotkey_registry[tuple(sorted(sound["hotkeys"]))] = lambda s_id=sound["id"]: self.app.play_sound(s_id)
-        global_hotkeys = self.app.sound_manager.global_hotkeys
-        if global_hotkeys.get("stop_all"): self.hotkey_registry[tuple(sorted(global_hotkeys["stop_all"]))] = self.app.stop_all_sounds
-        if global_hotkeys.get("toggle_mic_to_mixer"): self.hotkey_registry[tuple(sorted(global_hotkeys["toggle_mic_to_mixer"]))] = self.app.toggle_mic_to_mixer_from_hotkey
-        if self.hotkey_registry: self.start(); logging.info(f"KeybindManager started with {len(self.hotkey_registry)} hotkeys.")
+                registry[tuple(sorted(sound["hotkeys"]))] = lambda s_id=sound["id"]: (METRICS.trigger(s_id), self.app.play_sound(s_id))
+        global_hotkeys = sound_manager.global_hotkeys
+        if global_hotkeys.get("stop_all"): registry[tuple(sorted(global_hotkeys["stop_all"]))] = self.app.stop_all_sounds
+        if global_hotkeys.get("toggle_mic_to_mixer"): registry[tuple(sorted(global_hotkeys["toggle_mic_to_mixer"]))] = self.app.toggle_mic_to_mixer_from_hotkey
+        if global_hotkeys.get("save_replay"): registry[tuple(sorted(global_hotkeys["save_replay"]))] = self.app.save_replay
+        for sequence in sound_manager.sequences:
+            if sequence.get("hotkeys"): registry[tuple(sorted(sequence["hotkeys"]))] = lambda q_id=sequence["id"]: self.app.sequence_player.play(q_id)
+        self.hotkey_registry = registry
+        if registry: self.start(); logging.info(f"KeybindManager running with {len(registry)} hotkeys.")
+        else: self.stop()
     def _on_press(self, key):
         key_str = get_pynput_key_string(key)
         if key_str: self.active_keys.add(key_str); self.check_hotkeys()
@@ -661,12 +2138,11 @@ class KeybindManager:
         if pressed and button not in [mouse.Button.left, mouse.Button.right]:
             key_str = get_pynput_key_string(button)
             if key_str:
-                hotkey_tuple = tuple(sorted(self.active_keys | {key_str}))
-                if hotkey_tuple in self.hotkey_registry: self.hotkey_registry[hotkey_tuple]()
+                action = self.hotkey_registry.get(tuple(sorted(self.active_keys | {key_str})))
+                if action: action()
     def check_hotkeys(self):
-        current_keys_tuple = tuple(sorted(self.active_keys))
-        if current_keys_tuple in self.hotkey_registry:
-            self.hotkey_registry[current_keys_tuple]()
+        action = self.hotkey_registry.get(tuple(sorted(self.active_keys)))
+        if action: action()
     def start(self):
         if not (self.listener and self.listener.is_alive()):
             self.listener = keyboard.Listener(on_press=self._on_press, on_release=self._on_release)
@@ -679,6 +2155,372 @@ class KeybindManager:
         if self.mouse_listener: self.mouse_listener.stop()
         self.active_keys.clear()
 
+class SequencePlayer:
+    """Plays cue sequences and playlists. A worker thread per run decodes up to SEQUENCE_LOOKAHEAD items ahead into the
+    sound cache and queues them on the mixer cue, which starts each one sample-accurately when the previous one ends."""
+    def __init__(self, app):
+        self.app, self._runs, self._cues, self._lock = app, {}, {}, Lock()
+    def is_playing(self, sequence_id): return sequence_id in self._runs
+    def play(self, sequence_id):
+        """(Re)starts a sequence from its first item; safe to call from hotkey threads."""
+        sequence = self.app.sound_manager.get_sequence_by_id(sequence_id)
+        if not sequence or not sequence["items"]: return False
+        self.stop(sequence_id)
+        stop_event = Event()
+        with self._lock: self._runs[sequence_id] = stop_event; self._cues[sequence_id] = cue = f"{sequence_id}:{uuid.uuid4().hex[:8]}"
+        threading.Thread(target=self._run, args=(sequence, cue, stop_event), daemon=True).start()
+        return True
+    def stop(self, sequence_id=None):
+        with self._lock:
+            ids = list(self._cues) if sequence_id is None else [sequence_id]
+            for q_id in ids:
+                if q_id in self._runs: self._runs.pop(q_id).set()
+                cue = self._cues.pop(q_id, None)
+                if cue: self.app.audio_manager.mixer.stop_cue(cue)
+
+    def _items(self, sequence):
+        while True:
+            items = list(sequence["items"])
+            if sequence.get("shuffle"): random.shuffle(items)
+            yield from items
+            if not sequence.get("loop"): return
+
+    def _prefetch(self, item):
+        sound = self.app.sound_manager.get_sound_by_id(item["id"])
+        if not sound or not sound.get("enabled", True): return None, None
+        return sound, self.app.sound_manager.cached_sound_data(sound)
+
+    def _cue_alive(self, cue, state):
+        """Whether the cue is still running; state["seen"] latches once the mixer reports it, so a fresh cue gets a grace period."""
+        if cue in self.app.audio_manager.mixer.cue_snapshot: state["seen"] = True; return True
+        return not state["seen"] and time.monotonic() - state["started"] < SEQUENCE_START_TIMEOUT
+
+    def _run(self, sequence, cue, stop_event):
+        mixer, items, state, first, misses = self.app.audio_manager.mixer, self._items(sequence), {"seen": False, "started": time.monotonic()}, True, 0
+        try:
+            for item in items:
+                # Decoding happens here, ahead of time, so a transition never waits on a cold cache.
+                sound, data = self._prefetch(item)
+                if data is None:
+                    logging.warning(f"Sequence '{sequence['name']}' skipped a missing or disabled sound ({item['id']}).")
+                    misses += 1
+                    if misses >= len(sequence["items"]): break
+                    continue
+                misses = 0
+                if first: mixer.add_sound(data, sound["volume"], False, sound["id"], sound["name"], sound.get("max_voices", 1), cue=cue); first = False; continue
+                while mixer.cue_snapshot.get(cue, 0) >= SEQUENCE_LOOKAHEAD and self._cue_alive(cue, state) and not stop_event.is_set(): stop_event.wait(SEQUENCE_POLL_SECONDS)
+                if stop_event.is_set() or not self._cue_alive(cue, state): break
+                if not mixer.queue_cue(data, sound["volume"], sound["id"], sound["name"], cue, item.get("gap_ms", 0) * SAMPLE_RATE // 1000):
+                    logging.info(f"Sequence '{sequence['name']}' ended before '{sound['name']}' was queued."); break
+                # The mixer reports queue depth once per block, so give it a block before reading the depth again.
+                stop_event.wait(SEQUENCE_POLL_SECONDS)
+            while self._cue_alive(cue, state) and not stop_event.is_set(): stop_event.wait(SEQUENCE_POLL_SECONDS)
+        except Exception as e: logging.error(f"Sequence '{sequence['name']}' failed: {e}")
+        with self._lock:
+            if self._runs.get(sequence["id"]) is stop_event: del self._runs[sequence["id"]]
+
+# --- Audio Engine Process ---
+class RemoteMixer:
+    """Parent-side stand-in for MixingBuffer: commands go down the engine pipe, voice events and snapshots come back."""
+    def __init__(self, client):
+        self.client, self.voice_events, self.voice_events_overflowed, self.voice_snapshot = client, deque(maxlen=VOICE_EVENT_CAPACITY), False, ()
+        self.single_sound_mode, self.voice_limit, self.cue_snapshot = False, (DEFAULT_MAX_VOICES, "oldest"), {}
+    def add_sound(self, data, volume, loop, sound_id, sound_name, max_voices=1, cue=None):
+        self.client.share(sound_id, data); self.client.send("mixer", "add_sound", sound_id, volume, loop, sound_id, sound_name, max_voices, cue)
+    def queue_cue(self, data, volume, sound_id, sound_name, cue, gap_frames=0):
+        self.client.share(sound_id, data); self.client.send("mixer", "queue_cue", sound_id, volume, sound_id, sound_name, cue, gap_frames)
+        return True
+    def stop_cue(self, cue): self.client.send("mixer", "stop_cue", cue)
+    def remove_sound_by_id(self, sound_id):
+        self.client.send("mixer", "remove_sound_by_id", sound_id)
+        return any(v["id"] == sound_id for v in self.voice_snapshot)
+    def clear_sounds(self): self.client.send("mixer", "clear_sounds")
+    def set_sound_volume(self, sound_id, volume): self.client.send("mixer", "set_sound_volume", sound_id, volume)
+    def set_single_sound_mode(self, enabled):
+        self.single_sound_mode = enabled; self.client.send("mixer", "set_single_sound_mode", enabled)
+    def set_voice_limit(self, max_voices, steal_policy="oldest"):
+        self.voice_limit = (max_voices, steal_policy); self.client.send("mixer", "set_voice_limit", max_voices, steal_policy)
+    def active_voices(self): return [(v["id"], v["name"]) for v in self.voice_snapshot if v["started"]]
+
+class EngineProcessClient(AudioOutputManager):
+    """AudioOutputManager whose mixer and PyAudio streams live in a child process, out of reach of the UI's GIL.
+    Cached PCM moves into shared memory on first play and the child maps it; control goes over a pipe. A segment whose
+    array left the sound cache is unloaded, and closed once the child reports no voice uses it. Meter levels
+    and a heartbeat share one small shared array. A stalled or dead engine is restarted and its state replayed.
+    The local PyAudio instance is only used to enumerate devices. Restarts back off exponentially; after
+    ENGINE_MAX_RESTARTS in a row the app is switched to an in-process AudioOutputManager."""
+    def __init__(self, app):
+        super().__init__(app)
+        self._levels_shm = shared_memory.SharedMemory(create=True, size=(len(METER_NAMES) + 1) * 3 * 8)
+        shared = np.ndarray((len(METER_NAMES) + 1, 3), dtype=np.float64, buffer=self._levels_shm.buf); shared.fill(0.0)
+        self.levels, self._heartbeat = shared[:-1], shared[-1]
+        self.mixer, self.restarts, self._failures, self._closing, self._recording = RemoteMixer(self), 0, 0, False, None
+        self._replay_seconds, self._replay_reply, self._replay_frames = 0, Event(), 0
+        self._send_lock, self._share_lock, self._shared, self._streams = Lock(), Lock(), {}, set()
+        # Segments unloaded but maybe still played by the engine (name -> segment), and released ones whose close is pending.
+        self._retired, self._unclosed = {}, []
+        self._spawn()
+        threading.Thread(target=self._monitor_health, daemon=True).start()
+
+    def _spawn(self):
+        context = multiprocessing.get_context("spawn")
+        self._conn, child_conn = context.Pipe()
+        self._heartbeat[0], self._loaded, self._started_at = 0.0, set(), time.monotonic()
+        self._process = context.Process(target=run_audio_engine, args=(child_conn, self._levels_shm.name), daemon=True, name="WarpBoardAudioEngine")
+        self._process.start(); child_conn.close()
+        threading.Thread(target=self._receive, args=(self._conn,), daemon=True).start()
+        logging.info(f"Audio engine process started (pid {self._process.pid}).")
+
+    def send(self, *message):
+        with self._send_lock:
+            try: self._conn.send(message)
+            except (OSError, EOFError, BrokenPipeError) as e: logging.warning(f"Audio engine pipe unavailable ({message[0]}): {e}")
+
+    def share(self, sound_id, data):
+        """Moves data into a shared-memory segment (once per cached array) and tells the current engine to map it."""
+        with self._share_lock:
+            entry = self._shared.get(sound_id)
+            if entry is None or entry[1] is not data:
+                if entry: self._unload(sound_id)
+                segment = shared_memory.SharedMemory(create=True, size=max(1, data.nbytes))
+                view = np.ndarray(data.shape, dtype=data.dtype, buffer=segment.buf); view[...] = data
+                self._shared[sound_id] = (segment, view); self._loaded.discard(sound_id)
+                if self.app.sound_manager.sound_data_cache.get(sound_id) is data: self.app.sound_manager.sound_data_cache[sound_id] = view
+            if sound_id not in self._loaded:
+                segment, view = self._shared[sound_id]
+                self.send("load", sound_id, segment.name, view.shape, view.dtype.str); self._loaded.add(sound_id)
+
+    def _unload(self, sound_id):
+        """Drops sound_id's segment name and asks the engine to unmap it once its voices are done. Caller holds _share_lock."""
+        segment, _ = self._shared.pop(sound_id)
+        try: segment.unlink()
+        except OSError: pass
+        if sound_id not in self._loaded:
+            if not self._try_close(segment): self._unclosed.append(segment)
+            return
+        self._retired[segment.name] = segment; self._loaded.discard(sound_id)
+        self.send("unload", sound_id, segment.name)
+    def _unload_evicted(self):
+        # The cache holds the shared view while a sound is cached; anything else was evicted, trimmed or re-decoded.
+        cache = self.app.sound_manager.sound_data_cache
+        with self._share_lock:
+            for sound_id in [i for i, (_, view) in self._shared.items() if cache.get(i) is not view]: self._unload(sound_id)
+            self._unclosed = [segment for segment in self._unclosed if not self._try_close(segment)]
+    def _close_segment(self, name):
+        segment = self._retired.pop(name, None)
+        if segment is not None and not self._try_close(segment): self._unclosed.append(segment)
+    @staticmethod
+    def _try_close(segment):
+        # Arrays still referencing the buffer (a sequence or preview holding the old data) keep it mapped until they go.
+        try: segment.close(); return True
+        except BufferError: return False
+
+    def _receive(self, conn):
+        while True:
+            try: message = conn.recv()
+            except (OSError, EOFError): return
+            if message[0] == "state":
+                _, events, snapshot, cues, overflowed = message
+                self.mixer.voice_events.extend(events); self.mixer.voice_snapshot, self.mixer.cue_snapshot = snapshot, cues
+                if overflowed: self.mixer.voice_events_overflowed = True
+            elif message[0] == "recording": self._recording = message[1]
+            elif message[0] == "metrics": METRICS.merge_audio(message[1])
+            elif message[0] == "replay_saved": self._replay_frames = message[1]; self._replay_reply.set()
+            elif message[0] == "released":
+                with self._share_lock: self._close_segment(message[1])
+            elif message[0] == "status": self._notify(self.app.show_status_message, *message[1:])
+            elif message[0] == "error": self._notify(self.app.report_error, *message[1:])
+            elif message[0] == "stream_state":
+                self.supervisor.states[message[1]] = message[2]
+                if hasattr(self.app, "on_stream_state"): self._notify(self.app.on_stream_state, *message[1:])
+
+    def _monitor_health(self):
+        while not self._closing:
+            time.sleep(ENGINE_HEALTH_INTERVAL)
+            if self._closing: return
+            beat, now = self._heartbeat[0], time.monotonic()
+            if self._process.is_alive() and (now - beat < ENGINE_STALL_SECONDS if beat else now - self._started_at < ENGINE_START_TIMEOUT):
+                if self._failures and beat and now - self._started_at > ENGINE_STABLE_SECONDS: self._failures = 0
+                self._unload_evicted(); continue
+            reason = "exited" if not self._process.is_alive() else "stopped responding"
+            if self._process.is_alive(): self._process.terminate()
+            self._process.join(1.0)
+            with self._share_lock:
+                for name in list(self._retired): self._close_segment(name)
+            if self._failures >= ENGINE_MAX_RESTARTS:
+                logging.error(f"Audio engine {reason} (exit code {self._process.exitcode}) after {self._failures} restarts; running audio in-process.")
+                self._notify(self._fall_back_in_process); return
+            delay = ENGINE_RESTART_BACKOFF * 2 ** self._failures
+            logging.error(f"Audio engine {reason} (exit code {self._process.exitcode}); restarting in {delay:.1f} s.")
+            self._failures += 1; time.sleep(delay)
+            if self._closing: return
+            self.restarts += 1; self._spawn(); self._replay()
+            self._notify(self.app.show_status_message, f"Audio engine {reason} and was restarted.", "warning")
+
+    def _fall_back_in_process(self):
+        """Replaces this client on the app with an in-process AudioOutputManager in the same state."""
+        if self._closing: return
+        self.close()
+        manager = AudioOutputManager(self.app)
+        manager.set_master_volume(self.master_volume); manager.set_sb_monitor_volume(self.sb_monitor_volume); manager.set_mic_monitor_volume(self.mic_monitor_volume)
+        manager.mixer.set_single_sound_mode(self.mixer.single_sound_mode); manager.mixer.set_voice_limit(*self.mixer.voice_limit)
+        if self._replay_seconds: manager.set_replay_seconds(self._replay_seconds)
+        for method in sorted(self._streams): getattr(manager, method)()
+        if self.mic_inclusion_event.is_set(): manager.mic_inclusion_event.set(); manager.start_mic_input()
+        self.app.audio_manager = manager
+        self.app.show_status_message("The audio engine process keeps failing; audio now runs inside the app.", "danger")
+
+    def _replay(self):
+        """Restores a fresh engine to the parent's view of volumes, mixer limits, open streams and mic state; sounds reload on demand.
+        A recording in progress ends with the old engine and is not resumed, so its file is never overwritten."""
+        self._recording = None
+        self.send("call", "set_master_volume", self.master_volume); self.send("call", "set_sb_monitor_volume", self.sb_monitor_volume)
+        self.send("call", "set_mic_monitor_volume", self.mic_monitor_volume)
+        self.send("mixer", "set_single_sound_mode", self.mixer.single_sound_mode); self.send("mixer", "set_voice_limit", *self.mixer.voice_limit)
+        if self._replay_seconds: self.send("call", "set_replay_seconds", self._replay_seconds)
+        for method in sorted(self._streams): self._start_remote(method)
+        if self.mic_inclusion_event.is_set(): self.start_mic_input()
+
+    def _start_remote(self, method):
+        self.send("settings", dict(self.app.app_settings.settings)); self.send("call", method)
+
+    def set_master_volume(self, volume): self.master_volume = volume; self.send("call", "set_master_volume", volume)
+    def set_sb_monitor_volume(self, volume): self.sb_monitor_volume = volume; self.send("call", "set_sb_monitor_volume", volume)
+    def set_mic_monitor_volume(self, volume): self.mic_monitor_volume = volume; self.send("call", "set_mic_monitor_volume", volume)
+    def start_main_stream(self): self._streams.add("start_main_stream"); self._start_remote("start_main_stream")
+    def stop_main_stream(self): self._streams.discard("start_main_stream"); self.send("call", "stop_main_stream")
+    def start_soundboard_monitor_stream(self): self._streams.add("start_soundboard_monitor_stream"); self._start_remote("start_soundboard_monitor_stream")
+    def stop_soundboard_monitor_stream(self): self._streams.discard("start_soundboard_monitor_stream"); self.send("call", "stop_soundboard_monitor_stream")
+    def start_mic_monitor_stream(self): self._streams.add("start_mic_monitor_stream"); self._start_remote("start_mic_monitor_stream")
+    def stop_mic_monitor_stream(self): self._streams.discard("start_mic_monitor_stream"); self.send("call", "stop_mic_monitor_stream")
+    def start_recording(self, path, mic_stem=False):
+        self._recording = {"path": path, "mic_path": "-mic".join(os.path.splitext(path)) if mic_stem else None, "seconds": 0.0, "elapsed": 0.0, "dropped_blocks": 0, "buffered_blocks": 0, "error": None}
+        self.send("call", "start_recording", path, mic_stem)
+    def stop_recording(self):
+        stats, self._recording = self._recording, None
+        if stats: self.send("call", "stop_recording")
+        return stats
+    def recording_stats(self): return self._recording
+    def set_replay_seconds(self, seconds): self._replay_seconds = seconds; self.send("call", "set_replay_seconds", seconds)
+    def save_replay(self, path):
+        """The ring lives in the engine, so the engine writes the clip; this waits for its reply."""
+        self._replay_reply.clear(); self._replay_frames = 0
+        self.send("call", "save_replay", path)
+        if not self._replay_reply.wait(ENGINE_REPLY_TIMEOUT): logging.error("Audio engine did not answer the replay save in time.")
+        return self._replay_frames
+    def start_mic_input(self): self.send("settings", dict(self.app.app_settings.settings)); self.send("mic", self.mic_inclusion_event.is_set(), True)
+    def stop_mic_input(self): self.send("mic", self.mic_inclusion_event.is_set(), False)
+    def rescan_devices(self): self.send("call", "rescan_devices"); super().rescan_devices()
+
+    def close(self):
+        self._closing = True
+        self.supervisor.stop()
+        self.send("close")
+        self._process.join(2.0)
+        if self._process.is_alive(): self._process.terminate()
+        for segment in [entry[0] for entry in self._shared.values()] + [self._levels_shm]:
+            try: segment.unlink()
+            except OSError: pass
+        self.p.terminate(); logging.info("Audio engine process stopped.")
+
+class EngineHost:
+    """Child-process side of EngineProcessClient: owns PyAudio and a real AudioOutputManager and applies pipe commands."""
+    _CALLS = {"start_main_stream", "stop_main_stream", "start_soundboard_monitor_stream", "stop_soundboard_monitor_stream", "start_mic_monitor_stream", "stop_mic_monitor_stream",
+              "set_master_volume", "set_sb_monitor_volume", "set_mic_monitor_volume", "start_recording", "stop_recording", "set_replay_seconds", "save_replay", "rescan_devices"}
+    _MIXER_CALLS = {"add_sound", "queue_cue", "stop_cue", "remove_sound_by_id", "clear_sounds", "set_sound_volume", "set_single_sound_mode", "set_voice_limit"}
+    def __init__(self, conn, levels_name):
+        # data: sound id -> mapped array; _segments: segment name -> segment; _retired: unloaded segment name -> its array, until no voice plays it.
+        self.conn, self._send_lock, self.app_settings, self.data, self._segments, self._retired = conn, Lock(), AppSettingsManager(), {}, {}, {}
+        # _checked: (retired names, arrays the mixer still plays), handed over by the audio thread for _release_segments.
+        self._checked, self._checking = None, False
+        self._levels_shm = shared_memory.SharedMemory(name=levels_name)
+        shared = np.ndarray((len(METER_NAMES) + 1, 3), dtype=np.float64, buffer=self._levels_shm.buf)
+        self.audio_manager = AudioOutputManager(self)
+        self.audio_manager.levels, self._heartbeat, self._running = shared[:-1], shared[-1], True
+
+    def _send(self, *message):
+        with self._send_lock:
+            try: self.conn.send(message)
+            except (OSError, EOFError): self._running = False
+    def show_status_message(self, message, style="info"): self._send("status", message, style)
+    def report_error(self, title, message): self._send("error", title, message)
+    def on_stream_state(self, stream_attr, state): self._send("stream_state", stream_attr, state)
+
+    def _publish_state(self):
+        mixer, last_snapshot, tick = self.audio_manager.mixer, None, 0
+        while self._running:
+            self._heartbeat[0], tick = time.monotonic(), tick + 1
+            if self.audio_manager.recorder and tick % 25 == 0: self._send("recording", self.audio_manager.recording_stats())
+            if tick % 50 == 0: self._send("metrics", METRICS.drain_audio())
+            if self._retired and tick % 25 == 0: self._release_segments()
+            events = []
+            while mixer.voice_events: events.append(mixer.voice_events.popleft())
+            overflowed, mixer.voice_events_overflowed = mixer.voice_events_overflowed, False
+            if events or overflowed or mixer.voice_snapshot is not last_snapshot:
+                last_snapshot = mixer.voice_snapshot; self._send("state", events, last_snapshot, mixer.cue_snapshot, overflowed)
+            time.sleep(ENGINE_STATE_INTERVAL)
+
+    def _release_segments(self):
+        """Unmaps unloaded segments that no voice or queued cue still plays and tells the parent it may free them. The mixer
+        reports what it plays from the audio thread, so a check asked for on one tick is acted on at a later one."""
+        checked, self._checked = self._checked, None
+        if checked is not None:
+            names, playing = checked; self._checking = False
+            for name in names:
+                if name not in self._retired or id(self._retired[name]) in playing: continue
+                self._retired[name] = None
+                try: self._segments[name].close()
+                except BufferError: continue
+                del self._segments[name], self._retired[name]; self._send("released", name)
+        if self._retired and not self._checking:
+            self._checking, names = True, list(self._retired)
+            def done(playing): self._checked = (names, playing)
+            self.audio_manager.mixer.collect_playing(done)
+
+    def serve(self):
+        threading.Thread(target=self._publish_state, daemon=True).start()
+        manager = self.audio_manager
+        while self._running:
+            try: message = self.conn.recv()
+            except (OSError, EOFError): break
+            kind, args = message[0], message[1:]
+            try:
+                if kind == "load":
+                    sound_id, name, shape, dtype = args
+                    segment = shared_memory.SharedMemory(name=name); self._segments[name] = segment
+                    self.data[sound_id] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+                elif kind == "unload":
+                    # Only sent for the segment this engine currently has loaded for sound_id.
+                    sound_id, name = args
+                    if name in self._segments: self._retired[name] = self.data.pop(sound_id, None)
+                elif kind == "mixer" and args[0] in self._MIXER_CALLS:
+                    if args[0] in ("add_sound", "queue_cue"): args = (args[0], self.data[args[1]], *args[2:])
+                    getattr(manager.mixer, args[0])(*args[1:])
+                elif kind == "call" and args[0] in self._CALLS:
+                    result = getattr(manager, args[0])(*args[1:])
+                    if args[0] == "start_recording": self._send("recording", manager.recording_stats())
+                    elif args[0] == "stop_recording" and result: logging.info(f"Engine recording finished: {result}")
+                    elif args[0] == "save_replay": self._send("replay_saved", result)
+                elif kind == "settings": self.app_settings.settings = args[0]
+                elif kind == "mic":
+                    included, running = args
+                    if included: manager.mic_inclusion_event.set()
+                    else: manager.mic_inclusion_event.clear()
+                    if running: manager.start_mic_input()
+                    else: manager.stop_mic_input()
+                elif kind == "close": break
+            except Exception as e:
+                logging.error(f"Audio engine failed to apply {kind} {args[:1]}: {e}")
+                if args[:1] == ("start_recording",): self._send("recording", None); self.report_error("Recording Failed", str(e))
+                elif args[:1] == ("save_replay",): self._send("replay_saved", 0)
+        self._running = False
+        manager.close()
+
+def run_audio_engine(conn, levels_name):
+    """Entry point of the audio engine child process."""
+    logging.basicConfig(filename=LOG_FILE, level=logging.INFO, format='%(asctime)s - %(levelname)s - engine - %(message)s')
+    try: EngineHost(conn, levels_name).serve()
+    except Exception as e: logging.critical(f"Audio engine crashed: {e}")
 
 # --- Main Application ---
 class SoundboardApp(ttk.Window):
@@ -705,13 +2547,16 @@ class SoundboardApp(ttk.Window):
             logging.warning(f"Icon file not found: {icon_path}")
 
         # --- Existing initialization ---
-        self.sound_manager = SoundManager()
-        self.audio_manager = AudioOutputManager(self)
-        self.keybind_manager = KeybindManager(self)
+        self.sound_manager = SoundManager("int16" if self.app_settings.get_setting("compact_sample_cache", True) else "float32")
+        self.audio_manager = (EngineProcessClient if self.app_settings.get_setting("audio_engine_process", False) else AudioOutputManager)(self)
+        self.keybind_manager, self.sequence_player = KeybindManager(self), SequencePlayer(self)
         
         self.sound_card_widgets, self.ordered_sound_ids, self.selected_sound_ids, self.last_selected_id = {}, [], set(), None
+        self.visible_sound_ids, self.card_pool, self._card_height, self._sort_key_by_id = [], [], None, {}
+        self.search_index, self._filter_after_id, self._applied_query, self._ranked_positions = SoundSearchIndex(), None, None, None
         self.unfiltered_output_devices, self.unfiltered_input_devices, self.filtered_input_devices, self.filtered_monitor_devices = [], [], [], []
-        self.grid_columns = 4
+        self.grid_columns, self._canvas_size, self._resize_after_id = 4, (0, 0), None
+        self._playing_voices, self._now_playing_active, self._now_playing_interval, self._now_playing_job = {}, None, NOW_PLAYING_POLL_MS, None
 
         self._init_tk_vars()
         self._load_settings()
@@ -723,11 +2568,15 @@ class SoundboardApp(ttk.Window):
         self.populate_sound_list()
 
         self.after(100, self._first_run_check) 
+        self._watch_scan_running = False
+        self.after(2000, self._periodic_watch_rescan)
+        self.metrics_exporter = MetricsExporter(self, METRICS_PORT if self.metrics_http_var.get() else None)
         
         self.keybind_manager.update_hotkeys()
         self.audio_manager.start_main_stream()
 
         self.update_now_playing_status()
+        self._update_meters()
         self.protocol("WM_DELETE_WINDOW", self._on_app_closure)
         self.update_idletasks()
         self._on_frame_configure()
@@ -752,17 +2601,25 @@ class SoundboardApp(ttk.Window):
         self.include_mic_in_mix_var, self.soundboard_monitor_enabled_var, self.mic_monitor_enabled_var = tk.BooleanVar(), tk.BooleanVar(), tk.BooleanVar()
         self.master_volume_var, self.soundboard_monitor_volume_var, self.mic_monitor_volume_var = tk.DoubleVar(), tk.DoubleVar(), tk.DoubleVar()
         self.current_theme_var, self.single_sound_mode_var, self.auto_start_mic_var = tk.StringVar(), tk.BooleanVar(), tk.BooleanVar()
-        self.stop_all_hotkey_var, self.toggle_mic_hotkey_var = tk.StringVar(value="Not Assigned"), tk.StringVar(value="Not Assigned")
-        self.search_var = tk.StringVar()
+        self.compact_sample_cache_var, self.max_voices_var, self.voice_steal_policy_var = tk.BooleanVar(), tk.IntVar(), tk.StringVar()
+        self.audio_engine_process_var, self.record_mic_stem_var, self.metrics_http_var = tk.BooleanVar(), tk.BooleanVar(), tk.BooleanVar()
+        self.stop_all_hotkey_var, self.toggle_mic_hotkey_var, self.save_replay_hotkey_var = tk.StringVar(value="Not Assigned"), tk.StringVar(value="Not Assigned"), tk.StringVar(value="Not Assigned")
+        self.replay_seconds_var = tk.IntVar()
+        self.search_var, self.profile_var = tk.StringVar(), tk.StringVar()
+        self.stream_state_var, self._stream_states = tk.StringVar(value="Streams: starting..."), {}
 
     def _load_settings(self):
         self.current_theme_var.set(self.style.theme.name)
-        settings_defaults = {"auto_start_mic": False, "soundboard_monitor_enabled": True, "mic_monitor_enabled": False, "master_volume": 100.0, "soundboard_monitor_volume": 75.0, "mic_monitor_volume": 75.0, "single_sound_mode": True}
+        settings_defaults = {"auto_start_mic": False, "soundboard_monitor_enabled": True, "mic_monitor_enabled": False, "master_volume": 100.0, "soundboard_monitor_volume": 75.0, "mic_monitor_volume": 75.0, "single_sound_mode": True, "compact_sample_cache": True, "max_voices": DEFAULT_MAX_VOICES, "voice_steal_policy": "oldest", "audio_engine_process": False, "record_mic_stem": False, "replay_seconds": DEFAULT_REPLAY_SECONDS, "metrics_http": False}
         for key, default in settings_defaults.items():
             if hasattr(self, f"{key}_var"): getattr(self, f"{key}_var").set(self.app_settings.get_setting(key, default))
         self.include_mic_in_mix_var.set(self.auto_start_mic_var.get())
+        self._refresh_global_hotkey_vars()
+
+    def _refresh_global_hotkey_vars(self):
         self.stop_all_hotkey_var.set(get_hotkey_display_string(self.sound_manager.global_hotkeys.get("stop_all", [])))
         self.toggle_mic_hotkey_var.set(get_hotkey_display_string(self.sound_manager.global_hotkeys.get("toggle_mic_to_mixer", [])))
+        self.save_replay_hotkey_var.set(get_hotkey_display_string(self.sound_manager.global_hotkeys.get("save_replay", [])))
     
     def _create_styles(self):
         border_color, selected_bg = self.style.colors.primary, self.style.colors.selectbg
@@ -784,6 +2641,51 @@ class SoundboardApp(ttk.Window):
         self.status_label.pack(side=LEFT)
         self.now_playing_var = tk.StringVar(value="Now Playing: None")
         ttk.Label(status_frame, textvariable=self.now_playing_var, anchor=E).pack(side=RIGHT)
+        self.now_playing_progress = ttk.Progressbar(status_frame, length=80, maximum=1000, bootstyle="success")
+        self.now_playing_progress.pack(side=RIGHT, padx=(0, 10))
+        self._now_playing_progress_value = 0
+        self._create_meters(status_frame)
+
+    def _create_meters(self, parent):
+        # One RMS bar, a peak bar and a peak-hold tick per meter; the items are created once and only moved afterwards.
+        label_width, row_height = 30, 7
+        self.meter_canvas = tk.Canvas(parent, width=label_width + METER_WIDTH, height=row_height * len(METER_NAMES), highlightthickness=0, background=self.style.colors.bg)
+        self.meter_canvas.pack(side=RIGHT, padx=(0, 15))
+        self._meter_items, self._meter_state, self._meter_hold = [], [None] * len(METER_NAMES), [[0, 0.0] for _ in METER_NAMES]
+        colors = self.style.colors
+        for i, name in enumerate(METER_NAMES):
+            top, bottom = i * row_height + 1, (i + 1) * row_height - 1
+            self.meter_canvas.create_text(0, (top + bottom) / 2, text=name, anchor="w", fill=colors.secondary, font=("-size", 6))
+            self.meter_canvas.create_rectangle(label_width, top, label_width + METER_WIDTH, bottom, fill=colors.dark, width=0)
+            self._meter_items.append((self.meter_canvas.create_rectangle(label_width, top, label_width, bottom, fill=colors.success, width=0),
+                                      self.meter_canvas.create_rectangle(label_width, top, label_width, bottom, fill=colors.info, width=0),
+                                      self.meter_canvas.create_line(label_width, top, label_width, bottom, fill=colors.warning),
+                                      label_width, top, bottom))
+        ToolTip(self.meter_canvas, self._get_meter_tooltip_text)
+
+    def _meter_x(self, level):
+        return int(METER_WIDTH * (1.0 - max(to_db(level), METER_FLOOR_DB) / METER_FLOOR_DB))
+
+    def _update_meters(self):
+        """Reads the level snapshot at display rate; peak-hold lives here so the audio threads only store raw block levels."""
+        levels, now = self.audio_manager.levels, time.monotonic()
+        for i, (peak_item, rms_item, hold_item, left, top, bottom) in enumerate(self._meter_items):
+            peak, rms, stamp = levels[i]
+            if now - stamp > METER_STALE_SECONDS: peak = rms = 0.0
+            peak_x, rms_x, hold = self._meter_x(peak), self._meter_x(rms), self._meter_hold[i]
+            if peak_x >= hold[0] or now - hold[1] > METER_PEAK_HOLD_SECONDS: hold[0], hold[1] = peak_x, now
+            state = (peak_x, rms_x, hold[0])
+            if state == self._meter_state[i]: continue
+            self._meter_state[i] = state
+            self.meter_canvas.coords(peak_item, left, top, left + peak_x, bottom)
+            self.meter_canvas.coords(rms_item, left, top, left + rms_x, bottom)
+            self.meter_canvas.coords(hold_item, left + hold[0], top, left + hold[0], bottom)
+        self.after(METER_REFRESH_MS, self._update_meters)
+
+    def _get_meter_tooltip_text(self):
+        levels, now, recording = self.audio_manager.levels, time.monotonic(), self.audio_manager.recording_stats()
+        lines = [f"Recording: {recording['seconds']:.0f} s written, {recording['dropped_blocks']} dropped blocks, {recording['buffered_blocks']} buffered"] if recording else []
+        return "\n".join(lines + [f"{name}: peak {to_db(levels[i][0]):.1f} dBFS, RMS {to_db(levels[i][1]):.1f} dBFS" if now - levels[i][2] <= METER_STALE_SECONDS else f"{name}: idle" for i, name in enumerate(METER_NAMES)])
 
     def _create_soundboard_widgets(self, parent):
         parent.rowconfigure(2, weight=1); parent.columnconfigure(0, weight=1)
@@ -800,31 +2702,38 @@ class SoundboardApp(ttk.Window):
         button_frame.grid(row=1, column=0, sticky=EW, pady=(0, 10), padx=10)
         ttk.Button(button_frame, text="✚ Add Sound", command=self.add_sound, bootstyle="primary").pack(side=LEFT, padx=(0, 5))
         ttk.Button(button_frame, text="✖ Remove Selected", command=self.remove_selected_sounds, bootstyle="danger").pack(side=LEFT)
+        ttk.Label(button_frame, text="Board:").pack(side=LEFT, padx=(15, 5))
+        self.profile_combo = ttk.Combobox(button_frame, textvariable=self.profile_var, state="readonly", width=18)
+        self.profile_combo.pack(side=LEFT)
+        self.profile_combo.bind("<<ComboboxSelected>>", lambda _: self.switch_profile(self.sound_manager.profiles[self.profile_combo.current()]["id"]))
+        ToolTip(self.profile_combo, lambda: "Each board has its own sounds, sequences and hotkeys. Manage boards in Settings > Boards.")
         self.stop_all_button = ttk.Button(button_frame, text="Stop All Sounds", command=self.stop_all_sounds, bootstyle="danger-outline")
         self.stop_all_button.pack(side=RIGHT)
+        self.record_button = ttk.Button(button_frame, text="⏺ Record", command=self.toggle_recording, bootstyle="warning-outline")
+        self.record_button.pack(side=RIGHT, padx=(0, 5))
+        ToolTip(self.record_button, lambda: "Record exactly what goes to App Output (sounds and mic) to a FLAC or WAV file.")
 
         list_container = ttk.Frame(parent)
         list_container.grid(row=2, column=0, sticky='nsew', padx=10)
-        self.sound_canvas = tk.Canvas(list_container, highlightthickness=0, background=self.style.colors.bg)
+        self.sound_canvas = tk.Canvas(list_container, highlightthickness=0, background=self.style.colors.bg, yscrollincrement=20)
         scrollbar = ttk.Scrollbar(list_container, orient="vertical", command=self.sound_canvas.yview)
-        self.sound_list_frame = ttk.Frame(self.sound_canvas, padding=5)
-        self.sound_canvas.configure(yscrollcommand=scrollbar.set)
+        # Every view change (scrollbar, wheel, resize) rebinds the card pool to the rows now in the viewport.
+        self.sound_canvas.configure(yscrollcommand=lambda *args: (scrollbar.set(*args), self._refresh_visible_cards()))
         scrollbar.pack(side=RIGHT, fill=Y); self.sound_canvas.pack(side=LEFT, fill=BOTH, expand=True)
-        self.canvas_window = self.sound_canvas.create_window((0, 0), window=self.sound_list_frame, anchor="nw")
         
-        self.sound_list_frame.bind("<Configure>", lambda _: self.sound_canvas.configure(scrollregion=self.sound_canvas.bbox("all")))
         self.sound_canvas.bind("<Configure>", self._on_frame_configure)
         self.sound_canvas.bind("<Enter>", self._bind_mousewheel)
+        self.bind("<Control-a>", self._select_all_visible)
         self.sound_canvas.bind("<Leave>", self._unbind_mousewheel)
         
-        self.search_var.trace_add("write", lambda *_: self._filter_sounds())
+        self.search_var.trace_add("write", lambda *_: self._schedule_filter())
     
     def _create_settings_widgets(self, parent):
         notebook = ttk.Notebook(parent, padding=(0, 10, 0, 0))
         notebook.pack(fill=BOTH, expand=True)
-        audio_tab, hotkey_tab, general_tab, audio_setup_tab, about_tab = ttk.Frame(notebook), ttk.Frame(notebook), ttk.Frame(notebook), ttk.Frame(notebook), ttk.Frame(notebook)
-        notebook.add(audio_tab, text="Audio"); notebook.add(hotkey_tab, text="Hotkeys"); notebook.add(general_tab, text="General"); notebook.add(audio_setup_tab, text="Audio Setup"); notebook.add(about_tab, text="About")
-        self._populate_audio_tab(audio_tab); self._populate_hotkey_tab(hotkey_tab); self._populate_general_tab(general_tab); self._populate_audio_setup_tab(audio_setup_tab); self._populate_about_tab(about_tab)
+        audio_tab, hotkey_tab, sequences_tab, profiles_tab, general_tab, audio_setup_tab, about_tab = (ttk.Frame(notebook) for _ in range(7))
+        notebook.add(audio_tab, text="Audio"); notebook.add(hotkey_tab, text="Hotkeys"); notebook.add(sequences_tab, text="Sequences"); notebook.add(profiles_tab, text="Boards"); notebook.add(general_tab, text="General"); notebook.add(audio_setup_tab, text="Audio Setup"); notebook.add(about_tab, text="About")
+        self._populate_audio_tab(audio_tab); self._populate_hotkey_tab(hotkey_tab); self._populate_sequences_tab(sequences_tab); self._populate_profiles_tab(profiles_tab); self._populate_general_tab(general_tab); self._populate_audio_setup_tab(audio_setup_tab); self._populate_about_tab(about_tab)
     
     def _populate_audio_tab(self, parent):
         device_frame = ttk.Labelframe(parent, text="Audio Devices", padding=10)
@@ -854,6 +2763,13 @@ class SoundboardApp(ttk.Window):
         include_mic_check.grid(row=6, column=0, columnspan=3, sticky=W, pady=(5,0))
         ToolTip(include_mic_check, lambda: "Mix your actual microphone into the main 'App Output' so others can hear you and the sounds.")
 
+        fallback_frame = ttk.Labelframe(parent, text="Fallback Devices", padding=10)
+        fallback_frame.pack(fill=X, pady=10, padx=10)
+        self.output_fallback_combo = self._create_device_combo(fallback_frame, "App Output", 0, lambda e: self._on_fallback_device_selected(e, "output_fallback_devices"), "Used when the App Output device disappears, e.g. a USB interface is unplugged.")
+        self.input_fallback_combo = self._create_device_combo(fallback_frame, "Your Microphone", 1, lambda e: self._on_fallback_device_selected(e, "input_fallback_devices"), "Microphone to switch to when yours is unplugged.")
+        self.monitor_fallback_combo = self._create_device_combo(fallback_frame, "Monitors", 2, lambda e: self._on_fallback_device_selected(e, "monitor_fallback_devices"), "Headphones/speakers to switch both monitors to when their device is unplugged.")
+        ttk.Label(fallback_frame, textvariable=self.stream_state_var, bootstyle="secondary", font="-size 8", wraplength=500, justify=LEFT).grid(row=3, column=0, columnspan=2, sticky=W, padx=5, pady=(5, 0))
+
     def _create_device_combo(self, parent, label, row, command, tooltip_text):
         label_widget = ttk.Label(parent, text=label)
         label_widget.grid(row=row, column=0, sticky=W, padx=5, pady=2)
@@ -885,6 +2801,146 @@ class SoundboardApp(ttk.Window):
         frame.pack(fill=X, padx=10, pady=10)
         self._create_hotkey_entry(frame, "Stop All Sounds", 0, self.stop_all_hotkey_var, "stop_all")
         self._create_hotkey_entry(frame, "Toggle Mic in Mix", 1, self.toggle_mic_hotkey_var, "toggle_mic_to_mixer")
+        self._create_hotkey_entry(frame, "Save Instant Replay", 2, self.save_replay_hotkey_var, "save_replay")
+
+    def _populate_sequences_tab(self, parent):
+        frame = ttk.Labelframe(parent, text="Cue Sequences & Playlists", padding=10)
+        frame.pack(fill=BOTH, expand=True, padx=10, pady=10)
+        self.sequences_listbox = tk.Listbox(frame, height=8, exportselection=False)
+        self.sequences_listbox.grid(row=0, column=0, rowspan=6, sticky=NSEW, padx=5)
+        self.sequences_listbox.bind("<<ListboxSelect>>", lambda _: self._on_sequence_selected())
+        ttk.Button(frame, text="New from Selection", command=self._create_sequence_from_selection, bootstyle="success-outline").grid(row=0, column=1, sticky=EW, padx=5, pady=2)
+        ttk.Button(frame, text="Play", command=lambda: self._with_selected_sequence(lambda q: self.sequence_player.play(q["id"]))).grid(row=1, column=1, sticky=EW, padx=5, pady=2)
+        ttk.Button(frame, text="Stop", command=lambda: self._with_selected_sequence(lambda q: self.sequence_player.stop(q["id"])), bootstyle="secondary").grid(row=2, column=1, sticky=EW, padx=5, pady=2)
+        ttk.Button(frame, text="Assign Hotkey", command=self._assign_sequence_hotkey).grid(row=3, column=1, sticky=EW, padx=5, pady=2)
+        ttk.Button(frame, text="Clear Hotkey", command=lambda: self._with_selected_sequence(lambda q: self._set_sequence_property(q, "hotkeys", [])), bootstyle="secondary").grid(row=4, column=1, sticky=EW, padx=5, pady=2)
+        ttk.Button(frame, text="Delete", command=self._delete_selected_sequence, bootstyle="danger-outline").grid(row=5, column=1, sticky=EW, padx=5, pady=2)
+        options = ttk.Frame(frame); options.grid(row=6, column=0, columnspan=2, sticky=EW, pady=(10, 0))
+        self.sequence_gap_var, self.sequence_shuffle_var, self.sequence_loop_var = tk.IntVar(value=0), tk.BooleanVar(), tk.BooleanVar()
+        ttk.Label(options, text="Gap (ms):").pack(side=LEFT, padx=5)
+        gap_spin = ttk.Spinbox(options, from_=0, to=60000, increment=50, textvariable=self.sequence_gap_var, width=7, command=self._on_sequence_options_changed)
+        gap_spin.pack(side=LEFT); gap_spin.bind("<FocusOut>", lambda _: self._on_sequence_options_changed())
+        ToolTip(gap_spin, lambda: "Silence between items. 0 plays them back to back with no gap.")
+        ttk.Checkbutton(options, text="Shuffle", variable=self.sequence_shuffle_var, command=self._on_sequence_options_changed, bootstyle="round-toggle").pack(side=LEFT, padx=10)
+        ttk.Checkbutton(options, text="Loop", variable=self.sequence_loop_var, command=self._on_sequence_options_changed, bootstyle="round-toggle").pack(side=LEFT)
+        frame.columnconfigure(0, weight=1); frame.rowconfigure(5, weight=1)
+        self._refresh_sequences_list()
+
+    def _refresh_sequences_list(self):
+        selection = self.sequences_listbox.curselection()
+        self.sequences_listbox.delete(0, END)
+        for sequence in self.sound_manager.sequences:
+            mode = "shuffle" if sequence.get("shuffle") else "in order"
+            self.sequences_listbox.insert(END, f"{sequence['name']} ({len(sequence['items'])} items, {mode}{', loop' if sequence.get('loop') else ''}) [{get_hotkey_display_string(sequence.get('hotkeys', []))}]")
+        if selection and selection[0] < len(self.sound_manager.sequences): self.sequences_listbox.selection_set(selection[0])
+
+    def _selected_sequence(self):
+        selection = self.sequences_listbox.curselection()
+        return self.sound_manager.sequences[selection[0]] if selection and selection[0] < len(self.sound_manager.sequences) else None
+    def _with_selected_sequence(self, action):
+        sequence = self._selected_sequence()
+        if sequence: action(sequence)
+        else: self.show_status_message("No sequence selected.", "warning")
+
+    def _on_sequence_selected(self):
+        sequence = self._selected_sequence()
+        if not sequence: return
+        self.sequence_gap_var.set(sequence["items"][-1]["gap_ms"] if sequence["items"] else 0)
+        self.sequence_shuffle_var.set(sequence.get("shuffle", False)); self.sequence_loop_var.set(sequence.get("loop", False))
+
+    def _on_sequence_options_changed(self):
+        sequence = self._selected_sequence()
+        if not sequence: return
+        try: gap = max(0, self.sequence_gap_var.get())
+        except tk.TclError: return
+        for item in sequence["items"]: item["gap_ms"] = gap
+        sequence["shuffle"], sequence["loop"] = self.sequence_shuffle_var.get(), self.sequence_loop_var.get()
+        self.sound_manager.save_config(); self._refresh_sequences_list()
+
+    def _set_sequence_property(self, sequence, key, value):
+        sequence[key] = value; self.sound_manager.save_config(); self._refresh_sequences_list()
+        if key == "hotkeys": self.keybind_manager.update_hotkeys()
+
+    def _create_sequence_from_selection(self):
+        # Items follow the order the sounds appear on the board.
+        sound_ids = [s["id"] for s in self.sound_manager.sounds if s["id"] in self.selected_sound_ids]
+        if not sound_ids: self.show_status_message("Select the sounds to chain first.", "warning"); return
+        sequence = self.sound_manager.add_sequence(f"Sequence {len(self.sound_manager.sequences) + 1}", sound_ids)
+        self._refresh_sequences_list(); self.show_status_message(f"Created '{sequence['name']}' with {len(sound_ids)} sounds.", "success")
+
+    def _assign_sequence_hotkey(self):
+        sequence = self._selected_sequence()
+        if not sequence: self.show_status_message("No sequence selected.", "warning"); return
+        def on_complete(hotkey_list):
+            if hotkey_list is None: return
+            if tuple(sorted(hotkey_list)) in self.sound_manager.get_all_assigned_hotkeys():
+                messagebox.showwarning("Hotkey In Use", "This hotkey is already assigned.", parent=self); return
+            self._set_sequence_property(sequence, "hotkeys", hotkey_list)
+        HotkeyRecorder(self, sequence["name"], on_complete)
+
+    def _delete_selected_sequence(self):
+        sequence = self._selected_sequence()
+        if not sequence: return
+        self.sequence_player.stop(sequence["id"]); self.sound_manager.remove_sequence(sequence["id"])
+        self._refresh_sequences_list(); self.keybind_manager.update_hotkeys()
+
+    def _populate_profiles_tab(self, parent):
+        frame = ttk.Labelframe(parent, text="Boards", padding=10)
+        frame.pack(fill=BOTH, expand=True, padx=10, pady=10)
+        self.profiles_listbox = tk.Listbox(frame, height=8, exportselection=False)
+        self.profiles_listbox.grid(row=0, column=0, rowspan=4, sticky=NSEW, padx=5)
+        self.profiles_listbox.bind("<Double-Button-1>", lambda _: self._with_selected_profile(lambda p: self.switch_profile(p["id"])))
+        ttk.Button(frame, text="Switch To", command=lambda: self._with_selected_profile(lambda p: self.switch_profile(p["id"]))).grid(row=0, column=1, sticky=EW, padx=5, pady=2)
+        ttk.Button(frame, text="New", command=self._create_profile, bootstyle="success-outline").grid(row=1, column=1, sticky=EW, padx=5, pady=2)
+        ttk.Button(frame, text="Rename", command=lambda: self._with_selected_profile(self._rename_profile), bootstyle="secondary").grid(row=2, column=1, sticky=EW, padx=5, pady=2)
+        ttk.Button(frame, text="Delete", command=lambda: self._with_selected_profile(self._delete_profile), bootstyle="danger-outline").grid(row=3, column=1, sticky=EW, padx=5, pady=2)
+        self.profile_name_var = tk.StringVar()
+        name_entry = ttk.Entry(frame, textvariable=self.profile_name_var)
+        name_entry.grid(row=4, column=0, sticky=EW, padx=5, pady=(10, 0))
+        ToolTip(name_entry, lambda: "Name for New and Rename.")
+        frame.columnconfigure(0, weight=1); frame.rowconfigure(3, weight=1)
+        self._refresh_profiles_list()
+
+    def _refresh_profiles_list(self):
+        profiles, active = self.sound_manager.profiles, self.sound_manager.active_profile
+        self.profiles_listbox.delete(0, END)
+        for profile in profiles: self.profiles_listbox.insert(END, f"{profile['name']}{' (active)' if profile['id'] == active else ''}")
+        self.profile_combo.configure(values=[p["name"] for p in profiles])
+        self.profile_var.set(next((p["name"] for p in profiles if p["id"] == active), ""))
+
+    def _with_selected_profile(self, action):
+        selection = self.profiles_listbox.curselection()
+        if selection and selection[0] < len(self.sound_manager.profiles): action(self.sound_manager.profiles[selection[0]])
+        else: self.show_status_message("No board selected.", "warning")
+
+    def _create_profile(self):
+        try: profile = self.sound_manager.add_profile(self.profile_name_var.get())
+        except ValueError as e: self.show_status_message(str(e), "warning"); return
+        self.profile_name_var.set(""); self._refresh_profiles_list()
+        self.show_status_message(f"Created board '{profile['name']}'.", "success")
+
+    def _rename_profile(self, profile):
+        try: self.sound_manager.rename_profile(profile["id"], self.profile_name_var.get())
+        except ValueError as e: self.show_status_message(str(e), "warning"); return
+        self.profile_name_var.set(""); self._refresh_profiles_list()
+
+    def _delete_profile(self, profile):
+        if not messagebox.askyesno("Delete Board", f"Permanently delete the board '{profile['name']}' and all of its sounds?", parent=self): return
+        try: self.sound_manager.remove_profile(profile["id"])
+        except ValueError as e: self.show_status_message(str(e), "warning"); return
+        self._refresh_profiles_list(); self.show_status_message(f"Deleted board '{profile['name']}'.", "success")
+
+    def switch_profile(self, profile_id):
+        """Swaps the board, its hotkey map and the grid; the new board's hotkeyed sounds are then warmed in the background."""
+        try: switched = self.sound_manager.switch_profile(profile_id)
+        except ValueError as e: self.show_status_message(str(e), "danger"); self._refresh_profiles_list(); return
+        if not switched: return
+        self.keybind_manager.update_hotkeys()
+        self.selected_sound_ids.clear(); self.last_selected_id = None
+        self.populate_sound_list(); self._refresh_sequences_list(); self._refresh_global_hotkey_vars(); self._refresh_profiles_list()
+        name = self.profile_var.get()
+        self.show_status_message(f"Switched to board '{name}' ({len(self.sound_manager.sounds)} sounds).", "info")
+        self.sound_manager.warm_profile_cache(lambda loaded: self.after(0, self.show_status_message, f"Board '{name}' ready ({loaded} hotkeyed sounds loaded).", "success") if loaded else None)
 
     def _create_hotkey_entry(self, parent, label_text, row, var, action):
         ttk.Label(parent, text=label_text).grid(row=row, column=0, sticky=W, padx=5, pady=5)
@@ -907,8 +2963,58 @@ class SoundboardApp(ttk.Window):
         auto_start_mic_check = ttk.Checkbutton(frame, text="Automatically include Mic on startup", variable=self.auto_start_mic_var, command=lambda: self._save_app_settings(), bootstyle="round-toggle")
         auto_start_mic_check.grid(row=2, column=0, columnspan=2, sticky=W)
         ToolTip(auto_start_mic_check, lambda: "If checked, your microphone will automatically be included in the 'App Output' every time you start WarpBoard.")
+
+        compact_cache_check = ttk.Checkbutton(frame, text="Compact sound cache (16-bit)", variable=self.compact_sample_cache_var, command=self._on_compact_sample_cache_changed, bootstyle="round-toggle")
+        compact_cache_check.grid(row=3, column=0, columnspan=2, sticky=W, pady=5)
+        ToolTip(compact_cache_check, lambda: "Keep loaded sounds in 16-bit form at their original channel count. Uses up to 4x less memory for large libraries.")
+
+        ttk.Label(frame, text="Max voices:").grid(row=4, column=0, sticky=W, padx=5, pady=5)
+        voice_frame = ttk.Frame(frame); voice_frame.grid(row=4, column=1, sticky=EW, padx=5)
+        ttk.Spinbox(voice_frame, from_=1, to=128, textvariable=self.max_voices_var, width=5, command=self._on_voice_limit_changed).pack(side=LEFT)
+        steal_combo = ttk.Combobox(voice_frame, textvariable=self.voice_steal_policy_var, values=VOICE_STEAL_POLICIES, state="readonly", width=10)
+        steal_combo.pack(side=LEFT, padx=(10, 0))
+        steal_combo.bind("<<ComboboxSelected>>", lambda _: self._on_voice_limit_changed())
+        ToolTip(voice_frame, lambda: "Most sounds that can play at once. Past the limit, the oldest voice, or the one playing quietest right now, is faded out to make room.")
+
+        engine_check = ttk.Checkbutton(frame, text="Run audio engine in a separate process", variable=self.audio_engine_process_var, command=lambda: (self._save_app_settings(), self.show_status_message("Audio engine mode applies after restarting WarpBoard.", "info")), bootstyle="round-toggle")
+        engine_check.grid(row=5, column=0, columnspan=2, sticky=W, pady=5)
+        ToolTip(engine_check, lambda: "Mixes and streams audio in its own process so a busy interface cannot cause dropouts. A crashed engine restarts automatically.")
+
+        stem_check = ttk.Checkbutton(frame, text="Record mic as a separate stem", variable=self.record_mic_stem_var, command=lambda: self._save_app_settings(), bootstyle="round-toggle")
+        stem_check.grid(row=6, column=0, columnspan=2, sticky=W, pady=5)
+        ToolTip(stem_check, lambda: "Recordings also write your microphone alone to a second '-mic' file next to the mix, for editing later.")
+
+        ttk.Label(frame, text="Instant replay (s):").grid(row=7, column=0, sticky=W, padx=5, pady=5)
+        replay_spin = ttk.Spinbox(frame, from_=0, to=REPLAY_MAX_SECONDS, increment=15, textvariable=self.replay_seconds_var, width=5, command=self._on_replay_seconds_changed)
+        replay_spin.grid(row=7, column=1, sticky=W, padx=5); replay_spin.bind("<FocusOut>", lambda _: self._on_replay_seconds_changed())
+        ToolTip(replay_spin, lambda: "Keeps the last N seconds of App Output in memory (0 turns it off). The 'Save Instant Replay' hotkey adds them to the board as a new sound.")
+
+        metrics_check = ttk.Checkbutton(frame, text=f"Serve performance metrics on localhost:{METRICS_PORT}", variable=self.metrics_http_var, command=self._on_metrics_http_changed, bootstyle="round-toggle")
+        metrics_check.grid(row=8, column=0, columnspan=2, sticky=W, pady=5)
+        ToolTip(metrics_check, lambda: f"Metrics are always logged to {os.path.basename(METRICS_FILE)} in the app data folder. This also serves them at /metrics in Prometheus text format.")
         frame.columnconfigure(1, weight=1)
 
+        watch_frame = ttk.Labelframe(parent, text="Watched Folders", padding=10)
+        watch_frame.pack(fill=X, padx=10, pady=10)
+        self.watched_folders_listbox = tk.Listbox(watch_frame, height=4)
+        self.watched_folders_listbox.grid(row=0, column=0, rowspan=3, sticky=NSEW, padx=5)
+        for folder in self.sound_manager.watched_folders: self.watched_folders_listbox.insert(END, folder)
+        ttk.Button(watch_frame, text="Add Folder", command=self._add_watched_folder).grid(row=0, column=1, sticky=EW, padx=5, pady=2)
+        ttk.Button(watch_frame, text="Remove", command=self._remove_watched_folder).grid(row=1, column=1, sticky=EW, padx=5, pady=2)
+        rescan_btn = ttk.Button(watch_frame, text="Rescan Now", command=self.rescan_watched_folders, bootstyle="info-outline")
+        rescan_btn.grid(row=2, column=1, sticky=EW, padx=5, pady=2)
+        ToolTip(rescan_btn, lambda: "New and changed files in watched folders are imported automatically. Sounds whose file was deleted are flagged.")
+        watch_frame.columnconfigure(0, weight=1)
+
+        bank_frame = ttk.Labelframe(parent, text="Sound Banks", padding=10)
+        bank_frame.pack(fill=X, padx=10, pady=10)
+        export_bank_btn = ttk.Button(bank_frame, text="Export Bank...", command=self.export_sound_bank)
+        export_bank_btn.pack(side=LEFT, padx=5)
+        ToolTip(export_bank_btn, lambda: "Pack the selected sounds (or all sounds) with their hotkeys, volumes and loop settings into a single file.")
+        import_bank_btn = ttk.Button(bank_frame, text="Import Bank...", command=self.import_sound_bank)
+        import_bank_btn.pack(side=LEFT, padx=5)
+        ToolTip(import_bank_btn, lambda: "Load a packed sound bank. Its sounds are playable immediately, with no per-file conversion.")
+
     def _populate_audio_setup_tab(self, parent):
         setup_frame = ttk.Labelframe(parent, text="VB-CABLE Virtual Mic Setup", padding=15)
         setup_frame.pack(fill=X, padx=10, pady=10)
@@ -986,8 +3092,7 @@ class SoundboardApp(ttk.Window):
                 messagebox.showerror("Installation Failed", f"An error occurred during the automatic installation of VB-CABLE. You may need to install it manually.\n\nError: {e}", parent=self)
             finally:
                 popup.destroy()
-                self.audio_manager.output_devices, self.audio_manager.input_devices = self.audio_manager._enumerate_devices()
-                self.populate_device_dropdowns()
+                self.audio_manager.rescan_devices()
 
     def _fix_audio_setup(self):
         try:
@@ -1021,8 +3126,7 @@ class SoundboardApp(ttk.Window):
             output = run_powershell_script('remove_duplicate_devices.ps1')
             logging.info(f"Cleanup script output: {output}")
             messagebox.showinfo("Complete", "Duplicate device cleanup finished. It's recommended to restart the application.", parent=self)
-            self.audio_manager.output_devices, self.audio_manager.input_devices = self.audio_manager._enumerate_devices()
-            self.populate_device_dropdowns()
+            self.audio_manager.rescan_devices()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to run cleanup script: {e}", parent=self)
 
@@ -1116,14 +3220,26 @@ class SoundboardApp(ttk.Window):
 
         ttk.Label(frame, text="License: MIT", foreground="gray").pack(pady=(10, 5))
     
-    def _on_frame_configure(self, _=None):
-        canvas_width = self.sound_canvas.winfo_width()
-        if canvas_width > 1:
-            self.sound_canvas.itemconfig(self.canvas_window, width=canvas_width)
-            new_cols = max(1, canvas_width // 200)
-            if hasattr(self, 'grid_columns') and new_cols != self.grid_columns:
-                self.grid_columns = new_cols
-                self._filter_sounds()
+    def _on_frame_configure(self, event=None):
+        # <Configure> fires continuously while dragging; only the latest size is kept and laid out once per frame interval.
+        self._canvas_size = (event.width, event.height) if event else (self.sound_canvas.winfo_width(), self.sound_canvas.winfo_height())
+        if not self._resize_after_id: self._resize_after_id = self.after(RESIZE_COALESCE_MS, self._apply_resize)
+
+    def _apply_resize(self):
+        self._resize_after_id = None
+        width = self._canvas_size[0]
+        if width <= 1: return
+        new_cols = max(1, width // CARD_MIN_WIDTH)
+        if new_cols != self.grid_columns and self._card_height is not None:
+            # Keep the sound at the top-left of the viewport in view when the column count reflows the rows.
+            row_height = self._card_height + 2 * CARD_PADDING
+            anchor = int(self.sound_canvas.canvasy(0) // row_height) * self.grid_columns
+            self.grid_columns = new_cols
+            if self._update_scrollregion():
+                rows = -(-len(self.visible_sound_ids) // new_cols)
+                self.sound_canvas.yview_moveto((anchor // new_cols) * row_height / (rows * row_height + 2 * CARD_PADDING))
+        else: self.grid_columns = new_cols
+        self._layout_sound_grid()
     
     def _bind_mousewheel(self, _): self.bind_all("<MouseWheel>", self._on_mousewheel)
     def _unbind_mousewheel(self, _): self.unbind_all("<MouseWheel>")
@@ -1150,125 +3266,215 @@ class SoundboardApp(ttk.Window):
         entry.bind("<FocusIn>", on_focus_in)
         entry.bind("<FocusOut>", on_focus_out)
 
-    def _filter_sounds(self, *_):
+    def _current_query(self):
         query = self.search_var.get().lower()
-        if query == "search sounds...": query = ""
+        return "" if query == "search sounds..." else query
+
+    def _schedule_filter(self):
+        # Keystrokes are debounced; only the query that is still current after the pause is searched.
+        if self._filter_after_id: self.after_cancel(self._filter_after_id)
+        self._filter_after_id = self.after(SEARCH_DEBOUNCE_MS, self._run_scheduled_filter)
+
+    def _run_scheduled_filter(self):
+        self._filter_after_id = None
+        if self._current_query() != self._applied_query: self._filter_sounds()
+
+    def _filter_sounds(self, *_):
+        query = self._applied_query = self._current_query()
 
         if query:
             self.clear_search_btn.grid(row=0, column=1, sticky=E, padx=(4,0))
         else:
             self.clear_search_btn.grid_forget()
 
-        for i in range(self.sound_list_frame.grid_size()[0]):
-            self.sound_list_frame.columnconfigure(i, weight=0)
-        for i in range(self.grid_columns):
-            self.sound_list_frame.columnconfigure(i, weight=1)
-
-        row, col = 0, 0
-        for sound_id in self.ordered_sound_ids:
-            sound = self.sound_manager.get_sound_by_id(sound_id)
-            if sound:
-                card_frame = self.sound_card_widgets[sound_id]['frame']
-                if query in sound['name'].lower():
-                    card_frame.grid(row=row, column=col, padx=5, pady=5, sticky='nsew')
-                    col += 1
-                    if col >= self.grid_columns:
-                        col = 0
-                        row += 1
-                else:
-                    card_frame.grid_forget()
-        
+        self.visible_sound_ids, self._ranked_positions = self.search_index.search(query) if query else list(self.ordered_sound_ids), None
         self.sound_canvas.yview_moveto(0)
-        self.sound_canvas.update_idletasks()
-        self.sound_canvas.configure(scrollregion=self.sound_canvas.bbox("all"))
+        self._layout_sound_grid()
+
+    def _research_in_place(self):
+        # Ranked results have no fixed sort key, so a change under an active query re-runs the search but keeps the scroll position.
+        self.visible_sound_ids, self._ranked_positions = self.search_index.search(self._applied_query), None
+        self._relayout_from(0)
+
+    def _get_card_height(self):
+        # Measured once from a worst-case (longest name) card; every slot then uses that fixed height.
+        if self._card_height is None:
+            card = self._get_pool_card(0)
+            card.bind_sound({"id": None, "name": "W" * MAX_DISPLAY_NAME_LENGTH, "hotkeys": ["ctrl", "shift", "alt", "f12"]}, False)
+            card.update_idletasks()
+            self._card_height = card.winfo_reqheight()
+        return self._card_height
+
+    def _get_pool_card(self, index):
+        while len(self.card_pool) <= index: self.card_pool.append(SoundCard(self.sound_canvas, self))
+        return self.card_pool[index]
+
+    def _update_scrollregion(self):
+        width = self._canvas_size[0]
+        if width <= 1: return False
+        row_height = self._get_card_height() + 2 * CARD_PADDING
+        rows = -(-len(self.visible_sound_ids) // self.grid_columns)
+        self.sound_canvas.configure(scrollregion=(0, 0, width, rows * row_height + 2 * CARD_PADDING))
+        return True
+
+    def _layout_sound_grid(self):
+        if not self._update_scrollregion(): return
+        for card in self.card_pool: card.position = None
+        self._refresh_visible_cards()
+
+    def _viewport_range(self):
+        """Returns the (start, end) slice of visible_sound_ids in the viewport plus one row either side, or None before layout."""
+        width, height = self._canvas_size
+        if width <= 1 or self._card_height is None: return None
+        row_height, top = self._card_height + 2 * CARD_PADDING, self.sound_canvas.canvasy(0)
+        first_row, last_row = max(0, int(top // row_height) - 1), int((top + height) // row_height) + 1
+        return first_row * self.grid_columns, (last_row + 1) * self.grid_columns
+
+    def _refresh_visible_cards(self):
+        """Binds pooled cards to the sounds in the viewport range; cost depends on viewport size, not library size."""
+        viewport = self._viewport_range()
+        if not viewport: return
+        cols, row_height = self.grid_columns, self._card_height + 2 * CARD_PADDING
+        column_width = (self._canvas_size[0] - 2 * CARD_PADDING) // cols
+        wanted = self.visible_sound_ids[viewport[0]:viewport[1]]
+        wanted_set = set(wanted)
+        reusable = {sound_id: card for sound_id, card in self.sound_card_widgets.items() if sound_id in wanted_set}
+        free = [card for card in self.card_pool if card.sound_id not in reusable]
+        bound = {}
+        for offset, sound_id in enumerate(wanted):
+            card = reusable.get(sound_id)
+            if card is None:
+                card = free.pop() if free else self._get_pool_card(len(self.card_pool))
+                sound = self.sound_manager.get_sound_by_id(sound_id)
+                if sound: card.bind_sound(sound, sound_id in self.selected_sound_ids)
+            row, col = divmod(viewport[0] + offset, cols)
+            position = (CARD_PADDING + col * column_width + CARD_PADDING, CARD_PADDING + row * row_height + CARD_PADDING, column_width - 2 * CARD_PADDING)
+            if card.position != position:
+                self.sound_canvas.coords(card.item, position[0], position[1])
+                self.sound_canvas.itemconfigure(card.item, width=position[2], height=self._card_height, state="normal")
+                card.position = position
+            bound[sound_id] = card
+        for card in free:
+            if card.position is not None or card.sound_id is not None:
+                self.sound_canvas.itemconfigure(card.item, state="hidden")
+                card.sound_id, card.position = None, None
+        self.sound_card_widgets = bound
 
     def populate_sound_list(self):
-        for widget in self.sound_list_frame.winfo_children(): widget.destroy()
-        self.sound_card_widgets.clear()
-        self.ordered_sound_ids = sorted([s for s in self.sound_manager.sounds], key=lambda x: x['name'].lower())
-        self.ordered_sound_ids = [s['id'] for s in self.ordered_sound_ids]
-        
-        for sound_id in self.ordered_sound_ids:
-            sound = self.sound_manager.get_sound_by_id(sound_id)
-            if sound: self._add_sound_card_to_ui(sound)
+        self._sort_key_by_id = {s['id']: (s['name'].lower(), s['id']) for s in self.sound_manager.sounds}
+        self.search_index.rebuild(self.sound_manager.sounds)
+        self.ordered_sound_ids = sorted(self._sort_key_by_id, key=self._sort_key_by_id.get)
+        self.sound_card_widgets = {}
+        for card in self.card_pool: card.sound_id = None
         self._filter_sounds()
-
-    def _add_sound_card_to_ui(self, sound):
-        sound_id = sound["id"]
-        card_frame = ttk.Frame(self.sound_list_frame, style='Card.TFrame', padding=10)
-        card_frame.columnconfigure(0, weight=1)
-
-        top_button_frame = ttk.Frame(card_frame)
-        top_button_frame.grid(row=0, column=0, sticky=EW, pady=5)
-        top_button_frame.columnconfigure(0, weight=1)
-        
-        play_btn = ttk.Button(top_button_frame, text=sound['name'][:MAX_DISPLAY_NAME_LENGTH], command=lambda: self.play_sound(sound_id), bootstyle="success")
-        play_btn.grid(row=0, column=0, sticky=EW, ipady=5)
-        
-        stop_btn = ttk.Button(top_button_frame, text="■", command=lambda: self.stop_sound(sound_id), bootstyle="danger", width=3)
-        stop_btn.grid(row=0, column=1, sticky="ns", padx=(5,0))
-
-
-        hotkey_var = tk.StringVar(value=get_hotkey_display_string(sound['hotkeys']))
-        hotkey_label = ttk.Label(card_frame, textvariable=hotkey_var, bootstyle="secondary", anchor="center")
-        
-        bottom_frame = ttk.Frame(card_frame)
-        loop_var = tk.BooleanVar(value=sound.get("loop", False))
-        loop_check = ttk.Checkbutton(bottom_frame, text="Loop", variable=loop_var, bootstyle="round-toggle", command=lambda s_id=sound_id, v=loop_var: self._update_sound_property_and_save(s_id, "loop", v.get()))
-        edit_btn = ttk.Button(bottom_frame, text="⚙", command=lambda s_id=sound_id: self._open_edit_sound_menu(s_id), bootstyle="light-outline", width=3)
-
-        hotkey_label.grid(row=1, column=0, sticky=EW)
-        bottom_frame.grid(row=2, column=0, sticky=EW, pady=(10, 0))
-        bottom_frame.columnconfigure(0, weight=1)
-        bottom_frame.columnconfigure(1, weight=1)
-        loop_check.grid(row=0, column=0, sticky=W)
-        edit_btn.grid(row=0, column=1, sticky=E)
-
-        if not sound.get("enabled", True):
-            play_btn.configure(state="disabled")
-        
-        self.sound_card_widgets[sound_id] = {"frame": card_frame, "hotkey_var": hotkey_var, "loop_var": loop_var, "play_btn": play_btn}
-        
-        tooltip_text_func = lambda s=sound: f"Name: {s['name']}\nDuration: {s.get('duration', 0):.2f} seconds"
-        ToolTip(card_frame, tooltip_text_func)
-
-        for widget in [card_frame, hotkey_label, bottom_frame, top_button_frame]:
-            widget.bind("<Button-1>", lambda e, s_id=sound_id: self._on_card_click(e, s_id))
+        self.sound_manager.ensure_waveforms(self.sound_manager.sounds, lambda s_id: self.after(0, self._draw_card_waveform, s_id))
+
+    def _bisect_ids(self, ids, key):
+        low, high = 0, len(ids)
+        while low < high:
+            mid = (low + high) // 2
+            if self._sort_key_by_id[ids[mid]] < key: low = mid + 1
+            else: high = mid
+        return low
+
+    def _relayout_from(self, index):
+        """Re-lays out the ordered grid from index on; only cards inside the viewport are actually moved or rebound."""
+        self._update_scrollregion()
+        viewport = self._viewport_range()
+        if viewport and index < viewport[1]: self._refresh_visible_cards()
+
+    def insert_sound_cards(self, sounds):
+        """Adds cards for new sounds in sorted position without rebuilding the grid."""
+        first_index = None
+        for sound in sounds:
+            key = self._sort_key_by_id[sound['id']] = (sound['name'].lower(), sound['id'])
+            self.ordered_sound_ids.insert(self._bisect_ids(self.ordered_sound_ids, key), sound['id'])
+            self.search_index.add(sound['id'], sound['name'], sound.get('tags', []))
+            if not self._applied_query:
+                index = self._bisect_ids(self.visible_sound_ids, key)
+                self.visible_sound_ids.insert(index, sound['id'])
+                first_index = index if first_index is None else min(first_index, index)
+        if self._applied_query and sounds: self._research_in_place()
+        elif first_index is not None: self._relayout_from(first_index)
+        self.sound_manager.ensure_waveforms(sounds, lambda s_id: self.after(0, self._draw_card_waveform, s_id))
+
+    def remove_sound_cards(self, sound_ids):
+        """Drops cards for removed sounds; cards after the first removed slot shift back."""
+        first_index = None
+        for sound_id in sound_ids:
+            key = self._sort_key_by_id.pop(sound_id, None)
+            if key is None: continue
+            del self.ordered_sound_ids[self._bisect_ids(self.ordered_sound_ids, key)]
+            self.search_index.remove(sound_id)
+            index = self.visible_sound_ids.index(sound_id) if self._applied_query and sound_id in self.visible_sound_ids else self._bisect_ids(self.visible_sound_ids, key)
+            if index < len(self.visible_sound_ids) and self.visible_sound_ids[index] == sound_id:
+                del self.visible_sound_ids[index]; self._ranked_positions = None
+                first_index = index if first_index is None else min(first_index, index)
+            self.selected_sound_ids.discard(sound_id)
+        if first_index is not None: self._relayout_from(first_index)
+
+    def update_sound_card(self, sound_id):
+        """Refreshes one sound's card after its metadata changed; a rename moves it to its new sorted slot."""
+        sound = self.sound_manager.get_sound_by_id(sound_id)
+        if not sound: return self.remove_sound_cards([sound_id])
+        if self._sort_key_by_id.get(sound_id) != (sound['name'].lower(), sound_id):
+            selected = sound_id in self.selected_sound_ids
+            self.remove_sound_cards([sound_id]); self.insert_sound_cards([sound])
+            if selected: self.selected_sound_ids.add(sound_id)
+        elif self.search_index.texts.get(sound_id) != " ".join([sound['name'], *sound.get('tags', [])]).lower():
+            self.search_index.add(sound_id, sound['name'], sound.get('tags', []))
+            if self._applied_query: self._research_in_place()
+        card = self.sound_card_widgets.get(sound_id)
+        if card: card.bind_sound(sound, sound_id in self.selected_sound_ids)
+
+    def get_sound_tooltip_text(self, sound_id):
+        s = self.sound_manager.get_sound_by_id(sound_id)
+        if not s: return ""
+        return f"Name: {s['name']}\nDuration: {s.get('duration', 0):.2f} seconds" + (f"\nPeak: {s['analysis']['peak_db']:.1f} dBFS, Loudness: {s['analysis']['loudness_db']:.1f} dB" if s.get('analysis') else "") + (f"\nSource file missing: {s['source']}" if s.get('source_missing') else "")
+
+    def _draw_card_waveform(self, sound_id):
+        card = self.sound_card_widgets.get(sound_id)
+        if card: card.draw_waveform()
+
+    def _visible_position(self, sound_id):
+        """Index of sound_id in visible_sound_ids, or None: a bisect on the sort key when unfiltered, a cached map for ranked results."""
+        if self._applied_query:
+            if self._ranked_positions is None: self._ranked_positions = {s_id: i for i, s_id in enumerate(self.visible_sound_ids)}
+            return self._ranked_positions.get(sound_id)
+        key = self._sort_key_by_id.get(sound_id)
+        if key is None: return None
+        index = self._bisect_ids(self.visible_sound_ids, key)
+        return index if index < len(self.visible_sound_ids) and self.visible_sound_ids[index] == sound_id else None
 
     def _on_card_click(self, event, sound_id):
         ctrl_pressed, shift_pressed = (event.state & 4) != 0, (event.state & 1) != 0
-        if shift_pressed and self.last_selected_id:
-            try:
-                visible_ids = []
-                for sid in self.ordered_sound_ids:
-                    try:
-                        if self.sound_card_widgets[sid]['frame'].winfo_ismapped():
-                            visible_ids.append(sid)
-                    except (KeyError, tk.TclError):
-                        continue
-                start = visible_ids.index(self.last_selected_id)
-                end = visible_ids.index(sound_id)
-                if start > end: start, end = end, start
-                if not ctrl_pressed: self.selected_sound_ids.clear()
-                for i in range(start, end + 1): self.selected_sound_ids.add(visible_ids[i])
-            except (ValueError, KeyError, tk.TclError): 
-                self.selected_sound_ids = {sound_id}
+        selected = self.selected_sound_ids
+        start = self._visible_position(self.last_selected_id) if shift_pressed and self.last_selected_id else None
+        end = self._visible_position(sound_id) if start is not None else None
+        if end is not None:
+            if start > end: start, end = end, start
+            span = set(self.visible_sound_ids[start:end + 1])
+            if ctrl_pressed: changed = span - selected; selected |= span
+            else: changed = selected ^ span; self.selected_sound_ids = span
         elif ctrl_pressed:
-            if sound_id in self.selected_sound_ids: self.selected_sound_ids.remove(sound_id)
-            else: self.selected_sound_ids.add(sound_id)
-        else: self.selected_sound_ids = {sound_id}
+            selected ^= {sound_id}; changed = {sound_id}
+        else: changed = selected ^ {sound_id}; self.selected_sound_ids = {sound_id}
         self.last_selected_id = sound_id
-        self._update_card_styles()
-
-    def _update_card_styles(self):
-        for sound_id, widgets in self.sound_card_widgets.items():
-            widgets['frame'].state(['selected'] if sound_id in self.selected_sound_ids else ['!selected'])
-
-    def _remove_sound_card_from_ui(self, sound_id):
-        if sound_id in self.sound_card_widgets:
-            self.sound_card_widgets[sound_id]['frame'].destroy()
-            del self.sound_card_widgets[sound_id]
-            if sound_id in self.ordered_sound_ids: self.ordered_sound_ids.remove(sound_id)
+        self._restyle_cards(changed)
+
+    def _select_all_visible(self, _=None):
+        if isinstance(self.focus_get(), (tk.Entry, ttk.Entry)): return None
+        span = set(self.visible_sound_ids)
+        changed, self.selected_sound_ids = self.selected_sound_ids ^ span, span
+        self._restyle_cards(changed)
+        return "break"
+
+    def _restyle_cards(self, changed):
+        """Updates the selected state of bound cards whose selection flipped; walks whichever of the two sets is smaller."""
+        if len(changed) > len(self.sound_card_widgets): targets = [s_id for s_id in self.sound_card_widgets if s_id in changed]
+        else: targets = [s_id for s_id in changed if s_id in self.sound_card_widgets]
+        for sound_id in targets:
+            self.sound_card_widgets[sound_id].state(['selected'] if sound_id in self.selected_sound_ids else ['!selected'])
     
     def _open_edit_sound_menu(self, sound_id):
         sound = self.sound_manager.get_sound_by_id(sound_id);
@@ -1277,13 +3483,27 @@ class SoundboardApp(ttk.Window):
         edit_window = Toplevel(self); edit_window.title(f"Edit '{sound['name']}'"); edit_window.transient(self)
         main_frame = ttk.Frame(edit_window, padding=15); main_frame.pack(fill=BOTH, expand=True)
 
+        waveform_canvas = tk.Canvas(main_frame, width=360, height=60, highlightthickness=0, background=self.style.colors.bg)
+        waveform_canvas.pack(fill=X, pady=5)
+        redraw_waveform = lambda *_: waveform_canvas.winfo_exists() and draw_waveform(waveform_canvas, self.sound_manager.waveform_cache.get(sound_id), self.style.colors.info)
+        waveform_canvas.bind("<Configure>", redraw_waveform)
+        self.sound_manager.ensure_waveforms([sound], lambda _: self.after(0, redraw_waveform))
+
         enabled_frame = ttk.Labelframe(main_frame, text="Status", padding=5)
         enabled_frame.pack(fill=X, pady=5)
         enabled_var = tk.BooleanVar(value=sound.get("enabled", True))
         ttk.Checkbutton(enabled_frame, text="Sound Enabled", variable=enabled_var, bootstyle="round-toggle").pack(padx=5, pady=5, anchor=W)
+        trim_var = tk.BooleanVar(value=sound.get("trim_silence", True))
+        trim_text = "Trim Leading/Trailing Silence"
+        analysis = sound.get("analysis")
+        if analysis: trim_text += f" ({analysis['trim_start'] * 1000 // SAMPLE_RATE} ms / {(analysis['frames'] - analysis['trim_end']) * 1000 // SAMPLE_RATE} ms)"
+        ttk.Checkbutton(enabled_frame, text=trim_text, variable=trim_var, bootstyle="round-toggle").pack(padx=5, pady=5, anchor=W)
 
         name_frame = ttk.Labelframe(main_frame, text="Sound Name", padding=5); name_frame.pack(fill=X, pady=5)
         name_var = tk.StringVar(value=sound['name']); ttk.Entry(name_frame, textvariable=name_var).pack(fill=X, padx=5, pady=5)
+
+        tags_frame = ttk.Labelframe(main_frame, text="Tags (comma separated)", padding=5); tags_frame.pack(fill=X, pady=5)
+        tags_var = tk.StringVar(value=", ".join(sound.get("tags", []))); ttk.Entry(tags_frame, textvariable=tags_var).pack(fill=X, padx=5, pady=5)
         
         hotkey_frame = ttk.Labelframe(main_frame, text="Hotkey", padding=5); hotkey_frame.pack(fill=X, pady=5)
         hotkey_var = tk.StringVar(value=get_hotkey_display_string(sound['hotkeys']))
@@ -1295,16 +3515,29 @@ class SoundboardApp(ttk.Window):
         volume_frame = ttk.Labelframe(main_frame, text="Volume", padding=5); volume_frame.pack(fill=X, pady=5)
         volume_var = tk.DoubleVar(value=sound.get("volume", 1.0) * 100)
         self._create_volume_slider(volume_frame, "", 0, volume_var, None)
+
+        polyphony_frame = ttk.Labelframe(main_frame, text="Polyphony", padding=5); polyphony_frame.pack(fill=X, pady=5)
+        max_voices_var = tk.IntVar(value=sound.get("max_voices", 1))
+        ttk.Label(polyphony_frame, text="Overlapping copies:").pack(side=LEFT, padx=5, pady=5)
+        ttk.Spinbox(polyphony_frame, from_=1, to=16, textvariable=max_voices_var, width=5).pack(side=LEFT, padx=5)
+        ToolTip(polyphony_frame, lambda: "How many copies of this sound may overlap. Retriggering past this fades out the oldest copy.")
         
         def _save_changes():
             try:
                 self.sound_manager.update_sound_property(sound_id, "volume", volume_var.get() / 100.0)
+                self.audio_manager.mixer.set_sound_volume(sound_id, volume_var.get() / 100.0)
                 self.sound_manager.update_sound_property(sound_id, "enabled", enabled_var.get())
+                try: self.sound_manager.update_sound_property(sound_id, "max_voices", max(1, max_voices_var.get()))
+                except tk.TclError: pass
+                self.sound_manager.update_sound_property(sound_id, "tags", [tag.strip() for tag in tags_var.get().split(",") if tag.strip()])
+                if trim_var.get() != sound.get("trim_silence", True):
+                    self.sound_manager.update_sound_property(sound_id, "trim_silence", trim_var.get())
+                    self.sound_manager.sound_data_cache.pop(sound_id, None)
                 if name_var.get() != sound['name']:
                     self.sound_manager.rename_sound(sound_id, name_var.get())
                 self.sound_manager.save_config()
                 self.keybind_manager.update_hotkeys()
-                self.populate_sound_list() 
+                self.update_sound_card(sound_id)
                 edit_window.destroy()
             except ValueError as e: messagebox.showerror("Rename Error", str(e), parent=edit_window)
 
@@ -1318,43 +3551,128 @@ class SoundboardApp(ttk.Window):
     def add_sound(self):
         file_paths = filedialog.askopenfilenames(filetypes=SUPPORTED_FORMATS)
         if not file_paths: return
-        for path in file_paths:
+        for path in file_paths: self.sound_manager.queue_import(path, self._on_import_done_threadsafe)
+        self.show_status_message(f"Importing {len(file_paths)} file(s)...", "info")
+
+    def _on_import_done_threadsafe(self, result, pending):
+        self.after(0, self._on_import_finished, result, pending)
+
+    def _on_import_finished(self, result, pending):
+        on_board = result.get("profile", self.sound_manager.active_profile) == self.sound_manager.active_profile
+        is_new = bool(result.get("sound")) and self.sound_manager.get_sound_by_id(result["sound"]["id"]) is None
+        sound = self.sound_manager.commit_import(result)
+        name = os.path.basename(result["path"])
+        if sound and not on_board:
+            profile = self.sound_manager.get_profile_by_id(result["profile"])
+            self.show_status_message(f"Added: {name} to board '{profile['name'] if profile else '?'}'" + (f" ({pending} remaining)" if pending else ""), "success")
+        elif sound:
+            if is_new: self.insert_sound_cards([sound])
+            else: self.update_sound_card(sound["id"])
+            self.show_status_message(f"Added: {name}" + (f" ({pending} remaining)" if pending else ""), "success")
+        else:
+            self.show_status_message(f"Failed to add sound.", "danger")
+            if not result["source"]: messagebox.showerror("Add Sound Error", f"Failed to add sound from {name}.\nError: {result['error']}", parent=self)
+        if pending: return
+        self.sound_manager.save_config(); self.sound_manager.save_library_index()
+        self.keybind_manager.update_hotkeys()
+
+    def _add_watched_folder(self):
+        folder = filedialog.askdirectory(parent=self)
+        if not folder: return
+        self.sound_manager.add_watched_folder(folder)
+        self.watched_folders_listbox.delete(0, END)
+        for watched in self.sound_manager.watched_folders: self.watched_folders_listbox.insert(END, watched)
+        self.rescan_watched_folders()
+
+    def _remove_watched_folder(self):
+        selection = self.watched_folders_listbox.curselection()
+        if not selection: return
+        self.sound_manager.remove_watched_folder(self.watched_folders_listbox.get(selection[0]))
+        self.watched_folders_listbox.delete(selection[0])
+
+    def export_sound_bank(self):
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=".wpbank", filetypes=BANK_FORMATS)
+        if not path: return
+        sound_ids = set(self.selected_sound_ids) or None
+        self.show_status_message("Exporting sound bank...", "info")
+        def worker():
             try:
-                self.sound_manager.add_sound(path)
-                self.show_status_message(f"Added: {os.path.basename(path)}", "success")
+                count = self.sound_manager.export_bank(path, sound_ids)
+                self.after(0, self.show_status_message, f"Exported {count} sound(s) to {os.path.basename(path)}.", "success")
             except Exception as e:
-                messagebox.showerror("Add Sound Error", f"Failed to add sound from {os.path.basename(path)}.\nError: {e}", parent=self)
-                self.show_status_message(f"Failed to add sound.", "danger")
+                logging.error(f"Failed to export sound bank to {path}: {e}")
+                self.after(0, self.show_status_message, "Failed to export sound bank.", "danger")
+        threading.Thread(target=worker, daemon=True).start()
+
+    def import_sound_bank(self):
+        path = filedialog.askopenfilename(parent=self, filetypes=BANK_FORMATS)
+        if not path: return
+        self.show_status_message("Importing sound bank...", "info")
+        def worker():
+            try:
+                bank_path = self.sound_manager.copy_bank_into_library(path)
+                self.after(0, self._mount_sound_bank, bank_path)
+            except Exception as e:
+                logging.error(f"Failed to copy sound bank {path}: {e}")
+                self.after(0, self.show_status_message, "Failed to import sound bank.", "danger")
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _mount_sound_bank(self, bank_path):
+        try:
+            start = time.perf_counter()
+            added = self.sound_manager.mount_bank(bank_path)
+            logging.info(f"Mounted sound bank {bank_path} with {len(added)} sounds in {(time.perf_counter() - start) * 1000:.1f} ms")
+        except Exception as e:
+            logging.error(f"Failed to load sound bank {bank_path}: {e}")
+            messagebox.showerror("Import Bank Error", f"Failed to load sound bank.\nError: {e}", parent=self)
+            return
+        self._refresh_global_hotkey_vars()
         self.keybind_manager.update_hotkeys()
-        self.populate_sound_list()
-        
+        self.insert_sound_cards(added)
+        self.show_status_message(f"Imported {len(added)} sound(s) from bank.", "success")
+
+    def _periodic_watch_rescan(self):
+        self.rescan_watched_folders()
+        self.after(WATCH_RESCAN_INTERVAL_MS, self._periodic_watch_rescan)
+
+    def rescan_watched_folders(self):
+        if self._watch_scan_running or not self.sound_manager.watched_folders: return
+        self._watch_scan_running = True
+        threading.Thread(target=lambda: self.after(0, self._on_watch_scan_finished, self.sound_manager.scan_watched_folders()), daemon=True).start()
+
+    def _on_watch_scan_finished(self, scan):
+        self._watch_scan_running = False
+        to_import = self.sound_manager.apply_folder_scan(scan)
+        if to_import is None: return
+        for path, replace_id in to_import: self.sound_manager.queue_import(path, self._on_import_done_threadsafe, replace_id=replace_id, source=path)
+        if to_import: self.show_status_message(f"Importing {len(to_import)} new or changed file(s) from watched folders...", "info")
+        if scan["removed"]:
+            self.show_status_message(f"{len(scan['removed'])} watched file(s) were removed from disk.", "warning")
+            self.sound_manager.save_config()
+
     def remove_selected_sounds(self):
         if not self.selected_sound_ids: self.show_status_message("No sounds selected.", "warning"); return
         if messagebox.askyesno("Confirm Removal", f"Are you sure you want to permanently remove {len(self.selected_sound_ids)} sound(s)?", parent=self):
             ids_to_remove = self.selected_sound_ids.copy()
             self.sound_manager.remove_sounds(ids_to_remove)
-            for sound_id in ids_to_remove: self._remove_sound_card_from_ui(sound_id)
             self.selected_sound_ids.clear(); self.last_selected_id = None
-            self.keybind_manager.update_hotkeys()
+            self.keybind_manager.update_hotkeys(); self._refresh_sequences_list()
             self.show_status_message(f"Removed {len(ids_to_remove)} sound(s).", "success")
-            self.populate_sound_list()
+            self.remove_sound_cards(ids_to_remove)
 
     def play_sound(self, sound_id):
         sound = self.sound_manager.get_sound_by_id(sound_id)
         if not sound or not sound.get("enabled", True): return
 
-        audio_data = self.sound_manager.sound_data_cache.get(sound_id)
-        if audio_data is None:
-            try:
-                self.sound_manager.preload_sound_data(sound)
-                audio_data = self.sound_manager.sound_data_cache.get(sound_id)
-            except Exception as e:
-                logging.error(f"Failed to load audio on demand for '{sound['name']}': {e}")
-                self.show_status_message(f"Error playing {sound['name']}", "danger")
-                return
+        try: audio_data = self.sound_manager.cached_sound_data(sound)
+        except Exception as e:
+            logging.error(f"Failed to load audio on demand for '{sound['name']}': {e}")
+            self.show_status_message(f"Error playing {sound['name']}", "danger")
+            return
 
         if audio_data is not None:
-            self.audio_manager.mixer.add_sound(audio_data, sound["volume"], sound["loop"], sound_id, sound["name"])
+            self.audio_manager.mixer.add_sound(audio_data, sound["volume"], sound["loop"], sound_id, sound["name"], sound.get("max_voices", 1))
+            self.wake_now_playing_status()
 
     def stop_sound(self, sound_id):
         if self.audio_manager.mixer.remove_sound_by_id(sound_id):
@@ -1363,6 +3681,41 @@ class SoundboardApp(ttk.Window):
         self.audio_manager.mixer.clear_sounds()
         self.after(0, self.show_status_message, "All sounds stopped.", "success")
 
+    def toggle_recording(self):
+        if self.audio_manager.recording_stats():
+            stats = self.audio_manager.stop_recording(); self._update_recording_status()
+            self.show_status_message(f"Recording saved: {os.path.basename(stats['path'])} ({stats['dropped_blocks']} dropped blocks)", "success" if not stats["dropped_blocks"] else "warning")
+            return
+        path = filedialog.asksaveasfilename(parent=self, initialdir=RECORDINGS_DIR, initialfile=time.strftime("WarpBoard %Y-%m-%d %H-%M-%S.flac"), defaultextension=".flac", filetypes=RECORD_FORMATS)
+        if not path: return
+        try: self.audio_manager.start_recording(path, self.record_mic_stem_var.get())
+        except Exception as e: self.report_error("Recording Failed", f"Could not start recording:\n{e}"); return
+        self.show_status_message(f"Recording to {os.path.basename(path)}", "danger")
+        self._update_recording_status()
+
+    def _update_recording_status(self):
+        stats = self.audio_manager.recording_stats()
+        if not stats: self.record_button.configure(text="⏺ Record", bootstyle="warning-outline"); return
+        if stats["error"]:
+            self.audio_manager.stop_recording(); self._update_recording_status()
+            self.report_error("Recording Failed", f"Recording stopped: {stats['error']}"); return
+        minutes, seconds = divmod(int(stats["seconds"]), 60)
+        self.record_button.configure(text=f"⏹ Stop {minutes:02d}:{seconds:02d}", bootstyle="danger")
+        self.after(1000, self._update_recording_status)
+
+    def save_replay(self):
+        """Hotkey entry point: the ring is copied and encoded on a worker thread, then lands on the board like an import."""
+        threading.Thread(target=self._save_replay_worker, daemon=True).start()
+    def _save_replay_worker(self):
+        name = time.strftime("Replay %Y-%m-%d %H-%M-%S")
+        path = self.sound_manager.unique_sound_path(name)
+        result = {"path": path, "source": None, "sound": None, "error": None}
+        try:
+            if not self.audio_manager.save_replay(path): self.after(0, self.show_status_message, "Instant replay is off or has nothing buffered yet.", "warning"); return
+            result["sound"] = self.sound_manager.describe_sound_file(path, name)
+        except Exception as e: logging.error(f"Failed to save instant replay: {e}"); result["error"] = e
+        self._on_import_done_threadsafe(result, 0)
+
     def toggle_include_mic_in_mix(self):
         is_enabled = self.include_mic_in_mix_var.get()
         if is_enabled:
@@ -1399,14 +3752,14 @@ class SoundboardApp(ttk.Window):
             self.sound_manager.update_sound_property(sound_id, "hotkeys", hotkey_list)
             display_str = get_hotkey_display_string(hotkey_list)
             hotkey_var.set(display_str)
-            self.sound_card_widgets[sound_id]['hotkey_var'].set(display_str)
+            if sound_id in self.sound_card_widgets: self.sound_card_widgets[sound_id].hotkey_var.set(display_str)
             self.keybind_manager.update_hotkeys()
         HotkeyRecorder(self, sound['name'], on_complete)
         
     def _clear_sound_hotkey(self, sound_id, hotkey_var):
         self.sound_manager.update_sound_property(sound_id, "hotkeys", [])
         hotkey_var.set("Not Assigned")
-        self.sound_card_widgets[sound_id]['hotkey_var'].set("Not Assigned")
+        if sound_id in self.sound_card_widgets: self.sound_card_widgets[sound_id].hotkey_var.set("Not Assigned")
         self.keybind_manager.update_hotkeys()
         
     def _assign_global_hotkey(self, action, var):
@@ -1422,29 +3775,79 @@ class SoundboardApp(ttk.Window):
     def show_status_message(self, message, style="info"):
         self.status_message_var.set(message); self.status_label.configure(bootstyle=style)
         self.after(5000, lambda: self.status_label.configure(bootstyle="secondary"))
+
+    def report_error(self, title, message): messagebox.showerror(title, message, parent=self)
         
     def update_now_playing_status(self):
-        with current_playing_sound_details_lock:
-            names, is_active = current_playing_sound_details.get("names", []), current_playing_sound_details.get("active", False)
-        status_text = "Now Playing: "
-        if is_active:
-            self.stop_all_button.configure(bootstyle="danger")
-            if names:
-                status_text += ", ".join(names[:2]);
-                if len(names) > 2: status_text += f" & {len(names) - 2} more"
-            else: status_text += "Microphone"
-        else:
-            self.stop_all_button.configure(bootstyle="danger-outline"); status_text += "None"
-        self.now_playing_var.set(status_text)
-        self.after(250, self.update_now_playing_status)
+        """Drains the mixer's voice start/stop events and only touches the widgets when the playing set or mic state changed.
+        Polls every NOW_PLAYING_POLL_MS while anything plays and backs off to NOW_PLAYING_IDLE_POLL_MS when idle."""
+        mixer = self.audio_manager.mixer
+        events, changed = mixer.voice_events, False
+        if mixer.voice_events_overflowed:
+            mixer.voice_events_overflowed = False; events.clear(); self._playing_voices.clear()
+            for card in self.sound_card_widgets.values(): card.set_active(False)
+            for sound_id, name in mixer.active_voices(): self._track_voice("start", sound_id, name)
+            changed = True
+        while events:
+            kind, sound_id, name, stamp = events.popleft()
+            if kind == "start": METRICS.voice_started(sound_id, stamp)
+            self._track_voice(kind, sound_id, name); changed = True
+        is_active = bool(self._playing_voices) or self.audio_manager.mic_inclusion_event.is_set()
+        if changed or is_active != self._now_playing_active:
+            self._now_playing_active = is_active
+            names = [name for name, _ in self._playing_voices.values()]
+            status_text = "Now Playing: "
+            if is_active:
+                if names:
+                    status_text += ", ".join(names[:2]);
+                    if len(names) > 2: status_text += f" & {len(names) - 2} more"
+                else: status_text += "Microphone"
+            else: status_text += "None"
+            self.stop_all_button.configure(bootstyle="danger" if is_active else "danger-outline")
+            self.now_playing_var.set(status_text)
+        busy = self._playing_voices or self._now_playing_progress_value or changed
+        if busy: self._update_voice_progress()
+        self._now_playing_interval = NOW_PLAYING_POLL_MS if busy else min(self._now_playing_interval * 2, NOW_PLAYING_IDLE_POLL_MS)
+        self._now_playing_job = self.after(self._now_playing_interval, self.update_now_playing_status)
+
+    def wake_now_playing_status(self):
+        """Returns the now-playing poll to full rate after a play; safe from hotkey threads."""
+        if self._now_playing_interval != NOW_PLAYING_POLL_MS: self.after(0, self._wake_now_playing_status)
+    def _wake_now_playing_status(self):
+        if self._now_playing_interval == NOW_PLAYING_POLL_MS: return
+        if self._now_playing_job: self.after_cancel(self._now_playing_job)
+        self._now_playing_interval = NOW_PLAYING_POLL_MS
+        self._now_playing_job = self.after(NOW_PLAYING_POLL_MS, self.update_now_playing_status)
+
+    def _update_voice_progress(self):
+        """Renders the mixer's voice snapshot as card playheads and a status bar progress for the most recently started voice."""
+        progress = {}
+        for voice in self.audio_manager.mixer.voice_snapshot:
+            if voice["id"] in self._playing_voices: progress[voice["id"]] = voice["position"] / voice["length"] if voice["length"] else 0.0
+        for sound_id, card in self.sound_card_widgets.items(): card.set_progress(progress.get(sound_id))
+        value = int(1000 * progress[next(reversed(progress))]) if progress else 0
+        if value != self._now_playing_progress_value:
+            self._now_playing_progress_value = value; self.now_playing_progress.configure(value=value)
+
+    def _track_voice(self, kind, sound_id, name):
+        # Several voices can share an id (loops, overlapping triggers), so each entry keeps a live count.
+        entry = self._playing_voices.get(sound_id)
+        if kind == "start":
+            if entry: entry[1] += 1
+            else: self._playing_voices[sound_id] = [name, 1]
+        elif entry:
+            entry[1] -= 1
+            if entry[1] <= 0: del self._playing_voices[sound_id]
+        card = self.sound_card_widgets.get(sound_id)
+        if card: card.set_active(sound_id in self._playing_voices)
         
     def _save_app_settings(self):
-        settings = {"theme": self.current_theme_var.get(), "master_volume": self.master_volume_var.get(), "soundboard_monitor_volume": self.soundboard_monitor_volume_var.get(), "mic_monitor_volume": self.mic_monitor_volume_var.get(), "soundboard_monitor_enabled": self.soundboard_monitor_enabled_var.get(), "mic_monitor_enabled": self.mic_monitor_enabled_var.get(), "auto_start_mic": self.auto_start_mic_var.get(), "single_sound_mode": self.single_sound_mode_var.get()}
+        settings = {"theme": self.current_theme_var.get(), "master_volume": self.master_volume_var.get(), "soundboard_monitor_volume": self.soundboard_monitor_volume_var.get(), "mic_monitor_volume": self.mic_monitor_volume_var.get(), "soundboard_monitor_enabled": self.soundboard_monitor_enabled_var.get(), "mic_monitor_enabled": self.mic_monitor_enabled_var.get(), "auto_start_mic": self.auto_start_mic_var.get(), "single_sound_mode": self.single_sound_mode_var.get(), "compact_sample_cache": self.compact_sample_cache_var.get(), "max_voices": self.max_voices_var.get(), "voice_steal_policy": self.voice_steal_policy_var.get(), "audio_engine_process": self.audio_engine_process_var.get(), "record_mic_stem": self.record_mic_stem_var.get(), "replay_seconds": self.replay_seconds_var.get(), "metrics_http": self.metrics_http_var.get()}
         self.app_settings.save_settings(settings); logging.info("Application settings saved.")
         
     def _on_app_closure(self):
         self._save_app_settings(); self.sound_manager.save_config()
-        self.audio_manager.close(); self.keybind_manager.stop(); self.destroy()
+        self.metrics_exporter.stop(); self.audio_manager.close(); self.keybind_manager.stop(); self.destroy()
         logging.info("--- WarpBoard Closed ---")
         
     def populate_device_dropdowns(self):
@@ -1472,6 +3875,10 @@ class SoundboardApp(ttk.Window):
             self._set_combo_from_setting(self.input_device_combo, "input_device_id", self.filtered_input_devices)
             self._set_combo_from_setting(self.sb_monitor_combo, "soundboard_monitor_device_id", self.filtered_monitor_devices)
             self._set_combo_from_setting(self.mic_monitor_combo, "mic_monitor_device_id", self.filtered_monitor_devices)
+            for combo, key, names in ((self.output_fallback_combo, "output_fallback_devices", output_display_names), (self.input_fallback_combo, "input_fallback_devices", self.input_device_combo['values']), (self.monitor_fallback_combo, "monitor_fallback_devices", self.sb_monitor_combo['values'])):
+                combo['values'] = ["None"] + [name for name in names if name != "🎙 WarpBoard Virtual Mic"]
+                saved = self.app_settings.get_setting(key, [])
+                combo.set(saved[0] if saved else "None")
             
     def _set_combo_from_setting(self, combo, setting_key, device_list, preferred_device_name=None):
         device_id = self.app_settings.get_setting(setting_key)
@@ -1511,6 +3918,25 @@ class SoundboardApp(ttk.Window):
         self.app_settings.save_settings({"mic_monitor_device_id": device_id})
         if self.mic_monitor_enabled_var.get(): self.audio_manager.start_mic_monitor_stream()
         
+    def _on_fallback_device_selected(self, event, setting_key):
+        name = event.widget.get()
+        self.app_settings.save_settings({setting_key: [] if name == "None" else [name]})
+
+    def on_stream_state(self, stream_attr, state):
+        """Supervisor callback (Tk thread): shows each stream's state under the fallback devices."""
+        self._stream_states[stream_attr] = state
+        parts = []
+        for attr, entry in self._stream_states.items():
+            if entry["state"] == "stopped": continue
+            parts.append(f"{STREAM_ROLES[attr][0]}: {entry['state']}" + (f" ({entry['device']})" if entry["device"] else ""))
+        self.stream_state_var.set("Streams: " + (", ".join(parts) or "none open"))
+
+    def on_audio_devices_changed(self, remap):
+        """Supervisor callback (Tk thread): device indexes moved after a re-enumeration, so saved ids follow their devices."""
+        changes = {key: remap[self.app_settings.get_setting(key)] for key in DEVICE_SETTING_KEYS if self.app_settings.get_setting(key) in remap}
+        if changes: self.app_settings.save_settings(changes)
+        self.populate_device_dropdowns()
+
     def _on_theme_changed(self, _):
         messagebox.showinfo("Theme Change", "Theme will be applied on next restart.", parent=self)
         self._save_app_settings()
@@ -1519,8 +3945,31 @@ class SoundboardApp(ttk.Window):
         self.audio_manager.mixer.set_single_sound_mode(self.single_sound_mode_var.get())
         self._save_app_settings()
         
+    def _on_voice_limit_changed(self):
+        try: self.audio_manager.mixer.set_voice_limit(self.max_voices_var.get(), self.voice_steal_policy_var.get())
+        except tk.TclError: return
+        self._save_app_settings()
+
+    def _on_metrics_http_changed(self):
+        self.metrics_exporter.stop()
+        self.metrics_exporter = MetricsExporter(self, METRICS_PORT if self.metrics_http_var.get() else None)
+        self._save_app_settings()
+
+    def _on_replay_seconds_changed(self):
+        try: self.audio_manager.set_replay_seconds(self.replay_seconds_var.get())
+        except tk.TclError: return
+        self._save_app_settings()
+
+    def _on_compact_sample_cache_changed(self):
+        # Already-playing voices keep their data; cached entries reload in the new format on next play.
+        self.sound_manager.cache_format = "int16" if self.compact_sample_cache_var.get() else "float32"
+        METRICS.count("cache_evictions", len(self.sound_manager.sound_data_cache)); self.sound_manager.sound_data_cache.clear()
+        self._save_app_settings()
+
     def _apply_settings_to_ui(self):
         self.audio_manager.mixer.set_single_sound_mode(self.single_sound_mode_var.get())
+        self.audio_manager.mixer.set_voice_limit(self.max_voices_var.get(), self.voice_steal_policy_var.get())
+        self.audio_manager.set_replay_seconds(self.replay_seconds_var.get())
         
         self.audio_manager.set_master_volume(self.master_volume_var.get() / 100.0)
         self.audio_manager.set_sb_monitor_volume(self.soundboard_monitor_volume_var.get() / 100.0)
@@ -1530,12 +3979,427 @@ class SoundboardApp(ttk.Window):
         self.toggle_soundboard_monitor()
         self.toggle_mic_monitor()
 
+# --- Headless Mode ---
+class HeadlessApp:
+    """Runs the library, audio engine and global hotkeys without Tk; triggered by hotkeys and the local control server."""
+    def __init__(self, port=CONTROL_PORT):
+        self.app_settings = AppSettingsManager()
+        self.sound_manager = SoundManager("int16" if self.app_settings.get_setting("compact_sample_cache", True) else "float32")
+        self.audio_manager = (EngineProcessClient if self.app_settings.get_setting("audio_engine_process", False) else AudioOutputManager)(self)
+        self.keybind_manager, self.sequence_player = KeybindManager(self), SequencePlayer(self)
+        # _pending_triggers: sound id -> arrival times of triggers whose voices have not started, oldest first, so a burst
+        # of retriggers yields one latency sample each. commands_handled is bumped from every handler thread without a
+        # lock; as with Metrics counters, a rare lost increment is accepted.
+        self.latencies, self._pending_triggers, self.commands_handled = deque(maxlen=CONTROL_LATENCY_WINDOW), {}, 0
+        self._stop_event, self._ids_by_name = Event(), {}
+        self.control_server = ControlServer((CONTROL_HOST, port), self)
+
+    def show_status_message(self, message, style="info"):
+        (logging.error if style == "danger" else logging.info)(f"Status: {message}")
+    def report_error(self, title, message): logging.error(f"{title}: {message}")
+    def on_audio_devices_changed(self, remap):
+        changes = {key: remap[self.app_settings.get_setting(key)] for key in DEVICE_SETTING_KEYS if self.app_settings.get_setting(key) in remap}
+        if changes: self.app_settings.save_settings(changes)
+
+    def _index_names(self): self._ids_by_name = {s["name"].lower(): s["id"] for s in self.sound_manager.sounds}
+    def resolve(self, command):
+        return command["id"] if "id" in command else self._ids_by_name.get(str(command.get("name", "")).lower())
+
+    def play_sound(self, sound_id, received=None):
+        sound = self.sound_manager.get_sound_by_id(sound_id)
+        if not sound or not sound.get("enabled", True): return False
+        try: audio_data = self.sound_manager.cached_sound_data(sound)
+        except Exception as e: logging.error(f"Failed to load audio on demand for '{sound['name']}': {e}"); return False
+        if audio_data is None: return False
+        self._pending_triggers.setdefault(sound_id, deque(maxlen=CONTROL_LATENCY_WINDOW)).append(received or time.perf_counter())
+        self.audio_manager.mixer.add_sound(audio_data, sound["volume"], sound["loop"], sound_id, sound["name"], sound.get("max_voices", 1))
+        return True
+    def stop_all_sounds(self): self.audio_manager.mixer.clear_sounds()
+    def set_mic_in_mix(self, enabled):
+        if enabled: self.audio_manager.mic_inclusion_event.set(); self.audio_manager.start_mic_input()
+        else: self.audio_manager.mic_inclusion_event.clear(); self.audio_manager.stop_mic_input()
+    def toggle_mic_to_mixer_from_hotkey(self): self.set_mic_in_mix(not self.audio_manager.mic_inclusion_event.is_set())
+    def save_replay(self):
+        """Hotkey entry: encodes on a worker thread, so a slow save never holds up the listener and the other hotkeys."""
+        threading.Thread(target=self.save_replay_now, daemon=True).start()
+    def save_replay_now(self):
+        """Saves the replay buffer as a new sound and returns it, or None; the replay control command waits on this."""
+        name = time.strftime("Replay %Y-%m-%d %H-%M-%S")
+        path = self.sound_manager.unique_sound_path(name)
+        try:
+            if not self.audio_manager.save_replay(path): return None
+            sound = self.sound_manager.commit_import({"sound": self.sound_manager.describe_sound_file(path, name)})
+        except Exception as e: logging.error(f"Failed to save instant replay: {e}"); return None
+        self.sound_manager.save_config(); self._index_names()
+        logging.info(f"Saved instant replay as '{name}' ({sound['duration']:.1f} s)."); return sound
+
+    def _watch_voice_events(self):
+        # Matches each voice's first mixed block against the time its trigger arrived; that gap is the command-to-audio latency.
+        while not self._stop_event.is_set():
+            # Re-read each pass: a failing engine process is replaced by an in-process manager with its own mixer.
+            events = self.audio_manager.mixer.voice_events
+            while events:
+                kind, sound_id, _, stamp = events.popleft()
+                if kind == "start": METRICS.voice_started(sound_id, stamp)
+                pending = self._pending_triggers.get(sound_id) if kind == "start" else None
+                received = pending.popleft() if pending else None
+                if received is not None: self.latencies.append((stamp - received) * 1000)
+            time.sleep(0.002)
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        pick = lambda q: round(latencies[min(len(latencies) - 1, int(q * len(latencies)))], 3) if latencies else None
+        stream = self.audio_manager.main_stream
+        return {"commands": self.commands_handled, "voices": len(self.audio_manager.mixer.voice_snapshot), "triggers_measured": len(latencies),
+                "latency_ms": {"p50": pick(0.5), "p95": pick(0.95), "max": pick(1.0)},
+                "output_latency_ms": round(stream.get_output_latency() * 1000, 3) if stream else None, "recording": self.audio_manager.recording_stats(),
+                "streams": dict(self.audio_manager.supervisor.states)}
+
+    def execute(self, command, received=None):
+        """Runs one control command dict and returns the reply dict; unknown or malformed commands come back as ok=False."""
+        self.commands_handled += 1
+        cmd, mixer = command.get("cmd"), self.audio_manager.mixer
+        if cmd == "play":
+            sound_id = self.resolve(command)
+            return {"ok": bool(sound_id) and self.play_sound(sound_id, received), "id": sound_id}
+        if cmd == "stop":
+            sound_id = self.resolve(command)
+            return {"ok": bool(sound_id) and mixer.remove_sound_by_id(sound_id), "id": sound_id}
+        if cmd == "stop_all": self.stop_all_sounds(); return {"ok": True}
+        if cmd == "volume":
+            setter = {"master": self.audio_manager.set_master_volume, "sb_monitor": self.audio_manager.set_sb_monitor_volume, "mic_monitor": self.audio_manager.set_mic_monitor_volume}.get(command.get("target", "master"))
+            if not setter or not isinstance(command.get("value"), (int, float)): return {"ok": False, "error": "volume needs a numeric value (0-100) and a target of master, sb_monitor or mic_monitor"}
+            setter(max(0.0, min(100.0, command["value"])) / 100.0); return {"ok": True}
+        if cmd == "mic": self.set_mic_in_mix(bool(command.get("enabled"))); return {"ok": True}
+        if cmd == "record":
+            if command.get("stop"):
+                stats = self.audio_manager.stop_recording(); return {"ok": stats is not None, "recording": stats}
+            path = command.get("path") or os.path.join(RECORDINGS_DIR, time.strftime("WarpBoard %Y-%m-%d %H-%M-%S.flac"))
+            try: self.audio_manager.start_recording(path, bool(command.get("mic_stem", self.app_settings.get_setting("record_mic_stem", False))))
+            except Exception as e: return {"ok": False, "error": str(e)}
+            return {"ok": True, "path": path}
+        if cmd == "replay":
+            sound = self.save_replay_now()
+            return {"ok": True, "id": sound["id"], "name": sound["name"], "duration": sound["duration"]} if sound else {"ok": False, "error": "Instant replay is off or has nothing buffered yet."}
+        if cmd == "sequence":
+            sequence = self.sound_manager.get_sequence_by_id(command.get("id")) or next((q for q in self.sound_manager.sequences if q["name"].lower() == str(command.get("name", "")).lower()), None)
+            if not sequence: return {"ok": False, "error": "Unknown sequence"}
+            if command.get("stop"): self.sequence_player.stop(sequence["id"]); return {"ok": True, "id": sequence["id"]}
+            return {"ok": self.sequence_player.play(sequence["id"]), "id": sequence["id"]}
+        if cmd == "batch": return {"ok": True, "results": [self.execute(c, received) for c in command.get("commands", []) if isinstance(c, dict)]}
+        if cmd == "list": return {"ok": True, "sounds": [{"id": s["id"], "name": s["name"], "hotkeys": s.get("hotkeys", [])} for s in self.sound_manager.sounds],
+                                  "sequences": [{"id": q["id"], "name": q["name"], "items": len(q["items"])} for q in self.sound_manager.sequences],
+                                  "profiles": self.sound_manager.profiles, "active_profile": self.sound_manager.active_profile}
+        if cmd == "profile":
+            profile = self.sound_manager.get_profile_by_id(command.get("id")) or next((p for p in self.sound_manager.profiles if p["name"].lower() == str(command.get("name", "")).lower()), None)
+            if not profile: return {"ok": False, "error": "Unknown board"}
+            try: switched = self.sound_manager.switch_profile(profile["id"])
+            except ValueError as e: return {"ok": False, "error": str(e)}
+            if switched:
+                self._index_names(); self.keybind_manager.update_hotkeys(); self.sound_manager.warm_profile_cache()
+            return {"ok": True, "id": profile["id"], "sounds": len(self.sound_manager.sounds)}
+        if cmd == "stats": return {"ok": True, **self.stats()}
+        if cmd == "metrics": return {"ok": True, "metrics": self.metrics_exporter.latest}
+        if cmd == "reload":
+            self.sound_manager.load_config(); self._index_names(); self.keybind_manager.update_hotkeys()
+            return {"ok": True, "sounds": len(self.sound_manager.sounds)}
+        if cmd == "ping": return {"ok": True}
+        if cmd == "shutdown": self._stop_event.set(); return {"ok": True}
+        return {"ok": False, "error": f"Unknown command: {cmd}"}
+
+    def run(self):
+        settings = self.app_settings
+        self.audio_manager.mixer.set_single_sound_mode(settings.get_setting("single_sound_mode", True))
+        self.audio_manager.mixer.set_voice_limit(settings.get_setting("max_voices", DEFAULT_MAX_VOICES), settings.get_setting("voice_steal_policy", "oldest"))
+        self.audio_manager.set_replay_seconds(settings.get_setting("replay_seconds", DEFAULT_REPLAY_SECONDS))
+        self.audio_manager.set_master_volume(settings.get_setting("master_volume", 100.0) / 100.0)
+        self.audio_manager.set_sb_monitor_volume(settings.get_setting("soundboard_monitor_volume", 75.0) / 100.0)
+        self.audio_manager.set_mic_monitor_volume(settings.get_setting("mic_monitor_volume", 75.0) / 100.0)
+        self._index_names()
+        self.keybind_manager.update_hotkeys()
+        self.audio_manager.start_main_stream()
+        if settings.get_setting("soundboard_monitor_enabled", True): self.audio_manager.start_soundboard_monitor_stream()
+        if settings.get_setting("mic_monitor_enabled", False): self.audio_manager.start_mic_monitor_stream()
+        if settings.get_setting("auto_start_mic", False): self.set_mic_in_mix(True)
+        threading.Thread(target=self._watch_voice_events, daemon=True).start()
+        self.metrics_exporter = MetricsExporter(self, METRICS_PORT if settings.get_setting("metrics_http", False) else None)
+        threading.Thread(target=self.control_server.serve_forever, kwargs={"poll_interval": 0.1}, daemon=True).start()
+        logging.info(f"Headless mode: {len(self.sound_manager.sounds)} sounds, control server on {CONTROL_HOST}:{self.control_server.server_address[1]}")
+        print(f"WarpBoard headless: control server on {CONTROL_HOST}:{self.control_server.server_address[1]} (Ctrl+C to quit)")
+        try:
+            while not self._stop_event.wait(0.5): pass
+        except KeyboardInterrupt: pass
+        self.control_server.shutdown(); self.control_server.server_close()
+        self.metrics_exporter.stop(); self.audio_manager.close(); self.keybind_manager.stop()
+        logging.info("--- WarpBoard Headless Closed ---")
+
+class ControlRequestHandler(socketserver.StreamRequestHandler):
+    """Newline-delimited JSON: one command object per line in, one reply object per line out, on a persistent connection."""
+    disable_nagle_algorithm = True
+    def handle(self):
+        for line in self.rfile:
+            received = time.perf_counter()
+            if not line.strip(): continue
+            try: command = json.loads(line)
+            except json.JSONDecodeError as e: reply = {"ok": False, "error": f"Invalid JSON: {e}"}
+            else:
+                # A command with a bad field must not drop the connection and every command pipelined behind it.
+                try: reply = self.server.app.execute(command, received) if isinstance(command, dict) else {"ok": False, "error": "Command must be a JSON object"}
+                except Exception as e: logging.error(f"Control command {command} failed: {e}"); reply = {"ok": False, "error": str(e)}
+            self.wfile.write(json.dumps(reply).encode() + b"\n")
+
+class ControlServer(socketserver.ThreadingTCPServer):
+    daemon_threads, allow_reuse_address = True, True
+    def __init__(self, address, app):
+        super().__init__(address, ControlRequestHandler); self.app = app
+
+class ControlClient:
+    """Client for the headless control server. send() waits for each reply; send_many() pipelines a burst of commands."""
+    def __init__(self, port=CONTROL_PORT, host=CONTROL_HOST, timeout=5.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile("rb")
+    def send(self, cmd, **fields): return self.send_many([{"cmd": cmd, **fields}])[0]
+    def send_many(self, commands):
+        self.sock.sendall(b"".join(json.dumps(c).encode() + b"\n" for c in commands))
+        return [json.loads(self.reader.readline()) for _ in commands]
+    def close(self): self.reader.close(); self.sock.close()
+
+# --- Offline Rendering ---
+def render_timeline(events, output_path=None, duration=None, single_sound_mode=False, subtype="FLOAT"):
+    """Renders play/stop events through MixingBuffer as fast as the CPU allows and streams the mix to a WAV file.
+    Blocks are split at event frames, so triggers are sample-accurate. Without a duration the render ends once every
+    event has fired and the last voice has finished. Returns frame, block and timing counts."""
+    events = sorted(events, key=lambda e: e["time"])
+    event_frames = [int(round(e["time"] * SAMPLE_RATE)) for e in events]
+    end_frame = int(round(duration * SAMPLE_RATE)) if duration is not None else RENDER_MAX_SECONDS * SAMPLE_RATE
+    mixer = MixingBuffer(); mixer.set_single_sound_mode(single_sound_mode)
+    writer = sf.SoundFile(output_path, 'w', SAMPLE_RATE, CHANNELS, subtype) if output_path else None
+    # The limiter's look-ahead delays the mix; those frames are rendered past the end and dropped from the start.
+    frame, next_event, blocks, latency, finished, start = 0, 0, 0, mixer.bus.latency, duration is not None, time.perf_counter()
+    try:
+        while frame < end_frame + latency:
+            while next_event < len(events) and event_frames[next_event] <= frame:
+                event = events[next_event]; next_event += 1
+                if event["action"] == "play": mixer.add_sound(event["data"], event["volume"], event["loop"], event["id"], event["name"], event.get("max_voices", 1))
+                elif event["action"] == "stop": mixer.remove_sound_by_id(event["id"])
+                elif event["action"] == "stop_all": mixer.clear_sounds()
+            if not finished and next_event == len(events) and mixer.idle(): end_frame, finished = min(frame, end_frame), True
+            count = min(FRAME_SIZE, end_frame + latency - frame, event_frames[next_event] - frame if next_event < len(events) else FRAME_SIZE)
+            if count <= 0: break
+            block = mixer.mix_audio(count)
+            if writer and frame + count > latency: writer.write(block[max(0, latency - frame):])
+            frame, blocks = frame + count, blocks + 1
+    finally:
+        if writer: writer.close()
+    if not finished: logging.warning(f"Render stopped at the {RENDER_MAX_SECONDS} s cap; pass a duration for looping timelines.")
+    elapsed, frame = time.perf_counter() - start, max(0, frame - latency)
+    return {"frames": frame, "blocks": blocks, "seconds": frame / SAMPLE_RATE, "elapsed": elapsed, "blocks_per_second": blocks / elapsed if elapsed else float("inf"), "realtime_factor": frame / SAMPLE_RATE / elapsed if elapsed else float("inf")}
+
+def render_timeline_file(timeline_path, output_path, duration=None):
+    """CLI entry: renders a JSON timeline (a list of entries, or {"events": [...], "duration": s, "single_sound_mode": b})."""
+    with open(timeline_path, 'r') as f: timeline = json.load(f)
+    if isinstance(timeline, list): timeline = {"events": timeline}
+    sound_manager = SoundManager("float32")
+    stats = render_timeline(sound_manager.resolve_timeline(timeline["events"]), output_path, duration if duration is not None else timeline.get("duration"), timeline.get("single_sound_mode", False))
+    print(f"Rendered {stats['seconds']:.2f} s to {output_path} in {stats['elapsed'] * 1000:.1f} ms ({stats['blocks_per_second']:.0f} blocks/s, {stats['realtime_factor']:.0f}x real time)")
+    return stats
+
+# --- Benchmarks ---
+def run_mixer_benchmark(voices=16, blocks=2000, clip_seconds=30):
+    """Mixes the same looping voice load from float32 stereo and int16 native caches and reports memory and block cost."""
+    rng = np.random.default_rng(0)
+    source = rng.integers(-16384, 16384, size=(clip_seconds * SAMPLE_RATE, 1), dtype=np.int16)
+    layouts = {"float32 stereo": np.repeat(source.astype(np.float32) * INT16_SCALE, CHANNELS, axis=1), "int16 native": source}
+    budget_ms = FRAME_SIZE / SAMPLE_RATE * 1000
+    results = {}
+    for label, data in layouts.items():
+        mixer = MixingBuffer()
+        for i in range(voices): mixer.add_sound(data, 0.5, True, f"voice-{i}", label)
+        mixer.mix_audio(FRAME_SIZE)
+        start = time.perf_counter()
+        for _ in range(blocks): mixer.mix_audio(FRAME_SIZE)
+        per_block_ms = (time.perf_counter() - start) * 1000 / blocks
+        results[label] = {"bytes_per_clip": data.nbytes, "per_block_ms": per_block_ms}
+        print(f"{label:>15}: {data.nbytes / 2**20:8.2f} MiB/clip, {per_block_ms:.4f} ms/block with {voices} voices ({per_block_ms / budget_ms:.1%} of the {budget_ms:.1f} ms budget)")
+    bus, source_block = MasterBus(), np.ascontiguousarray(layouts["float32 stereo"][:FRAME_SIZE] * 4)
+    block = np.empty_like(source_block)
+    start = time.perf_counter()
+    for _ in range(blocks): np.copyto(block, source_block); bus.process(block)
+    bus_ms = (time.perf_counter() - start) * 1000 / blocks
+    results["master bus"] = {"per_block_ms": bus_ms}
+    print(f"{'master bus':>15}: {bus_ms:.4f} ms/block for the look-ahead limiter (included in the figures above)")
+    # A held hotkey retriggering a looping clip every block: the voice cap keeps the block cost flat however long it is held.
+    mixer, worst_ms = MixingBuffer(), 0.0
+    for i in range(blocks):
+        mixer.add_sound(source, 0.5, True, "spam", "spam", max_voices=DEFAULT_MAX_VOICES * 4)
+        start = time.perf_counter(); mixer.mix_audio(FRAME_SIZE); worst_ms = max(worst_ms, (time.perf_counter() - start) * 1000)
+    results["retrigger storm"] = {"voices": len(mixer.sounds), "worst_block_ms": worst_ms}
+    print(f"retrigger storm: {blocks} triggers leave {len(mixer.sounds)} voices (cap {DEFAULT_MAX_VOICES}), worst block {worst_ms:.4f} ms")
+    return results
+
+class SimulatedHost:
+    """The few app hooks AudioOutputManager needs, with fixed settings, for driving it against SimulatedAudioBackend."""
+    def __init__(self, **settings): self.settings, self.app_settings = settings, self
+    def get_setting(self, key, default=None): return self.settings.get(key, default)
+    def report_error(self, title, message): print(f"{title}: {message}")
+    def show_status_message(self, message, style="info"): pass
+
+def run_simulated_benchmark(voice_counts=(8, 32, 128), seconds=30, drifts_ppm=(-500, -50, 50, 500), drift_seconds=600):
+    """Drives the real AudioOutputManager on the manual clock of SimulatedAudioBackend: voice-count load, soundboard
+    monitor drift against the main output, and switching the output device then unplugging it to recover on a fallback."""
+    rng = np.random.default_rng(0)
+    clip = rng.integers(-8192, 8192, size=(5 * SAMPLE_RATE, 1), dtype=np.int16)
+    devices = [{"name": "Simulated Main", "maxOutputChannels": 2}, {"name": "Simulated Spare", "maxOutputChannels": 2}]
+    results = {"voices": {}, "drift": {}}
+    budget_ms = FRAME_SIZE / SAMPLE_RATE * 1000
+    for voices in voice_counts:
+        backend = SimulatedAudioBackend(devices, clock="manual")
+        manager = AudioOutputManager(SimulatedHost(output_device_id=0), backend)
+        for i in range(voices): manager.mixer.add_sound(clip, 0.5, True, f"voice-{i}", f"voice-{i}")
+        manager.start_main_stream(); manager.supervisor.flush()
+        start = time.perf_counter(); backend.advance(seconds); elapsed = time.perf_counter() - start
+        callbacks, mixed = manager.main_stream.callbacks, len(manager.mixer.sounds)
+        results["voices"][voices] = {"mixed": mixed, "callbacks": callbacks, "per_callback_ms": elapsed * 1000 / callbacks, "realtime_factor": seconds / elapsed, "captured_frames": len(backend.captured(0))}
+        print(f"{voices:>4} voices ({mixed} mixed): {elapsed * 1000 / callbacks:.4f} ms/callback ({elapsed * 1000 / callbacks / budget_ms:.1%} of budget), {seconds / elapsed:.0f}x real time")
+        manager.close()
+    for drift in drifts_ppm:
+        backend = SimulatedAudioBackend([devices[0], dict(devices[1], drift_ppm=drift)], clock="manual")
+        manager = AudioOutputManager(SimulatedHost(output_device_id=0, soundboard_monitor_device_id=1), backend)
+        manager.mixer.add_sound(clip, 0.5, True, "tone", "tone")
+        METRICS.counters.update(monitor_underruns=0, monitor_overflows=0)
+        manager.start_main_stream(); manager.start_soundboard_monitor_stream(); manager.supervisor.flush()
+        backend.advance(drift_seconds)
+        underruns, dropped = METRICS.counters["monitor_underruns"], METRICS.counters["monitor_overflows"]
+        results["drift"][drift] = {"underruns": underruns, "dropped_blocks": dropped}
+        print(f"monitor drift {drift:+5d} ppm: {underruns} underrun and {dropped} dropped blocks over {drift_seconds} s")
+        manager.close()
+    backend = SimulatedAudioBackend(devices, clock="manual")
+    host = SimulatedHost(output_device_id=0, output_fallback_devices=["Simulated Main"])
+    manager = AudioOutputManager(host, backend)
+    manager.mixer.add_sound(clip, 0.5, True, "tone", "tone")
+    manager.start_main_stream(); manager.supervisor.flush(); backend.advance(2)
+    host.settings["output_device_id"] = 1
+    start = time.perf_counter(); manager.start_main_stream(); manager.supervisor.flush(); switch_ms = (time.perf_counter() - start) * 1000
+    backend.advance(2); start = time.perf_counter(); backend.set_device_present(1, False)
+    manager.supervisor.check(); manager.supervisor.flush(); recovery_ms = (time.perf_counter() - start) * 1000
+    frames_before = len(backend.captured(0)); backend.advance(1)
+    state = manager.supervisor.states.get("main_stream", {})
+    results["switch"] = {"switch_ms": switch_ms, "frames": [len(backend.captured(0)), len(backend.captured(1))], "voices_after": len(manager.mixer.sounds), "recovery_ms": recovery_ms,
+                         "recovered_on": state.get("device"), "state": state.get("state"), "frames_after_recovery": len(backend.captured(0)) - frames_before}
+    print(f"device switch: {switch_ms:.3f} ms, {results['switch']['frames']} frames per device, {results['switch']['voices_after']} voice kept")
+    print(f"unplug: back on '{state.get('device')}' ({state.get('state')}) in {recovery_ms:.3f} ms, {results['switch']['frames_after_recovery']} frames in the next second")
+    manager.close()
+    return results
+
+def run_render_benchmark(sounds=32, triggers=2000, seconds=300):
+    """Renders a dense synthetic timeline offline, once mixing only and once writing a WAV, and reports blocks per second."""
+    rng = np.random.default_rng(0)
+    clips = [rng.integers(-8192, 8192, size=(int(rng.uniform(1, 5) * SAMPLE_RATE), 1 + i % CHANNELS), dtype=np.int16) for i in range(sounds)]
+    events = [{"action": "play", "time": float(t), "id": f"clip-{i % sounds}", "name": f"clip-{i % sounds}", "data": clips[i % sounds], "volume": 0.5, "loop": False}
+              for i, t in enumerate(np.sort(rng.uniform(0, seconds, triggers)))]
+    results = {"mix only": render_timeline(events, duration=seconds)}
+    with tempfile.TemporaryDirectory() as root: results["mix + wav"] = render_timeline(events, os.path.join(root, "render.wav"), duration=seconds)
+    for label, stats in results.items():
+        print(f"{label:>9}: {stats['seconds']:.0f} s of audio in {stats['elapsed']:.2f} s, {stats['blocks_per_second']:.0f} blocks/s ({stats['realtime_factor']:.0f}x real time)")
+    return results
+
+def run_library_scan_benchmark(file_count=10000, folders=100):
+    """Times a rescan of an unchanged watched tree of file_count empty audio files against a fully populated index."""
+    with tempfile.TemporaryDirectory() as root:
+        for i in range(file_count):
+            folder = os.path.join(root, f"pack_{i % folders}")
+            os.makedirs(folder, exist_ok=True)
+            open(os.path.join(folder, f"sound_{i}.wav"), 'wb').close()
+        index = {path: {"size": size, "mtime_ns": mtime_ns, "sound_id": None} for path, (size, mtime_ns) in scan_folders([root], {})["seen"].items()}
+        start = time.perf_counter()
+        scan = scan_folders([root], index)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"Unchanged rescan of {len(scan['seen'])} files: {elapsed_ms:.1f} ms ({len(scan['changed'])} changed, {len(scan['removed'])} removed)")
+    return elapsed_ms
+
+def run_control_benchmark(port=CONTROL_PORT, triggers=1000, burst=50, paced_rate=200):
+    """Fires pipelined bursts of play triggers at a running headless instance for throughput, then one second of paced
+    triggers whose command-to-audio latency the daemon measures against the first mixed block of each voice."""
+    try: client = ControlClient(port)
+    except OSError as e: print(f"No headless instance on {CONTROL_HOST}:{port} ({e}). Start one with --headless first."); return
+    sounds = client.send("list").get("sounds", [])
+    if not sounds: print("The headless instance has no sounds to trigger."); client.close(); return
+    commands = [{"cmd": "play", "id": sounds[i % len(sounds)]["id"]} for i in range(triggers)]
+    start = time.perf_counter()
+    for i in range(0, triggers, burst): client.send_many(commands[i:i + burst])
+    elapsed = time.perf_counter() - start
+    for i in range(paced_rate):
+        client.send("play", id=sounds[i % len(sounds)]["id"]); time.sleep(1 / paced_rate)
+    time.sleep(0.1); client.send("stop_all")
+    stats = client.send("stats"); client.close()
+    print(f"{triggers} triggers in {elapsed * 1000:.1f} ms ({triggers / elapsed:.0f}/s, bursts of {burst})")
+    print(f"command-to-audio latency over last {stats['triggers_measured']} triggers: p50 {stats['latency_ms']['p50']} ms, p95 {stats['latency_ms']['p95']} ms, max {stats['latency_ms']['max']} ms; device output latency {stats['output_latency_ms']} ms")
+
+def run_bank_load_benchmark(bank_mb=1024, sounds=200):
+    """Writes a bank of roughly bank_mb MiB of int16 stereo PCM, then times opening it and mixing the first block of every sound."""
+    frames = bank_mb * 2**20 // sounds // (2 * CHANNELS)
+    pcm = np.random.default_rng(0).integers(-8000, 8000, size=(frames, CHANNELS), dtype=np.int16)
+    waveform = build_waveform_pyramid(pcm)
+    entries = [({"id": str(i), "name": f"sound_{i}", "volume": 1.0, "hotkeys": [], "loop": False}, pcm, waveform) for i in range(sounds)]
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "benchmark.wpbank")
+        write_sound_bank(path, entries)
+        start = time.perf_counter()
+        header, blobs = open_sound_bank(path)
+        datas = [bank_pcm(blobs, record["bank"]) for record in header["sounds"]]
+        open_ms = (time.perf_counter() - start) * 1000
+        mixer = MixingBuffer()
+        mixer.set_single_sound_mode(True)
+        start = time.perf_counter()
+        for record, data in zip(header["sounds"], datas):
+            mixer.add_sound(data, 1.0, False, record["id"], record["name"]); mixer.mix_audio(FRAME_SIZE)
+        first_block_ms = (time.perf_counter() - start) * 1000 / len(datas)
+        size_mb = os.path.getsize(path) / 2**20
+        del datas, blobs, mixer
+    print(f"Opened {size_mb:.0f} MiB bank with {sounds} sounds in {open_ms:.2f} ms; first block per sound {first_block_ms:.3f} ms")
+    return open_ms
+
 def ensure_folders():
     """Creates the necessary application data folders if they don't exist."""
-    for folder in [APP_DATA_DIR, SOUNDS_DIR, CONFIG_DIR]:
+    for folder in [APP_DATA_DIR, SOUNDS_DIR, CONFIG_DIR, BANKS_DIR, RECORDINGS_DIR, PROFILES_DIR]:
         os.makedirs(folder, exist_ok=True)
 
 if __name__ == "__main__":
+    # First, before argparse: in a frozen build the engine child re-runs this file with --multiprocessing-fork arguments.
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="WarpBoard soundboard")
+    parser.add_argument("--benchmark", nargs="?", const="mixer", choices=["mixer", "scan", "bank", "control", "render", "simulated"], help="Run a benchmark and exit. 'control' needs a running --headless instance.")
+    parser.add_argument("--headless", action="store_true", help="Run without the UI; sounds are triggered by hotkeys and the local control server.")
+    parser.add_argument("--control-port", type=int, default=CONTROL_PORT, help="Port of the headless control server on localhost.")
+    parser.add_argument("--send", metavar="JSON", help='Send one command to a running headless instance, e.g. \'{"cmd": "play", "name": "airhorn"}\'.')
+    parser.add_argument("--render", metavar="TIMELINE", help="Render a JSON timeline of triggers offline to --output and exit.")
+    parser.add_argument("--output", metavar="WAV", help="Output file for --render.")
+    parser.add_argument("--duration", type=float, help="Length of the --render output in seconds (required for looping timelines).")
+    parser.add_argument("--audio-backend", choices=AUDIO_BACKENDS, help="Audio backend; 'simulated' needs no sound card (see WARPBOARD_SIM_CONFIG).")
+    parser.add_argument("--probe-audio-devices", metavar="JSON", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    # Through the environment so the out-of-process engine picks the same backend.
+    if args.audio_backend: os.environ["WARPBOARD_AUDIO_BACKEND"] = args.audio_backend
+    if args.probe_audio_devices:
+        backend = create_audio_backend()
+        with open(args.probe_audio_devices, 'w') as f: json.dump([audio_device_key(backend.get_device_info_by_index(i)) for i in range(backend.get_device_count())], f)
+        backend.terminate(); sys.exit(0)
+    if args.benchmark:
+        {"mixer": run_mixer_benchmark, "scan": run_library_scan_benchmark, "bank": run_bank_load_benchmark, "control": lambda: run_control_benchmark(args.control_port), "render": run_render_benchmark, "simulated": run_simulated_benchmark}[args.benchmark](); sys.exit(0)
+    if args.render:
+        if not args.output: parser.error("--render needs --output")
+        render_timeline_file(args.render, args.output, args.duration); sys.exit(0)
+    if args.send:
+        try: command = json.loads(args.send)
+        except ValueError as e: parser.error(f"--send needs a JSON command: {e}")
+        try: client = ControlClient(args.control_port)
+        except OSError as e: print(f"No headless instance on {CONTROL_HOST}:{args.control_port} ({e}). Start one with --headless first."); sys.exit(1)
+        try: print(json.dumps(client.send_many([command])[0]))
+        except (OSError, ValueError) as e: print(f"The headless instance did not answer ({e})."); sys.exit(1)
+        finally: client.close()
+        sys.exit(0)
+
     if getattr(sys, 'frozen', False):
         pydub.AudioSegment.ffmpeg = get_executable_path('ffmpeg.exe')
         pydub.AudioSegment.ffprobe = get_executable_path('ffprobe.exe')
@@ -1548,6 +4412,8 @@ if __name__ == "__main__":
         format='%(asctime)s - %(levelname)s - %(module)s - %(message)s'
     )
 
+    if args.headless: HeadlessApp(args.control_port).run(); sys.exit(0)
+
     DependencyChecker.run_checks()
     app = SoundboardApp()
     app.mainloop()
\ No newline at end of file
@@ -0,0 +1,75 @@
+import hashlib
+
+import numpy as np
+
+import Warpboard as W
+
+CLIP_FRAMES = int(0.2 * W.SAMPLE_RATE)
+GOLDEN_SHA256 = "f24780fd200c173b09c73bc61927cda2e2bf470765f51cbc6e0b1b19b1b8b5c3"
+
+
+def clip(level=0.25, frames=CLIP_FRAMES):
+    return np.full((frames, 1), level, dtype=np.float32)
+
+
+def play(time, sound_id="a", data=None, volume=1.0, loop=False):
+    return {"action": "play", "time": time, "data": clip() if data is None else data, "volume": volume, "loop": loop, "id": sound_id, "name": sound_id}
+
+
+def rendered_frames(end):
+    """A render without a duration stops at the first block boundary after the last voice ends."""
+    return end + (-end) % W.FRAME_SIZE
+
+
+def test_render_waits_for_voices_triggered_in_the_last_block():
+    assert W.render_timeline([play(0.0)])["frames"] == rendered_frames(CLIP_FRAMES)
+
+
+def test_render_keeps_every_trigger():
+    offset = W.SAMPLE_RATE // 2
+    assert W.render_timeline([play(0.0, "a"), play(0.5, "b")])["frames"] == offset + rendered_frames(CLIP_FRAMES)
+
+
+def render(tmp_path, events, **kwargs):
+    path = tmp_path / "render.wav"
+    stats = W.render_timeline(events, str(path), **kwargs)
+    data, rate = W.sf.read(str(path), dtype="float32", always_2d=True)
+    assert rate == W.SAMPLE_RATE and len(data) == stats["frames"]
+    return data[:, 0]
+
+
+def test_render_honours_duration(tmp_path):
+    assert len(render(tmp_path, [play(0.0, loop=True)], duration=1.5)) == int(1.5 * W.SAMPLE_RATE)
+
+
+def test_triggers_are_sample_accurate(tmp_path):
+    left = render(tmp_path, [play(0.25), play(1.0 + 7 / W.SAMPLE_RATE, "b")])
+    first, second = W.SAMPLE_RATE // 4, W.SAMPLE_RATE + 7
+    assert not left[:first].any() and left[first] == np.float32(0.25)
+    assert not left[first + CLIP_FRAMES:second].any() and left[second] == np.float32(0.25)
+
+
+def test_stop_fades_one_sound_and_stop_all_fades_every_sound(tmp_path):
+    stop = W.SAMPLE_RATE // 10
+    events = [play(0.0, "a", clip(0.25, W.SAMPLE_RATE)), play(0.0, "b", clip(0.125, W.SAMPLE_RATE)), {"action": "stop", "time": 0.1, "id": "a"}]
+    left = render(tmp_path, events, duration=0.5)
+    assert np.allclose(left[:stop], 0.375) and np.allclose(left[stop + W.VOICE_FADE_FRAMES:], 0.125)
+    left = render(tmp_path, events[:2] + [{"action": "stop_all", "time": 0.1}], duration=0.5)
+    assert np.allclose(left[:stop], 0.375) and not left[stop + W.VOICE_FADE_FRAMES:].any()
+
+
+def test_single_sound_mode_cuts_the_previous_sound(tmp_path):
+    events, second = [play(0.0, "a", clip(0.25, W.SAMPLE_RATE)), play(0.1, "b", clip(0.25, W.SAMPLE_RATE))], W.SAMPLE_RATE // 10
+    assert np.allclose(render(tmp_path, events, duration=0.5)[second + W.VOICE_FADE_FRAMES:], 0.5)
+    assert np.allclose(render(tmp_path, events, duration=0.5, single_sound_mode=True)[second + W.VOICE_FADE_FRAMES:], 0.25)
+
+
+def test_render_matches_golden_checksum(tmp_path):
+    # 16-bit output keeps the checksum stable across numpy builds that sum float32 in a different order.
+    tone = (0.4 * np.sin(2 * np.pi * 440 * np.arange(W.SAMPLE_RATE // 2) / W.SAMPLE_RATE)).astype(np.float32)[:, None]
+    events = [play(0.0, "tone", tone, 0.8), play(0.2, "tone2", tone[::2], 1.0), play(0.3, "loop", clip(0.1, 4410), loop=True),
+              {"action": "stop", "time": 0.6, "id": "loop"}]
+    path = tmp_path / "golden.wav"
+    W.render_timeline(events, str(path), subtype="PCM_16")
+    pcm, _ = W.sf.read(str(path), dtype="int16")
+    assert hashlib.sha256(pcm.tobytes()).hexdigest() == GOLDEN_SHA256